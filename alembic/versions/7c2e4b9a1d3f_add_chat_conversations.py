@@ -0,0 +1,40 @@
+"""Add chat_conversations table
+
+Revision ID: 7c2e4b9a1d3f
+Revises: 31dd9183b1bf
+Create Date: 2026-10-19 10:12:31.482117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e4b9a1d3f'
+down_revision: Union[str, None] = '31dd9183b1bf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('chat_conversations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.String(length=100), nullable=False),
+    sa.Column('messages', sa.JSON(), nullable=True),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_chat_conversations_id'), 'chat_conversations', ['id'], unique=False)
+    op.create_index(op.f('ix_chat_conversations_session_id'), 'chat_conversations', ['session_id'], unique=True)
+    op.create_index(op.f('ix_chat_conversations_updated_at'), 'chat_conversations', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_chat_conversations_updated_at'), table_name='chat_conversations')
+    op.drop_index(op.f('ix_chat_conversations_session_id'), table_name='chat_conversations')
+    op.drop_index(op.f('ix_chat_conversations_id'), table_name='chat_conversations')
+    op.drop_table('chat_conversations')
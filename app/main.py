@@ -6,36 +6,49 @@ Integrates LIA (Lifestyle Intelligence Analysis) with proprietary Reconnect laye
 - Clarity™: Signal quality and noise reduction
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from contextlib import asynccontextmanager
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.requests import HTTPConnection
+from contextlib import aclosing, asynccontextmanager
+import asyncio
+import json
+import os
+import time
 import uvicorn
 import logging
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 from app.models.schemas import (
     ConnectionRequest, ConnectionResponse,
     StreamDataResponse, PredictionResponse,
     SessionCreateRequest, SessionResponse,
     DeviceStatus, SystemStatus, LayerProcessingLog,
-    BiosignalData, ClarityLayerResult, iFRSLayerResult,
+    BiosignalData, BiosignalSample, ClarityLayerResult, iFRSLayerResult,
     TimesystemsLayerResult, LIAInsights, QualityMetrics,
     FrequencyBands, HRVFeatures, PatternRecognition,
     CircadianAlignment, WellnessAssessment, SignalQuality,
     PatternType, CircadianPhase, RhythmClassification,
     LayerDemoResponse, ProcessingLogsResponse, APIInfo,
-    ChatRequest, ChatResponse, ConversationHistoryResponse
+    ChatRequest, ChatResponse, ChatCacheStats, ChatProviderStatus, ConversationHistoryResponse,
+    RollupResolution, RollupPoint, RollupSeriesResponse,
+    BiosignalBatchRequest, BiosignalBatchResponse,
+    MotifMatch, DiscordMatch, MatrixProfileResponse, ChangePointsResponse,
+    FleetDeviceCondition, FleetConditionsResponse,
+    LIAModelRegistryResponse, LIAModelVersionRequest,
+    LIAEvent, LIAEventsResponse, LIAEventType
 )
 from app.services.ble_simulator import BLESimulator
+from app.services.pipeline import PipelineRunner, UnknownDevice
+from app.services.event_bus import EventBus
+from app.services.lia_registry import get_registry
 from app.services.timesystems import TimesystemsLayer
-from app.services.ifrs import iFRSLayer
-from app.services.clarity import ClarityLayer
-from app.services.lia_integration import LIAEngine
 from app.services.lia_chat import LIAChatEngine
+from app.services.chat_tools import ChatToolbox
 from app.services.session_manager import SessionManager
 from app.utils.logger import setup_logger, get_processing_logger
+from app.utils.timebase import to_datetime, to_ms
 
 # Setup logging
 logger = setup_logger(__name__)
@@ -43,34 +56,39 @@ processing_logger = get_processing_logger()
 
 # Global services
 ble_simulator = None
-timesystems = None
-ifrs = None
-clarity = None
-lia_engine = None
+pipeline = None
 lia_chat = None
 session_manager = None
+event_bus = None
+monitor_task = None
+conversation_flush_task = None
+last_simulator_sample_at = 0.0
+frame_sequence = 0
+latest_frame: Optional[Tuple[int, float, StreamDataResponse]] = None  # (sequence, monotonic time, frame)
 connected_clients = []
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown"""
-    global ble_simulator, timesystems, ifrs, clarity, lia_engine, lia_chat, session_manager
+    global ble_simulator, pipeline, lia_chat, session_manager, event_bus, monitor_task, conversation_flush_task
 
     logger.info("🚀 Starting Wearable Biosignal Analysis Backend...")
 
     # Initialize services
     ble_simulator = BLESimulator()
-    timesystems = TimesystemsLayer()
-    ifrs = iFRSLayer()
-    clarity = ClarityLayer()
-    lia_engine = LIAEngine()
+    pipeline = PipelineRunner()
     session_manager = SessionManager()
+    event_bus = EventBus()
 
     # Initialize LIA Chat Engine
     try:
         lia_chat = LIAChatEngine()
-        logger.info("✓ LIA Core™ Chat Engine initialized with OpenAI")
+        logger.info(
+            f"✓ LIA Core™ Chat Engine initialized (provider={lia_chat.status()['provider']}, model={lia_chat.model})"
+        )
+        conversation_flush_task = asyncio.create_task(lia_chat.conversations.run())
+        logger.info(f"✓ Conversation store initialized (persist={lia_chat.conversations.persist})")
     except Exception as e:
         logger.warning(f"⚠️ LIA Chat Engine initialization failed: {str(e)}")
         logger.warning("⚠️ Chat functionality will be unavailable")
@@ -78,12 +96,20 @@ async def lifespan(app: FastAPI):
 
     # Start BLE simulator
     await ble_simulator.start()
+    pipeline.register(ble_simulator.device_id)
     logger.info("✓ BLE Simulator started")
     logger.info("✓ Timesystems™ layer initialized")
     logger.info("✓ iFRS™ layer initialized")
     logger.info("✓ Clarity™ layer initialized")
     logger.info("✓ LIA Engine initialized")
+    logger.info(f"✓ Processing pipeline initialized (mode={pipeline.mode}, workers={pipeline.max_workers})")
     logger.info("✓ Session Manager initialized")
+
+    # Keep the simulated device analysed while event subscribers are connected
+    monitor_interval = float(os.getenv("EVENT_MONITOR_INTERVAL", "0.1"))
+    if monitor_interval > 0:
+        monitor_task = asyncio.create_task(monitor_simulator(monitor_interval))
+        logger.info(f"✓ LIA event monitor started (interval={monitor_interval}s, runs while subscribed)")
     logger.info("=" * 80)
     logger.info("Backend ready to accept connections on http://localhost:8000")
     logger.info("=" * 80)
@@ -92,7 +118,15 @@ async def lifespan(app: FastAPI):
 
     # Cleanup
     logger.info("Shutting down services...")
+    if monitor_task is not None:
+        monitor_task.cancel()
     await ble_simulator.stop()
+    pipeline.shutdown()
+    if conversation_flush_task is not None:
+        conversation_flush_task.cancel()  # Runs a final flush of unsaved history
+        await asyncio.gather(conversation_flush_task, return_exceptions=True)
+    if lia_chat is not None:
+        await lia_chat.aclose()
     logger.info("Backend shutdown complete")
 
 
@@ -273,6 +307,95 @@ def generate_mockup_stream_data() -> StreamDataResponse:
     )
 
 
+# ============================================================================
+# SIMULATOR PROCESSING & LIA EVENTS
+# ============================================================================
+
+async def process_simulator_sample() -> Tuple[BiosignalSample, Dict]:
+    """
+    Read the simulated device and run the sample through all layers
+
+    LIA events and change points raised by the sample are published to
+    subscribers.
+
+    Returns:
+        (raw sample, layer outputs from the pipeline)
+    """
+    global last_simulator_sample_at
+
+    raw_data = await ble_simulator.get_current_data()
+    results = await pipeline.process(ble_simulator.device_id, raw_data)
+    last_simulator_sample_at = time.monotonic()
+
+    await publish_lia_events(ble_simulator.device_id, bus_events(results))
+    return raw_data, results
+
+
+def bus_events(results: Dict) -> List[Dict]:
+    """
+    Events of one pipeline result, in the event bus format
+
+    Timesystems™ change points become `change_point` events timestamped at
+    detection, next to the LIA condition and risk events.
+    """
+    change_points = [
+        {
+            'type': LIAEventType.CHANGE_POINT.value,
+            'timestamp_ms': to_ms(event.detected_at),
+            'channel': event.channel,
+            'direction': event.direction.value,
+            'onset_ms': to_ms(event.onset),
+            'previous_mean': event.previous_mean,
+            'current_mean': event.current_mean
+        }
+        for event in results['timesystems']['change_points']
+    ]
+    return change_points + results['lia']['events']
+
+
+async def publish_lia_events(device_id: str, events: List[Dict]):
+    """Publish LIA events and record them in the processing log"""
+    for event in await event_bus.publish(device_id, events):
+        if event['type'] == LIAEventType.CHANGE_POINT.value:
+            processing_logger.info(
+                f"CHANGE_POINT | device_id={device_id} | channel={event['channel']} | "
+                f"direction={event['direction']} | onset={to_datetime(event['onset_ms']).isoformat()} | "
+                f"mean={event['previous_mean']:.2f}->{event['current_mean']:.2f}"
+            )
+            continue
+        processing_logger.info(
+            f"LIA_EVENT | device_id={device_id} | type={event['type']} | "
+            f"condition={event.get('condition')} | risk_factor={event.get('risk_factor')}"
+        )
+
+
+async def monitor_simulator(interval: float):
+    """
+    Background monitor for the simulated device
+
+    Processes a sample whenever no request did so within `interval`, so
+    condition and risk events keep flowing to subscribers without anyone
+    polling /api/v1/stream (and without double-processing when they do).
+    Idle while nobody is subscribed to events.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        if not event_bus.subscribers or time.monotonic() - last_simulator_sample_at < interval:
+            continue
+        try:
+            await process_simulator_sample()
+        except Exception as e:
+            logger.error(f"❌ Event monitor error: {str(e)}")
+
+
+def to_lia_event(event: Dict) -> LIAEvent:
+    """Bus event dict → API model"""
+    fields = {key: value for key, value in event.items() if key not in ('timestamp_ms', 'onset_ms')}
+    if 'onset_ms' in event:
+        fields['onset'] = to_datetime(event['onset_ms'])
+    return LIAEvent(timestamp=to_datetime(event['timestamp_ms']), **fields)
+
+
 # ============================================================================
 # REST API ENDPOINTS
 # ============================================================================
@@ -311,6 +434,7 @@ async def root():
             "connect": "/api/v1/connect",
             "stream": "/api/v1/stream",
             "websocket": "/ws/stream",
+            "events": "/api/v1/events/stream",
             "chat": "/api/v1/chat"
         }
     }
@@ -324,10 +448,10 @@ async def health_check():
         timestamp=datetime.now(),
         services={
             "ble_simulator": ble_simulator.is_running if ble_simulator else False,
-            "timesystems": timesystems is not None,
-            "ifrs": ifrs is not None,
-            "clarity": clarity is not None,
-            "lia": lia_engine is not None
+            "timesystems": pipeline is not None,
+            "ifrs": pipeline is not None,
+            "clarity": pipeline is not None,
+            "lia": pipeline is not None
         },
         connected_clients=len(connected_clients),
         active_sessions=session_manager.get_active_session_count() if session_manager else 0
@@ -348,10 +472,15 @@ async def connect_device(request: ConnectionRequest):
             "device_id": request.device_id,
             "device_type": request.device_type,
             "connected_at": datetime.now(),
-            "app_version": request.app_version
+            "app_version": request.app_version,
+            "utc_offset_minutes": request.utc_offset_minutes
         }
         connected_clients.append(client_info)
 
+        # Wearer's timezone drives circadian analysis of this device's uploads
+        if request.utc_offset_minutes is not None:
+            await pipeline.query(request.device_id, 'set_utc_offset', request.utc_offset_minutes, create=True)
+
         # Get device status from BLE simulator
         device_status = await ble_simulator.get_device_status()
 
@@ -383,55 +512,55 @@ async def get_stream_data():
     Returns processed data through all three proprietary layers
     Falls back to mockup data if errors occur
     """
+    global frame_sequence, latest_frame
+
     try:
-        # Get raw data from BLE simulator
-        raw_data = await ble_simulator.get_current_data()
+        # Get raw data from BLE simulator and process through all layers off the event loop
+        _, results = await process_simulator_sample()
 
-        # Process through Clarity™ layer (signal quality & noise reduction)
-        clarity_result = clarity.process(raw_data)
+        # Clarity™ layer (signal quality & noise reduction)
+        clarity_result = results['clarity']
         processing_logger.info(
             f"CLARITY_LAYER | quality={clarity_result['quality_score']:.2f} | "
             f"snr={clarity_result['signal_to_noise_ratio']:.1f}dB | "
             f"noise_reduced={clarity_result['noise_reduction_applied']}"
         )
 
-        # Process through iFRS™ layer (frequency analysis)
-        ifrs_result = ifrs.process(clarity_result['processed_data'])
+        # iFRS™ layer (frequency analysis)
+        ifrs_result = results['ifrs']
         processing_logger.info(
             f"IFRS_LAYER | dominant_freq={ifrs_result['dominant_frequency']:.2f}Hz | "
             f"heart_rate_variability={ifrs_result['hrv_features'].hrv_score:.1f} | "
             f"rhythm={ifrs_result['rhythm_classification']}"
         )
 
-        # Process through Timesystems™ layer (temporal analysis)
-        timesystems_result = timesystems.process(ifrs_result['enhanced_data'])
+        # Timesystems™ layer (temporal analysis)
+        timesystems_result = results['timesystems']
         processing_logger.info(
             f"TIMESYSTEMS_LAYER | pattern={timesystems_result['pattern_type']} | "
             f"circadian_phase={timesystems_result['circadian_phase']} | "
             f"temporal_consistency={timesystems_result['temporal_consistency']:.2f}"
         )
 
-        # Generate LIA insights
-        lia_insights = lia_engine.analyze(
-            raw_data=raw_data,
-            clarity_result=clarity_result,
-            ifrs_result=ifrs_result,
-            timesystems_result=timesystems_result
-        )
+        # LIA insights
+        lia_insights = results['lia']
         processing_logger.info(
             f"LIA_ENGINE | condition={lia_insights['condition']} | "
             f"confidence={lia_insights['confidence']:.3f} | "
             f"wellness_score={lia_insights['wellness_score']:.1f}"
         )
 
-        return StreamDataResponse(
+        stream_data = StreamDataResponse(
             timestamp=datetime.now(),
-            raw_signals=raw_data,
+            raw_signals=results['aligned'],
             clarity_layer=clarity_result,
             ifrs_layer=ifrs_result,
             timesystems_layer=timesystems_result,
             lia_insights=lia_insights
         )
+        frame_sequence += 1
+        latest_frame = (frame_sequence, time.monotonic(), stream_data)
+        return stream_data
 
     except Exception as e:
         logger.error(f"❌ Stream error: {str(e)}")
@@ -440,6 +569,54 @@ async def get_stream_data():
         return generate_mockup_stream_data()
 
 
+@app.post("/api/v1/stream/batch", tags=["Data"], response_model=BiosignalBatchResponse)
+async def ingest_batch(request: BiosignalBatchRequest):
+    """
+    Ingest a block of buffered samples recorded by a device
+
+    Samples are analysed at their device timestamps (not upload time), so
+    rollups, trends and circadian phase reflect when they were recorded.
+
+    **Requirements:**
+    - Every sample must carry `timestamp_ms` (UTC epoch milliseconds)
+    - Send the wearer's `utc_offset_minutes` via `/api/v1/connect` first
+    """
+    if any(sample.timestamp_ms is None for sample in request.samples):
+        raise HTTPException(status_code=400, detail="Every buffered sample requires timestamp_ms")
+
+    try:
+        samples = sorted(request.samples, key=lambda sample: sample.timestamp_ms)
+        results = await pipeline.process_batch(request.device_id, samples)
+        await publish_lia_events(
+            request.device_id, [event for result in results for event in bus_events(result)]
+        )
+
+        latest = results[-1]
+        processing_logger.info(
+            f"BATCH_INGEST | device_id={request.device_id} | samples={len(samples)} | "
+            f"span={(samples[-1].timestamp_ms - samples[0].timestamp_ms) / 1000:.1f}s | "
+            f"condition={latest['lia']['condition']}"
+        )
+
+        return BiosignalBatchResponse(
+            device_id=request.device_id,
+            samples_processed=len(samples),
+            first_sample_at=to_datetime(samples[0].timestamp_ms),
+            last_sample_at=to_datetime(samples[-1].timestamp_ms),
+            latest=StreamDataResponse(
+                timestamp=to_datetime(samples[-1].timestamp_ms),
+                raw_signals=latest['aligned'],
+                clarity_layer=latest['clarity'],
+                ifrs_layer=latest['ifrs'],
+                timesystems_layer=latest['timesystems'],
+                lia_insights=latest['lia']
+            )
+        )
+    except Exception as e:
+        logger.error(f"❌ Batch ingest error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/api/v1/predict", tags=["Analysis"], response_model=PredictionResponse)
 async def get_prediction():
     """
@@ -476,6 +653,338 @@ async def get_prediction():
         return generate_mockup_prediction_data()
 
 
+@app.get("/api/v1/rollups", tags=["Analysis"], response_model=RollupSeriesResponse)
+async def get_rollups(
+    resolution: RollupResolution = RollupResolution.MINUTE,
+    channel: str = "heart_rate",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    device_id: Optional[str] = None
+):
+    """
+    Get pre-aggregated biosignal history from Timesystems™ rollups
+
+    Buckets are maintained incrementally at 1 s, 1 min, 1 h and 1 day
+    resolution, so long ranges are served from a few hundred points
+    instead of raw samples.
+
+    **Parameters:**
+    - `resolution`: Bucket size - `1s`, `1m`, `1h` or `1d` (default: `1m`)
+    - `channel`: `heart_rate`, `spo2`, `temperature` or `activity`
+    - `start` / `end`: Optional time range (bucket start times, ISO 8601; UTC if no offset is given)
+    - `device_id`: Device to query (default: the simulated device; 404 if it has sent no data)
+    """
+    if channel not in TimesystemsLayer.CHANNELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown channel '{channel}'. Expected one of: {', '.join(TimesystemsLayer.CHANNELS)}"
+        )
+
+    try:
+        device_id = device_id or ble_simulator.device_id
+        series = await pipeline.query(
+            device_id, 'rollup_series', resolution.value, channel,
+            to_ms(start) if start else None,
+            to_ms(end) if end else None
+        )
+
+        points = [
+            RollupPoint(
+                timestamp=to_datetime(start_ms),
+                count=count,
+                mean=round(mean, 2),
+                std=round(std, 2),
+                min=round(minimum, 2),
+                max=round(maximum, 2)
+            )
+            for start_ms, count, mean, std, minimum, maximum in zip(
+                series['start_ms'], series['count'], series['mean'],
+                series['std'], series['min'], series['max']
+            )
+        ]
+
+        return RollupSeriesResponse(
+            device_id=device_id,
+            channel=channel,
+            resolution=resolution,
+            points=points,
+            late_samples_merged=series['late']['merged'],
+            late_samples_dropped=series['late']['dropped']
+        )
+    except UnknownDevice as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"❌ Rollup retrieval error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/v1/patterns", tags=["Analysis"], response_model=MatrixProfileResponse)
+async def get_patterns(
+    resolution: RollupResolution = RollupResolution.MINUTE,
+    channel: str = "heart_rate",
+    window: int = 30,
+    top_k: int = 3,
+    device_id: Optional[str] = None
+):
+    """
+    Find recurring patterns (motifs) and anomalous stretches (discords)
+
+    Computes a matrix profile (STOMP) over Timesystems™ rollup means:
+    every `window`-bucket subsequence is matched to its most similar
+    z-normalised shape elsewhere in the history.
+
+    **Parameters:**
+    - `resolution`: Rollup bucket size (default `1m`; use `1h` for weeks of data)
+    - `channel`: `heart_rate`, `spo2`, `temperature` or `activity`
+    - `window`: Subsequence length in buckets (default 30)
+    - `top_k`: Number of motifs and discords to return (default 3)
+    - `device_id`: Device to query (default: the simulated device; 404 if it has sent no data)
+
+    Distances are normalised to [0, 1]: 0 is an identical shape.
+    """
+    if channel not in TimesystemsLayer.CHANNELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown channel '{channel}'. Expected one of: {', '.join(TimesystemsLayer.CHANNELS)}"
+        )
+    if not 4 <= window <= 1440 or not 1 <= top_k <= 20:
+        raise HTTPException(status_code=400, detail="window must be 4-1440 and top_k 1-20")
+
+    try:
+        device_id = device_id or ble_simulator.device_id
+        result = await pipeline.query(
+            device_id, 'matrix_profile', resolution.value, channel, window, top_k
+        )
+
+        return MatrixProfileResponse(
+            device_id=device_id,
+            channel=channel,
+            resolution=resolution,
+            window=window,
+            subsequences=result['subsequences'],
+            motifs=[
+                MotifMatch(
+                    first_start=to_datetime(first_ms),
+                    second_start=to_datetime(second_ms),
+                    distance=round(distance, 3)
+                )
+                for first_ms, second_ms, distance in result['motifs']
+            ],
+            discords=[
+                DiscordMatch(
+                    start=to_datetime(start_ms),
+                    distance=round(distance, 3)
+                )
+                for start_ms, distance in result['discords']
+            ]
+        )
+    except UnknownDevice as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"❌ Pattern discovery error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/v1/change-points", tags=["Analysis"], response_model=ChangePointsResponse)
+async def get_change_points(limit: int = 50, device_id: Optional[str] = None):
+    """
+    Get recent regime changes detected by Timesystems™
+
+    Each channel runs an online Page-Hinkley test over 1-second means;
+    events carry the estimated onset and the mean before/after the shift.
+
+    **Parameters:**
+    - `limit`: Maximum number of events (default: 50, newest last)
+    - `device_id`: Device to query (default: the simulated device; 404 if it has sent no data)
+    """
+    try:
+        device_id = device_id or ble_simulator.device_id
+        events = await pipeline.query(device_id, 'recent_change_points', limit)
+        return ChangePointsResponse(device_id=device_id, events=events)
+    except UnknownDevice as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"❌ Change-point retrieval error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/v1/fleet/conditions", tags=["Analysis"], response_model=FleetConditionsResponse)
+async def get_fleet_conditions():
+    """
+    Classify the latest sample of every active device
+
+    The LIA rule tables run once over a devices × features matrix, so a
+    fleet snapshot costs a single vectorized evaluation.
+    """
+    try:
+        conditions = await pipeline.fleet_conditions()
+        devices = [
+            FleetDeviceCondition(device_id=device_id, **result)
+            for device_id, result in conditions.items()
+        ]
+        return FleetConditionsResponse(
+            timestamp=datetime.now(),
+            device_count=len(devices),
+            devices=devices
+        )
+    except Exception as e:
+        logger.error(f"❌ Fleet condition error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/v1/lia/models", tags=["LIA Models"], response_model=LIAModelRegistryResponse)
+async def get_lia_models():
+    """
+    LIA model registry status
+
+    Shows the active version, available versions, per-device pins and the
+    bundles loaded in this process. Versions live under the registry root
+    (`LIA_MODEL_REGISTRY_PATH`); file changes are picked up automatically.
+    """
+    try:
+        return get_registry().status()
+    except Exception as e:
+        logger.error(f"❌ LIA model registry error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/v1/lia/models/reload", tags=["LIA Models"], response_model=LIAModelRegistryResponse)
+async def reload_lia_models():
+    """Re-read the registry manifest and reload changed versions now"""
+    try:
+        status = get_registry().reload()
+        logger.info(f"🔁 LIA models reloaded (active={status['active_version']})")
+        return status
+    except Exception as e:
+        logger.error(f"❌ LIA model reload error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/v1/lia/models/activate", tags=["LIA Models"], response_model=LIAModelRegistryResponse)
+async def activate_lia_model(request: LIAModelVersionRequest):
+    """
+    Hot-swap the active LIA model version
+
+    Unpinned devices switch on their next sample; layer state is kept.
+    Worker processes follow within `LIA_MODEL_POLL_SECONDS`.
+    """
+    try:
+        status = get_registry().activate(request.version)
+        logger.info(f"🔁 LIA model version activated: {request.version}")
+        return status
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except Exception as e:
+        logger.error(f"❌ LIA model activation error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.put("/api/v1/lia/models/pins/{device_id}", tags=["LIA Models"], response_model=LIAModelRegistryResponse)
+async def pin_lia_model(device_id: str, request: LIAModelVersionRequest):
+    """Serve one device from a specific LIA model version (canary rollout)"""
+    try:
+        status = get_registry().pin(device_id, request.version)
+        logger.info(f"📌 Device {device_id} pinned to LIA model {request.version}")
+        return status
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except Exception as e:
+        logger.error(f"❌ LIA model pin error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.delete("/api/v1/lia/models/pins/{device_id}", tags=["LIA Models"], response_model=LIAModelRegistryResponse)
+async def unpin_lia_model(device_id: str):
+    """Return a device to the active LIA model version"""
+    try:
+        return get_registry().unpin(device_id)
+    except Exception as e:
+        logger.error(f"❌ LIA model unpin error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def parse_event_types(types: Optional[str]) -> Optional[List[str]]:
+    """Comma-separated event type filter → validated list"""
+    if not types:
+        return None
+    try:
+        return [LIAEventType(value.strip()).value for value in types.split(",") if value.strip()]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/v1/events", tags=["Events"], response_model=LIAEventsResponse)
+async def poll_events(
+    after: int = Query(0, ge=0, description="Return events with event_id greater than this"),
+    device_id: Optional[str] = None,
+    types: Optional[str] = Query(None, description="Comma-separated event types"),
+    timeout: float = Query(25.0, ge=0, le=60, description="Seconds to wait for an event")
+):
+    """
+    Long-poll LIA events (condition changes, risk raised/cleared, change points)
+
+    Returns as soon as an event newer than `after` exists, or an empty list
+    after `timeout` seconds. Pass the returned `last_event_id` as `after`
+    on the next call; ids keep increasing across server restarts. 400 if
+    `after` is ahead of the latest event.
+    """
+    event_types = parse_event_types(types)
+    try:
+        event_bus.check_cursor(after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        with event_bus.subscription():
+            events = await event_bus.wait(after, device_id, event_types, timeout)
+        last_event_id = events[-1]['event_id'] if events else max(after, 0)
+        return LIAEventsResponse(
+            events=[to_lia_event(event) for event in events],
+            last_event_id=last_event_id
+        )
+    except Exception as e:
+        logger.error(f"❌ Event poll error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/v1/events/stream", tags=["Events"])
+async def stream_events(
+    device_id: Optional[str] = None,
+    types: Optional[str] = Query(None, description="Comma-separated event types"),
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Server-Sent Events stream of LIA events
+
+    Each event is sent with `id:` and `event:` (its type); browsers resume
+    after reconnects (including server restarts) via `Last-Event-ID`. A
+    keep-alive comment is sent every 15 s without events.
+    """
+    event_types = parse_event_types(types)
+    if last_event_id is not None:
+        try:
+            event_bus.check_cursor(last_event_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    async def event_stream():
+        after = last_event_id if last_event_id is not None else event_bus.last_event_id
+        with event_bus.subscription():
+            while True:
+                events = await event_bus.wait(after, device_id, event_types, timeout=15.0)
+                if not events:
+                    yield ": keep-alive\n\n"
+                    continue
+                for event in events:
+                    payload = to_lia_event(event).model_dump_json()
+                    yield f"id: {event['event_id']}\nevent: {event['type']}\ndata: {payload}\n\n"
+                after = events[-1]['event_id']
+
+    return StreamingResponse(
+        event_stream(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.post("/api/v1/sessions", tags=["Sessions"], response_model=SessionResponse)
 async def create_session(request: SessionCreateRequest):
     """Create a new monitoring session"""
@@ -607,6 +1116,87 @@ async def websocket_stream(websocket: WebSocket):
         await websocket.close()
 
 
+@app.websocket("/ws/events")
+async def websocket_events(websocket: WebSocket, device_id: Optional[str] = None, types: Optional[str] = None):
+    """
+    WebSocket push of LIA events only
+
+    Sends {"type": "lia_event", "data": LIAEvent} when a condition changes
+    or a risk factor is raised/cleared - a few messages per hour instead
+    of the 10 Hz frames of /ws/stream. Invalid `types` close the socket
+    with code 1008 and the error as reason.
+    """
+    await websocket.accept()
+    try:
+        event_types = parse_event_types(types)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    logger.info(f"🔔 Event subscriber connected (device_id={device_id or 'all'})")
+
+    after = event_bus.last_event_id
+    try:
+        with event_bus.subscription():
+            while True:
+                events = await event_bus.wait(after, device_id, event_types, timeout=30.0)
+                if not events:
+                    await websocket.send_json({"type": "keep_alive"})
+                for event in events:
+                    await websocket.send_json({
+                        "type": "lia_event",
+                        "data": to_lia_event(event).model_dump(mode="json")
+                    })
+                if events:
+                    after = events[-1]['event_id']
+    except WebSocketDisconnect:
+        logger.info("🔔 Event subscriber disconnected")
+    except Exception as e:
+        logger.error(f"❌ Event WebSocket error: {str(e)}")
+        await websocket.close()
+
+
+@app.websocket("/ws/chat")
+async def websocket_chat(websocket: WebSocket):
+    """
+    WebSocket chat with LIA Core™, streamed token by token
+
+    Send a ChatRequest JSON per message; each reply is streamed as
+    {"type": "start" | "token" | "done" | "error", ...} frames (same payloads
+    as `/api/v1/chat/stream`). One socket can carry a whole conversation.
+    """
+    await websocket.accept()
+    logger.info("💬 Chat WebSocket connected")
+
+    try:
+        while True:
+            try:
+                request = ChatRequest(**await websocket.receive_json())
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                await websocket.send_json({"type": "error", "error": f"Invalid chat request: {str(e)}"})
+                continue
+
+            if lia_chat is None:
+                await websocket.send_json({
+                    "type": "error",
+                    "error": "LIA Chat Engine is not available (failed to start, see server logs)"
+                })
+                continue
+
+            stream_data, frame_key = await get_chat_context(request)
+            events = stream_chat_events(request, stream_data, frame_key, client_identity(websocket))
+            async with aclosing(events):
+                async for event in events:
+                    await websocket.send_json(event)
+
+    except WebSocketDisconnect:
+        logger.info("💬 Chat WebSocket disconnected")
+    except Exception as e:
+        logger.error(f"❌ Chat WebSocket error: {str(e)}")
+        await websocket.close()
+
+
 # ============================================================================
 # DEMONSTRATION ENDPOINTS
 # ============================================================================
@@ -681,24 +1271,25 @@ async def demonstrate_layers():
     ```
     """
     try:
-        # Get raw data
-        raw_data = await ble_simulator.get_current_data()
+        # Get raw data and process through all layers off the event loop
+        raw_data, results = await process_simulator_sample()
 
-        # Process step-by-step with detailed logs
+        # Build step-by-step breakdown with detailed logs
         demonstration = {
             "step_1_raw_data": {
                 "description": "Raw biosignal data from BLE device simulation",
                 "data": raw_data,
+                "aligned_data": results['aligned'],
                 "timestamp": datetime.now().isoformat()
             }
         }
 
         # Clarity™ Layer
-        clarity_result = clarity.process(raw_data)
+        clarity_result = results['clarity']
         demonstration["step_2_clarity_layer"] = {
             "description": "Clarity™: Signal quality assessment and noise reduction",
             "layer": "Clarity™",
-            "input": raw_data,
+            "input": results['aligned'],
             "output": clarity_result,
             "processing_details": {
                 "noise_reduction_algorithm": "Adaptive Wavelet Transform",
@@ -708,7 +1299,7 @@ async def demonstrate_layers():
         }
 
         # iFRS™ Layer
-        ifrs_result = ifrs.process(clarity_result['processed_data'])
+        ifrs_result = results['ifrs']
         demonstration["step_3_ifrs_layer"] = {
             "description": "iFRS™: Intelligent Frequency Response System",
             "layer": "iFRS™",
@@ -722,7 +1313,7 @@ async def demonstrate_layers():
         }
 
         # Timesystems™ Layer
-        timesystems_result = timesystems.process(ifrs_result['enhanced_data'])
+        timesystems_result = results['timesystems']
         demonstration["step_4_timesystems_layer"] = {
             "description": "Timesystems™: Temporal pattern analysis and circadian rhythm detection",
             "layer": "Timesystems™",
@@ -736,12 +1327,7 @@ async def demonstrate_layers():
         }
 
         # LIA Integration
-        lia_insights = lia_engine.analyze(
-            raw_data=raw_data,
-            clarity_result=clarity_result,
-            ifrs_result=ifrs_result,
-            timesystems_result=timesystems_result
-        )
+        lia_insights = results['lia']
         demonstration["step_5_lia_integration"] = {
             "description": "LIA: Lifestyle Intelligence Analysis - Final health insights",
             "layer": "LIA Engine",
@@ -780,8 +1366,90 @@ async def demonstrate_layers():
 # LIA CORE™ CONVERSATIONAL MODULE ENDPOINTS
 # ============================================================================
 
+async def get_chat_context(
+    request: ChatRequest
+) -> Tuple[Optional[StreamDataResponse], Optional[Tuple[str, int]]]:
+    """
+    Current biosignal data for the chat context, if requested and available
+
+    Reuses the latest processed frame while it is younger than
+    LIA_CHAT_FRAME_MAX_AGE seconds (the stream and the event monitor keep
+    it fresh), so concurrent chat requests share one frame and its
+    rendered context instead of each processing a new sample.
+
+    Returns:
+        (frame, (device ID, frame sequence)); the key is None for fallback data
+    """
+    if not request.include_biosignal_context:
+        return None, None
+    frame = latest_frame
+    if frame is None or time.monotonic() - frame[1] > float(os.getenv("LIA_CHAT_FRAME_MAX_AGE", "1.0")):
+        try:
+            stream_data = await get_stream_data()
+        except Exception as e:
+            logger.warning(f"Could not fetch biosignal data for context: {str(e)}")
+            return None, None
+        frame = latest_frame
+        if frame is None or frame[2] is not stream_data:
+            return stream_data, None  # Mockup fallback
+    return frame[2], (ble_simulator.device_id, frame[0])
+
+
+def client_identity(connection: HTTPConnection) -> str:
+    """
+    Caller identity for per-client chat limits
+
+    The remote address (behind a proxy, run uvicorn with
+    `--forwarded-allow-ips` so it is the real client's address). The
+    session_id in the body is chosen by the client and is not an identity.
+    """
+    return connection.client.host if connection.client else "unknown"
+
+
+def get_chat_tools(request: ChatRequest, stream_data: Optional[StreamDataResponse]) -> Optional[ChatToolbox]:
+    """Data access tools for the model (replace the full context block when enabled)"""
+    if not request.include_biosignal_context or not lia_chat.tools_enabled:
+        return None
+    return ChatToolbox(pipeline, ble_simulator.device_id, stream_data, session_manager)
+
+
+async def stream_chat_events(
+    request: ChatRequest,
+    stream_data: Optional[StreamDataResponse],
+    frame_key: Optional[Tuple[str, int]] = None,
+    client_id: str = "anonymous"
+):
+    """LIA chat stream events for one message, with the interaction logged at the end"""
+    started = time.monotonic()
+    first_token_at = None
+    success = False
+
+    chat_stream = lia_chat.chat_stream(
+        user_message=request.message,
+        stream_data=stream_data,
+        session_id=request.session_id,
+        include_context=request.include_biosignal_context,
+        tools=get_chat_tools(request, stream_data),
+        frame_key=frame_key,
+        client_id=client_id
+    )
+    async with aclosing(chat_stream):
+        async for event in chat_stream:
+            if event['type'] == 'token' and first_token_at is None:
+                first_token_at = time.monotonic()
+            success = event['type'] == 'done'
+            yield event
+
+    ttft = f"{first_token_at - started:.2f}s" if first_token_at else "n/a"
+    processing_logger.info(
+        f"LIA_CHAT_STREAM | session={request.session_id} | "
+        f"message_length={len(request.message)} | "
+        f"time_to_first_token={ttft} | success={success}"
+    )
+
+
 @app.post("/api/v1/chat", tags=["LIA Chat"], response_model=ChatResponse)
-async def chat_with_lia(request: ChatRequest):
+async def chat_with_lia(request: ChatRequest, http_request: Request):
     """
     Chat with LIA Core™ - Natural Language Interface
 
@@ -826,32 +1494,40 @@ async def chat_with_lia(request: ChatRequest):
         if lia_chat is None:
             raise HTTPException(
                 status_code=503,
-                detail="LIA Chat Engine is not available. Please check OpenAI API key configuration."
+                detail="LIA Chat Engine is not available (failed to start, see server logs)"
             )
 
         # Get current biosignal data if context is requested
-        stream_data = None
-        if request.include_biosignal_context:
-            try:
-                stream_data = await get_stream_data()
-            except Exception as e:
-                logger.warning(f"Could not fetch biosignal data for context: {str(e)}")
+        stream_data, frame_key = await get_chat_context(request)
 
         # Process chat request
-        result = lia_chat.chat(
+        result = await lia_chat.chat(
             user_message=request.message,
             stream_data=stream_data,
             session_id=request.session_id,
-            include_context=request.include_biosignal_context
+            include_context=request.include_biosignal_context,
+            tools=get_chat_tools(request, stream_data),
+            frame_key=frame_key,
+            client_id=client_identity(http_request)
         )
 
         # Log the interaction
         processing_logger.info(
             f"LIA_CHAT | session={request.session_id} | "
             f"message_length={len(request.message)} | "
-            f"success={result['success']}"
+            f"success={result['success']} | cached={result.get('cached', False)} | "
+            f"intents={','.join(result.get('intents') or []) or '-'}"
         )
 
+        # Rate limited (429), provider circuit open or no provider configured (503)
+        if result.get("status_code"):
+            retry_after = result["retry_after"]
+            raise HTTPException(
+                status_code=result["status_code"],
+                detail=result["error"],
+                headers={"Retry-After": str(max(1, round(retry_after)))} if retry_after is not None else None
+            )
+
         return ChatResponse(**result)
 
     except HTTPException:
@@ -861,6 +1537,43 @@ async def chat_with_lia(request: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/v1/chat/stream", tags=["LIA Chat"])
+async def chat_with_lia_stream(request: ChatRequest, http_request: Request):
+    """
+    Chat with LIA Core™ - streamed token by token (Server-Sent Events)
+
+    Same request body as `/api/v1/chat`. The response is an SSE stream:
+    - `event: start` - `{"session_id", "model"}`
+    - `event: tool` - `{"name"}` when LIA reads data through a tool
+    - `event: token` - `{"content": "<text delta>"}` as tokens arrive
+    - `event: done` - full `response`, `tokens_used`, `timestamp`
+    - `event: error` - `error` and a fallback `response` (plus `status_code`
+      and `retry_after` when rate limited or the provider is unavailable or
+      not configured)
+
+    The exchange is added to the session history when the completion finishes.
+    """
+    if lia_chat is None:
+        raise HTTPException(
+            status_code=503,
+            detail="LIA Chat Engine is not available (failed to start, see server logs)"
+        )
+
+    stream_data, frame_key = await get_chat_context(request)
+    client_id = client_identity(http_request)
+
+    async def event_stream():
+        async with aclosing(stream_chat_events(request, stream_data, frame_key, client_id)) as events:
+            async for event in events:
+                payload = json.dumps({key: value for key, value in event.items() if key != 'type'})
+                yield f"event: {event['type']}\ndata: {payload}\n\n"
+
+    return StreamingResponse(
+        event_stream(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/api/v1/chat/history/{session_id}", tags=["LIA Chat"], response_model=ConversationHistoryResponse)
 async def get_chat_history(session_id: str):
     """
@@ -881,7 +1594,7 @@ async def get_chat_history(session_id: str):
                 detail="LIA Chat Engine is not available"
             )
 
-        history = lia_chat.get_conversation_history(session_id)
+        history = await lia_chat.get_conversation_history(session_id)
 
         return ConversationHistoryResponse(
             session_id=session_id,
@@ -927,12 +1640,48 @@ async def clear_chat_history(session_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/v1/chat/cache", tags=["LIA Chat"], response_model=ChatCacheStats)
+async def get_chat_cache_stats():
+    """
+    Response cache statistics
+
+    Repeated questions about unchanged (quantized) vitals are answered from
+    the cache without an API call. Configure with `LIA_CHAT_CACHE_SIZE`
+    and `LIA_CHAT_CACHE_TTL` (seconds); 0 disables the cache.
+    """
+    if lia_chat is None:
+        raise HTTPException(status_code=503, detail="LIA Chat Engine is not available")
+    return ChatCacheStats(**lia_chat.response_cache.stats())
+
+
+@app.get("/api/v1/chat/status", tags=["LIA Chat"], response_model=ChatProviderStatus)
+async def get_chat_status():
+    """
+    LLM provider and admission control status
+
+    Shows the completion backend (`LIA_CHAT_PROVIDER`), the circuit breaker
+    state, completions in progress, the per-client rate limit and how many
+    requests shared an identical in-flight completion.
+    """
+    if lia_chat is None:
+        raise HTTPException(status_code=503, detail="LIA Chat Engine is not available")
+    return ChatProviderStatus(**lia_chat.status())
+
+
+@app.delete("/api/v1/chat/cache", tags=["LIA Chat"])
+async def clear_chat_cache():
+    """Drop all cached answers (e.g. after changing the system prompt)"""
+    if lia_chat is None:
+        raise HTTPException(status_code=503, detail="LIA Chat Engine is not available")
+    lia_chat.response_cache.clear()
+    return {"success": True, "message": "LIA chat response cache cleared"}
+
+
 # ============================================================================
 # RUN SERVER
 # ============================================================================
 
 if __name__ == "__main__":
-    import os
     port = int(os.environ.get("PORT", 8000))
     uvicorn.run(
         "app.main:app",
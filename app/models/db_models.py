@@ -174,3 +174,15 @@ class SystemMetric(Base):
     metric_value = Column(Float, nullable=False)
     metric_unit = Column(String(50), nullable=True)
     metric_metadata = Column(JSON, default={})
+
+
+class ChatConversation(Base):
+    """LIA chat history per conversation session (written behind by the conversation store)"""
+    __tablename__ = "chat_conversations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String(100), unique=True, nullable=False, index=True)
+    messages = Column(JSON, default=[])           # Recent user/assistant messages, oldest first
+    summary = Column(Text, nullable=True)         # Rolling summary of older turns
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
@@ -58,6 +58,25 @@ class RhythmClassification(str, Enum):
     ATHLETIC = "athletic"
 
 
+class RollupResolution(str, Enum):
+    SECOND = "1s"
+    MINUTE = "1m"
+    HOUR = "1h"
+    DAY = "1d"
+
+
+class ChangeDirection(str, Enum):
+    INCREASE = "increase"
+    DECREASE = "decrease"
+
+
+class LIAEventType(str, Enum):
+    CONDITION_CHANGED = "condition_changed"
+    RISK_RAISED = "risk_raised"
+    RISK_CLEARED = "risk_cleared"
+    CHANGE_POINT = "change_point"
+
+
 # ============================================================================
 # REQUEST MODELS
 # ============================================================================
@@ -67,6 +86,10 @@ class ConnectionRequest(BaseModel):
     device_type: DeviceType = Field(..., description="Type of wearable device")
     app_version: Optional[str] = Field("1.0.0", description="Mobile app version")
     user_id: Optional[str] = Field(None, description="User identifier")
+    utc_offset_minutes: Optional[int] = Field(
+        None, ge=-720, le=840,
+        description="Wearer's local UTC offset in minutes (e.g. 120 for UTC+2); server timezone if omitted"
+    )
 
 
 class SessionCreateRequest(BaseModel):
@@ -97,11 +120,42 @@ class ConnectionResponse(BaseModel):
     available_features: List[str]
 
 
+# Complete sample (every channel present), as seen by the layers and in responses
 class BiosignalData(BaseModel):
     heart_rate: float = Field(..., description="Heart rate in BPM")
     spo2: float = Field(..., description="Blood oxygen saturation (%)")
     temperature: float = Field(..., description="Body temperature (°C)")
     activity: float = Field(..., description="Activity level (steps/min)")
+    timestamp_ms: Optional[int] = Field(
+        None,
+        description="Device sample time as UTC epoch milliseconds; receive time if omitted"
+    )
+    rr_intervals: Optional[List[float]] = Field(
+        None,
+        description="Inter-beat (RR) intervals in ms since the previous sample; "
+                    "omit if the device does not report beats"
+    )
+
+
+# Device sample as ingested; slow channels may be missing until Timesystems™ aligns them
+class BiosignalSample(BaseModel):
+    heart_rate: float = Field(..., description="Heart rate in BPM")
+    spo2: Optional[float] = Field(
+        None, description="Blood oxygen saturation (%); omit when no new reading (slow channel)"
+    )
+    temperature: Optional[float] = Field(
+        None, description="Body temperature (°C); omit when no new reading (slow channel)"
+    )
+    activity: float = Field(..., description="Activity level (steps/min)")
+    timestamp_ms: Optional[int] = Field(
+        None,
+        description="Device sample time as UTC epoch milliseconds; receive time if omitted"
+    )
+    rr_intervals: Optional[List[float]] = Field(
+        None,
+        description="Inter-beat (RR) intervals in ms since the previous sample; "
+                    "omit if the device does not report beats"
+    )
 
 
 class QualityMetrics(BaseModel):
@@ -135,6 +189,10 @@ class HRVFeatures(BaseModel):
     sdnn: float = Field(..., description="Standard Deviation of NN intervals")
     pnn50: float = Field(..., description="Percentage of successive NN intervals > 50ms")
     hrv_score: float = Field(..., ge=0, le=100, description="Overall HRV health score")
+    sd1: Optional[float] = Field(None, description="Poincaré SD1 - short-term variability (ms)")
+    sd2: Optional[float] = Field(None, description="Poincaré SD2 - long-term variability (ms)")
+    sample_entropy: Optional[float] = Field(None, description="Sample entropy (m=2, r=0.2·SD)")
+    dfa_alpha1: Optional[float] = Field(None, description="Short-term DFA scaling exponent (4-16 beats)")
 
 
 class iFRSLayerResult(BaseModel):
@@ -153,7 +211,15 @@ class PatternRecognition(BaseModel):
     long_term_trend: str
     periodicity_detected: bool
     period_length_seconds: Optional[float]
+    periodicity_confidence: float = Field(0.0, ge=0, le=1, description="Autocorrelation peak strength")
     pattern_confidence: float = Field(..., ge=0, le=1)
+    motif_distance: Optional[float] = Field(
+        None, ge=0, le=1, description="Best recurring-shape match in recent history (0 = identical)"
+    )
+    discord_detected: bool = False
+    discord_score: Optional[float] = Field(
+        None, ge=0, le=1, description="Latest minute's distance to its nearest earlier match"
+    )
 
 
 class CircadianAlignment(BaseModel):
@@ -161,6 +227,20 @@ class CircadianAlignment(BaseModel):
     actual_heart_rate: float
     alignment_score: float = Field(..., ge=0, le=1)
     phase_shift_minutes: float
+    # Personalised cosinor model (None until enough hours are observed)
+    personalized: bool = False
+    expected_temperature: Optional[float] = None
+    heart_rate_amplitude: Optional[float] = None
+    acrophase_hour: Optional[float] = Field(None, ge=0, lt=24)
+
+
+class ChangePointEvent(BaseModel):
+    channel: str
+    direction: ChangeDirection
+    onset: datetime = Field(..., description="Estimated start of the new regime")
+    detected_at: datetime
+    previous_mean: float
+    current_mean: float
 
 
 class TimesystemsLayerResult(BaseModel):
@@ -172,6 +252,13 @@ class TimesystemsLayerResult(BaseModel):
     pattern_recognition: PatternRecognition
     circadian_alignment: CircadianAlignment
     rhythm_score: float = Field(..., ge=0, le=100)
+    change_points: List[ChangePointEvent] = Field(
+        default_factory=list, description="Regime changes detected on this sample"
+    )
+    channel_staleness_seconds: Dict[str, float] = Field(
+        default_factory=dict, description="Time since each channel's last real reading"
+    )
+    stale_channels: List[str] = Field(default_factory=list)
     processing_notes: str
 
 
@@ -192,6 +279,7 @@ class LIAInsights(BaseModel):
     wellness_assessment: WellnessAssessment
     risk_factors: List[str] = Field(default_factory=list)
     positive_indicators: List[str] = Field(default_factory=list)
+    lia_version: Optional[str] = Field(None, description="LIA model registry version used")
 
 
 class StreamDataResponse(BaseModel):
@@ -244,6 +332,124 @@ class LayerProcessingLog(BaseModel):
     data: Optional[Dict[str, Any]] = None
 
 
+class RollupPoint(BaseModel):
+    timestamp: datetime = Field(..., description="Bucket start time")
+    count: int = Field(..., description="Samples aggregated in the bucket")
+    mean: float
+    std: float
+    min: float
+    max: float
+
+
+class RollupSeriesResponse(BaseModel):
+    device_id: str
+    channel: str
+    resolution: RollupResolution
+    points: List[RollupPoint]
+    late_samples_merged: int = Field(
+        0, description="Out-of-order samples merged into already closed buckets at this resolution"
+    )
+    late_samples_dropped: int = Field(
+        0, description="Out-of-order samples whose bucket was empty or no longer retained at this resolution"
+    )
+
+
+class MotifMatch(BaseModel):
+    first_start: datetime
+    second_start: datetime
+    distance: float = Field(..., ge=0, le=1)
+
+
+class DiscordMatch(BaseModel):
+    start: datetime
+    distance: float = Field(..., ge=0, le=1)
+
+
+class MatrixProfileResponse(BaseModel):
+    device_id: str
+    channel: str
+    resolution: RollupResolution
+    window: int
+    subsequences: int
+    motifs: List[MotifMatch]
+    discords: List[DiscordMatch]
+
+
+class ChangePointsResponse(BaseModel):
+    device_id: str
+    events: List[ChangePointEvent]
+
+
+class BiosignalBatchRequest(BaseModel):
+    device_id: str = Field(..., description="Device the buffered samples belong to")
+    samples: List[BiosignalSample] = Field(
+        ..., min_length=1, max_length=10000,
+        description="Buffered samples in device order, each with timestamp_ms"
+    )
+
+
+class BiosignalBatchResponse(BaseModel):
+    device_id: str
+    samples_processed: int
+    first_sample_at: datetime
+    last_sample_at: datetime
+    latest: StreamDataResponse
+
+
+class FleetDeviceCondition(BaseModel):
+    device_id: str
+    condition: str
+    risk_factors: List[str]
+    positive_indicators: List[str]
+    lia_version: str
+
+
+class FleetConditionsResponse(BaseModel):
+    timestamp: datetime
+    device_count: int
+    devices: List[FleetDeviceCondition]
+
+
+class LIAEvent(BaseModel):
+    event_id: int = Field(..., description="Monotonic id (increasing across restarts); resume with after= / Last-Event-ID")
+    device_id: str
+    type: LIAEventType
+    timestamp: datetime = Field(..., description="Time of the sample that confirmed the event")
+    condition: Optional[str] = None
+    previous_condition: Optional[str] = None
+    risk_factor: Optional[str] = None
+    confidence: Optional[float] = Field(None, ge=0, le=1, description="LIA confidence; not set for change points")
+    lia_version: Optional[str] = None
+    # change_point events only
+    channel: Optional[str] = None
+    direction: Optional[ChangeDirection] = None
+    onset: Optional[datetime] = Field(None, description="Estimated start of the new regime")
+    previous_mean: Optional[float] = None
+    current_mean: Optional[float] = None
+
+
+class LIAEventsResponse(BaseModel):
+    events: List[LIAEvent]
+    last_event_id: int = Field(..., description="Pass as `after` on the next poll")
+
+
+class LIAModelVersionInfo(BaseModel):
+    loaded_at: datetime
+    rules_version: Optional[int] = None
+    classifier_version: Optional[str] = None
+
+
+class LIAModelRegistryResponse(BaseModel):
+    active_version: str
+    available_versions: List[str]
+    pins: Dict[str, str] = Field(default_factory=dict, description="device_id → pinned version")
+    loaded: Dict[str, LIAModelVersionInfo]
+
+
+class LIAModelVersionRequest(BaseModel):
+    version: str = Field(..., description="Registry version directory name")
+
+
 # ============================================================================
 # CONFIGURATION MODELS
 # ============================================================================
@@ -320,7 +526,7 @@ class APIInfo(BaseModel):
 
 class ChatRequest(BaseModel):
     message: str = Field(..., description="User's message to LIA", min_length=1)
-    session_id: Optional[str] = Field("default", description="Conversation session ID")
+    session_id: Optional[str] = Field("default", description="Conversation session ID", max_length=100)
     include_biosignal_context: bool = Field(True, description="Include current biosignal data in context")
 
 
@@ -331,9 +537,34 @@ class ChatResponse(BaseModel):
     session_id: str = Field(..., description="Conversation session ID")
     tokens_used: Optional[int] = Field(None, description="Number of tokens used")
     model: Optional[str] = Field(None, description="AI model used")
+    cached: bool = Field(False, description="Whether the answer was served from the response cache")
+    intents: Optional[List[str]] = Field(None, description="Metrics answered locally without the AI model")
     error: Optional[str] = Field(None, description="Error message if failed")
 
 
+class ChatCacheStats(BaseModel):
+    entries: int = Field(..., description="Cached answers")
+    max_entries: int = Field(..., description="Cache capacity (LRU eviction beyond it)")
+    ttl_seconds: float = Field(..., description="Lifetime of a cached answer")
+    hits: int = Field(..., description="Questions answered from the cache")
+    misses: int = Field(..., description="Cacheable questions sent to the model")
+    evictions: int = Field(..., description="Answers evicted to stay within capacity")
+    hit_rate: float = Field(..., description="hits / (hits + misses)")
+    tokens_saved: int = Field(..., description="API tokens the cache hits would have used")
+
+
+class ChatProviderStatus(BaseModel):
+    provider: str = Field(..., description="Completion backend (openai, local, or none: local answers only)")
+    model: str = Field(..., description="Model answering chat requests")
+    circuit_breaker: str = Field(..., description="closed, open (failing fast) or half_open (probing)")
+    consecutive_failures: int = Field(..., description="Provider failures since the last success")
+    active_completions: int = Field(..., description="Completions in progress")
+    max_concurrency: int = Field(..., description="Concurrent completion limit")
+    rate_limit_per_minute: float = Field(..., description="Sustained chat requests per client and minute (0: unlimited)")
+    rate_limit_burst: int = Field(..., description="Requests a client may send at once")
+    coalesced_requests: int = Field(..., description="Requests that shared an identical in-flight completion")
+
+
 class ConversationHistoryResponse(BaseModel):
     session_id: str = Field(..., description="Conversation session ID")
     history: List[Dict[str, str]] = Field(..., description="Conversation history")
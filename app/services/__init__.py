@@ -5,3 +5,4 @@ from .ifrs import iFRSLayer
 from .timesystems import TimesystemsLayer
 from .lia_integration import LIAEngine
 from .session_manager import SessionManager
+from .pipeline import DevicePipeline, PipelineRunner
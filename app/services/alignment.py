@@ -0,0 +1,127 @@
+"""
+Multi-Rate Alignment - Common time base for channels sampled at different rates
+Per-channel observation history, vectorized hold/interpolation and staleness
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.utils.ring_buffer import ColumnarRingBuffer
+
+
+class MultiRateAligner:
+    """
+    Aligns asynchronously sampled channels onto requested timestamps
+
+    Each channel keeps only its own real observations (with timestamps), so
+    a 1 Hz temperature sensor is stored and analysed at 1 Hz even when heart
+    rate arrives at 10 Hz. Values at arbitrary times are produced by:
+    - hold: last observation at or before the time (causal, live streams)
+    - linear: interpolation between neighbouring observations (buffered
+      blocks, where later readings are already known)
+
+    A channel is stale when its newest observation is older than
+    `stale_after_periods` nominal sample periods.
+    """
+
+    # Nominal sample rates (Hz) of a typical wrist device
+    DEFAULT_RATES = {
+        'heart_rate': 10.0,
+        'activity': 10.0,
+        'spo2': 1.0,
+        'temperature': 1.0
+    }
+
+    def __init__(
+        self, channels: Sequence[str], rates: Optional[Dict[str, float]] = None,
+        history: int = 64, stale_after_periods: float = 3.0
+    ):
+        self.channels = tuple(channels)
+        self.rates = {**self.DEFAULT_RATES, **(rates or {})}
+        self.stale_after_periods = stale_after_periods
+        self.observations = {
+            channel: ColumnarRingBuffer(history, ('value',), dtype=np.float64)
+            for channel in self.channels
+        }
+
+    def stale_after_ms(self, channel: str) -> float:
+        """Age (ms) beyond which a channel's latest reading is stale"""
+        return self.stale_after_periods * 1000.0 / self.rates[channel]
+
+    def observe(self, timestamp_ms: int, values: Dict[str, Optional[float]]) -> List[str]:
+        """
+        Record the channels present in one device sample
+
+        Returns:
+            Channels that carried a new reading (None values are skipped)
+        """
+        fresh = []
+        for channel in self.channels:
+            value = values.get(channel)
+            if value is None:
+                continue
+            buffer = self.observations[channel]
+            newest = buffer.timestamps(1)
+            if len(newest) and timestamp_ms < newest[0]:
+                continue  # Out-of-order reading; history stays time-sorted
+            buffer.append(timestamp_ms, (value,))
+            fresh.append(channel)
+        return fresh
+
+    def latest(self, channel: str) -> Optional[Tuple[int, float]]:
+        """(timestamp_ms, value) of a channel's newest observation"""
+        buffer = self.observations[channel]
+        if len(buffer) == 0:
+            return None
+        return int(buffer.timestamps(1)[0]), buffer.latest('value')
+
+    def align(
+        self, timestamps_ms: np.ndarray,
+        extra: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None,
+        interpolate: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Values and ages of every channel at a block of timestamps
+
+        Args:
+            timestamps_ms: Sorted int64 target times
+            extra: Per-channel (times, values) observations not yet recorded,
+                appended after the stored history (e.g. a buffered upload)
+            interpolate: Linear interpolation between observations instead of hold
+
+        Returns:
+            (values, age_ms): float arrays of shape [len(timestamps_ms), channels];
+            NaN / inf where a channel has no observation yet
+        """
+        timestamps_ms = np.asarray(timestamps_ms, dtype=np.int64)
+        values = np.full((len(timestamps_ms), len(self.channels)), np.nan)
+        ages = np.full((len(timestamps_ms), len(self.channels)), np.inf)
+
+        for c, channel in enumerate(self.channels):
+            buffer = self.observations[channel]
+            times, observed = buffer.timestamps(), buffer.column('value')
+            if extra and channel in extra:
+                times = np.concatenate([times, extra[channel][0]])
+                observed = np.concatenate([observed, extra[channel][1]])
+            if len(times) == 0:
+                continue
+
+            # Index of the last observation at or before each target time
+            previous = np.searchsorted(times, timestamps_ms, side='right') - 1
+            known = previous >= 0
+
+            held = observed[np.maximum(previous, 0)]
+            if interpolate:
+                held = np.interp(timestamps_ms, times, observed)
+
+            values[known, c] = held[known]
+            ages[known, c] = timestamps_ms[known] - times[previous[known]]
+
+        return values, ages
+
+    def record_block(self, extra: Dict[str, Tuple[np.ndarray, np.ndarray]]):
+        """Store a block's observations (newest `history` per channel are kept)"""
+        for channel, (times, observed) in extra.items():
+            buffer = self.observations[channel]
+            for timestamp_ms, value in zip(times[-buffer.capacity:], observed[-buffer.capacity:]):
+                buffer.append(int(timestamp_ms), (float(value),))
@@ -9,7 +9,8 @@ from datetime import datetime
 from typing import Dict, Optional
 import random
 
-from app.models.schemas import BiosignalData, DeviceStatus
+from app.models.schemas import BiosignalSample, DeviceStatus
+from app.utils.timebase import now_ms
 
 
 class BLESimulator:
@@ -41,8 +42,22 @@ class BLESimulator:
             'activity': {'freq': 0.15, 'amplitude': 40}
         }
 
+        # Beat-to-beat (RR) interval generation
+        self.update_interval = 0.1  # seconds (10Hz update rate)
+        self.beat_clock = 0.0  # seconds until the next simulated beat
+        self.respiratory_freq = 0.25  # Hz, drives respiratory sinus arrhythmia
+        self.rsa_amplitude = 0.04  # fraction of the mean RR interval
+        self.elapsed_seconds = 0.0
+        self.pending_rr = []  # RR intervals not yet delivered to a reader
+        self.max_pending_rr = 64
+
         # Current data cache
         self.current_data = None
+        self.current_timestamp_ms = None  # Device clock at sample time
+
+        # Slow sensors report at their own rate (seconds between readings)
+        self.channel_periods = {'spo2': 1.0, 'temperature': 1.0}
+        self.last_reported_ms: Dict[str, int] = {}
         self.last_update = None
 
         # Background update task
@@ -68,6 +83,8 @@ class BLESimulator:
         while self.is_running:
             try:
                 self.current_data = self._generate_biosignal_data()
+                self.current_timestamp_ms = now_ms()
+                self._generate_rr_intervals(self.current_data['heart_rate'])
                 self.last_update = datetime.now()
 
                 # Slowly drain battery
@@ -77,7 +94,7 @@ class BLESimulator:
                 self.signal_strength = random.randint(-70, -40)
 
                 # Wait 100ms (10Hz update rate)
-                await asyncio.sleep(0.1)
+                await asyncio.sleep(self.update_interval)
 
             except asyncio.CancelledError:
                 break
@@ -121,12 +138,58 @@ class BLESimulator:
 
         return data
 
-    async def get_current_data(self) -> BiosignalData:
-        """Get current biosignal data"""
+    def _generate_rr_intervals(self, heart_rate: float):
+        """
+        Generate the beats that occurred during the last update interval
+
+        RR intervals follow the current heart rate, modulated by respiratory
+        sinus arrhythmia plus beat-to-beat noise, like a real PPG/ECG sensor.
+        """
+        self.elapsed_seconds += self.update_interval
+        self.beat_clock -= self.update_interval
+
+        while self.beat_clock <= 0:
+            mean_rr = 60000.0 / heart_rate
+            rsa = self.rsa_amplitude * mean_rr * np.sin(
+                2 * np.pi * self.respiratory_freq * self.elapsed_seconds
+            )
+            rr = mean_rr + rsa + np.random.normal(0, mean_rr * 0.02)
+
+            self.pending_rr.append(round(float(rr), 1))
+            self.beat_clock += rr / 1000.0
+
+        # A device only buffers a limited number of undelivered beats
+        if len(self.pending_rr) > self.max_pending_rr:
+            self.pending_rr = self.pending_rr[-self.max_pending_rr:]
+
+    async def get_current_data(self) -> BiosignalSample:
+        """
+        Get current biosignal data
+
+        RR intervals are delivered once: each read drains the beats that
+        accumulated since the previous read (an empty list means no beat).
+        Slow channels (SpO2, temperature) are only included when a new
+        reading is due, like a real multi-rate sensor.
+        """
         if self.current_data is None:
             self.current_data = self._generate_biosignal_data()
-
-        return BiosignalData(**self.current_data)
+            self.current_timestamp_ms = now_ms()
+
+        rr_intervals, self.pending_rr = self.pending_rr, []
+
+        sample = dict(self.current_data)
+        for channel, period in self.channel_periods.items():
+            last = self.last_reported_ms.get(channel)
+            if last is not None and self.current_timestamp_ms - last < period * 1000:
+                sample[channel] = None
+            else:
+                self.last_reported_ms[channel] = self.current_timestamp_ms
+
+        return BiosignalSample(
+            **sample,
+            timestamp_ms=self.current_timestamp_ms,
+            rr_intervals=rr_intervals
+        )
 
     async def get_device_status(self) -> DeviceStatus:
         """Get current device status"""
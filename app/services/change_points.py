@@ -0,0 +1,132 @@
+"""
+Online Change-Point Detection - Regime shifts per biosignal channel
+Two-sided Page-Hinkley test with O(1) cost per observation
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+
+class PageHinkleyDetector:
+    """
+    Two-sided Page-Hinkley test for shifts in the mean
+
+    Tracks the cumulative deviation from the running regime mean, minus
+    (plus) a tolerance `delta`, and alarms when it rises (falls) more than
+    `threshold` from its extreme. The sample where the extreme was reached
+    is the estimated change onset. The detector restarts after each alarm
+    so the new regime becomes the reference.
+    """
+
+    def __init__(self, delta: float, threshold: float, min_samples: int = 10):
+        """
+        Args:
+            delta: Shift magnitude tolerated as noise (channel units)
+            threshold: Cumulative deviation that triggers an alarm
+            min_samples: Observations before alarms are allowed
+        """
+        self.delta = delta
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.mean = 0.0
+        self.total = 0.0
+
+        self.cum_up = 0.0
+        self.min_up = 0.0
+        self.up_onset = (None, 0, 0.0)  # (timestamp, count, total) at the extreme
+
+        self.cum_down = 0.0
+        self.max_down = 0.0
+        self.down_onset = (None, 0, 0.0)
+
+    def update(self, value: float, timestamp_ms: int) -> Optional[Dict]:
+        """
+        Add one observation
+
+        Returns:
+            Change dict (direction, onset_ms, detected_ms, previous_mean,
+            current_mean) when a shift is detected, else None
+        """
+        if self.count == 0:
+            self.up_onset = self.down_onset = (timestamp_ms, 0, 0.0)
+
+        self.count += 1
+        self.total += value
+        self.mean += (value - self.mean) / self.count
+
+        self.cum_up += value - self.mean - self.delta
+        if self.cum_up < self.min_up:
+            self.min_up = self.cum_up
+            self.up_onset = (timestamp_ms, self.count, self.total)
+
+        self.cum_down += value - self.mean + self.delta
+        if self.cum_down > self.max_down:
+            self.max_down = self.cum_down
+            self.down_onset = (timestamp_ms, self.count, self.total)
+
+        if self.count < self.min_samples:
+            return None
+
+        if self.cum_up - self.min_up > self.threshold:
+            direction, onset = 'increase', self.up_onset
+        elif self.max_down - self.cum_down > self.threshold:
+            direction, onset = 'decrease', self.down_onset
+        else:
+            return None
+
+        onset_ms, onset_count, onset_total = onset
+        after = self.count - onset_count
+        change = {
+            'direction': direction,
+            'onset_ms': onset_ms,
+            'detected_ms': timestamp_ms,
+            'previous_mean': onset_total / onset_count if onset_count else self.mean,
+            'current_mean': (self.total - onset_total) / after if after else value
+        }
+
+        self.reset()
+        return change
+
+
+class ChangePointMonitor:
+    """
+    One Page-Hinkley detector per channel
+
+    Thresholds are in channel units per observation; they are tuned for
+    1 s mean values, which keeps detection independent of the device's
+    sample rate and much less sensitive to per-sample noise.
+    """
+
+    # channel: (delta, threshold)
+    DEFAULT_PARAMETERS = {
+        'heart_rate': (1.0, 40.0),
+        'spo2': (0.5, 8.0),
+        'temperature': (0.05, 1.0),
+        'activity': (5.0, 150.0)
+    }
+
+    def __init__(self, channels: Sequence[str], parameters: Optional[Dict[str, tuple]] = None):
+        parameters = {**self.DEFAULT_PARAMETERS, **(parameters or {})}
+        self.channels = tuple(channels)
+        self.detectors = {
+            channel: PageHinkleyDetector(*parameters[channel])
+            for channel in self.channels
+        }
+
+    def update(self, timestamp_ms: int, values: Sequence[float]) -> List[Dict]:
+        """
+        Feed one observation per channel
+
+        Returns:
+            Change dicts (with 'channel') detected on this observation
+        """
+        changes = []
+        for channel, value in zip(self.channels, values):
+            change = self.detectors[channel].update(float(value), timestamp_ms)
+            if change is not None:
+                change['channel'] = channel
+                changes.append(change)
+        return changes
@@ -0,0 +1,191 @@
+"""
+LIA Chat Cache - Reuse answers to repeated questions
+Keyed on the normalized question and a quantized snapshot of the vitals it is about
+"""
+
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+from app.models.schemas import StreamDataResponse
+from app.services.chat_topics import topics_in
+
+# Words that do not change what is being asked
+FILLER_WORDS = {
+    "a", "an", "the", "please", "lia", "hey", "hi", "hello", "can", "could",
+    "would", "you", "tell", "me", "show", "give", "right", "now", "currently", "current"
+}
+
+SYNONYMS = {
+    "hr": "heart rate", "pulse": "heart rate", "bpm": "heart rate",
+    "o2": "oxygen", "spo2": "oxygen", "saturation": "oxygen",
+    "temp": "temperature", "fever": "temperature",
+    "steps": "activity", "exercise": "activity",
+    "variability": "hrv"
+}
+
+# Words that only make sense against earlier turns of the conversation
+FOLLOW_UP_WORDS = {"it", "that", "this", "those", "these", "them", "more", "else", "again", "why", "also"}
+
+# Question topic → vitals the answer depends on (condition and quality are always included)
+TOPIC_FIELDS = {
+    "heart_rate": ("heart_rate",),
+    "hrv": ("hrv", "heart_rate"),
+    "spo2": ("spo2",),
+    "temperature": ("temperature",),
+    "activity": ("activity",),
+    "sleep": ("circadian_phase",),
+    "circadian": ("circadian_phase",),
+    "stress": ("hrv", "heart_rate"),
+    "risk": ("risk_factors",),
+}
+
+
+def normalize_question(text: str) -> str:
+    """Lowercase, strip punctuation and filler words, map synonyms"""
+    words = re.sub(r"[^a-z0-9 ]+", " ", text.lower()).split()
+    words = [SYNONYMS.get(word, word) for word in words if word not in FILLER_WORDS]
+    return " ".join(words)
+
+
+def quantize_vitals(stream_data: StreamDataResponse) -> Dict[str, Hashable]:
+    """
+    Coarse snapshot of the values a chat answer refers to
+
+    Buckets are narrow enough that a cached answer quoting a value is still
+    accurate to within a bucket (5 BPM, 1% SpO2, 0.5°C, 10 steps/min,
+    10 HRV points).
+    """
+    raw = stream_data.raw_signals
+    return {
+        "heart_rate": int(raw.heart_rate // 5) * 5,
+        "spo2": int(raw.spo2),
+        "temperature": round(raw.temperature * 2) / 2,
+        "activity": int(raw.activity // 10) * 10,
+        "hrv": int(stream_data.ifrs_layer.hrv_features.hrv_score // 10) * 10,
+        "circadian_phase": stream_data.timesystems_layer.circadian_phase.value,
+        "risk_factors": tuple(sorted(stream_data.lia_insights.risk_factors)),
+        "condition": stream_data.lia_insights.condition,
+        "quality": stream_data.clarity_layer.quality_assessment.value,
+    }
+
+
+class TTLCache:
+    """
+    Bounded mapping with per-entry expiry and least-recently-used eviction
+
+    An OrderedDict keeps entries in recency order: a hit moves the entry to
+    the end, inserts evict from the front once `max_entries` is reached.
+    Expired entries are dropped when they are looked up.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[Hashable, Tuple[float, object]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: Hashable) -> Optional[object]:
+        entry = self.entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: object):
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+class ChatResponseCache:
+    """
+    Cached LIA answers for repeated questions
+
+    The key is the normalized question plus the quantized vitals the
+    question is about: a heart-rate question only varies with the heart rate
+    bucket, condition and signal quality, so answers stay valid while
+    unrelated vitals move. Questions matching no topic key on the full
+    snapshot; questions asked without biosignal context key on the text only.
+
+    Follow-up questions ("why is that?") depend on the conversation and are
+    never cached once a session has history.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 300.0):
+        self.cache = TTLCache(max_entries, ttl_seconds)
+        self.tokens_saved = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.cache.max_entries > 0 and self.cache.ttl_seconds > 0
+
+    def key(
+        self, user_message: str, stream_data: Optional[StreamDataResponse],
+        include_context: bool, has_history: bool
+    ) -> Optional[Tuple]:
+        """Cache key for a question, or None if the answer must not be cached"""
+        if not self.enabled:
+            return None
+
+        question = normalize_question(user_message)
+        if not question or (has_history and FOLLOW_UP_WORDS.intersection(question.split())):
+            return None
+        if not (include_context and stream_data):
+            return (question, None)
+
+        vitals = quantize_vitals(stream_data)
+        fields = {"condition", "quality"}
+        for topic in topics_in(question):
+            fields.update(TOPIC_FIELDS.get(topic, ()))
+        if fields == {"condition", "quality"}:
+            fields = set(vitals)
+
+        return (question, tuple(sorted((field, vitals[field]) for field in fields)))
+
+    def get(self, key: Optional[Tuple]) -> Optional[Dict]:
+        if key is None:
+            return None
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.tokens_saved += entry.get("tokens_used") or 0
+        return entry
+
+    def set(self, key: Optional[Tuple], response: str, model: str, tokens_used: Optional[int]):
+        if key is not None and response:
+            self.cache.set(key, {"response": response, "model": model, "tokens_used": tokens_used})
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self) -> Dict:
+        return {**self.cache.stats(), "tokens_saved": self.tokens_saved}
@@ -0,0 +1,355 @@
+"""
+LIA Chat Context - Token-budgeted prompt assembly
+Keeps every chat prompt under a fixed token cap regardless of session length
+"""
+
+import re
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from app.models.schemas import StreamDataResponse
+from app.services.chat_cache import TTLCache, normalize_question
+from app.services.chat_topics import topics_in
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to a conservative estimate
+    tiktoken = None
+
+# Biosignal context sections: name → question topics (see chat_topics) that make
+# them relevant. Sections without topics are always included.
+CONTEXT_SECTIONS: Dict[str, Tuple[str, ...]] = {
+    "raw": (),
+    "lia": (),
+    "ifrs": ("hrv", "heart_rhythm", "respiratory_rate", "breathing", "stress"),
+    "timesystems": ("sleep", "circadian", "time_of_day"),
+    "clarity": ("signal_quality", "signal"),
+}
+
+
+def _join(items: Sequence[str], empty: str = "None") -> str:
+    return ", ".join(items) if items else empty
+
+
+def _render_header(frame: StreamDataResponse) -> str:
+    return f"CURRENT BIOSIGNAL DATA (as of {frame.timestamp.strftime('%Y-%m-%d %H:%M:%S')}):"
+
+
+def _render_raw(frame: StreamDataResponse) -> str:
+    raw = frame.raw_signals
+    return f"""
+Raw Signals:
+- Heart Rate: {raw.heart_rate:.1f} BPM
+- Blood Oxygen (SpO2): {raw.spo2:.1f}%
+- Body Temperature: {raw.temperature:.1f}°C
+- Activity Level: {raw.activity:.1f} steps/min
+"""
+
+
+def _render_lia(frame: StreamDataResponse) -> str:
+    lia = frame.lia_insights
+    wellness = lia.wellness_assessment
+    return f"""
+LIA Health Insights:
+- Detected Condition: {lia.condition}
+- Confidence: {lia.confidence:.1%}
+- Overall Wellness Score: {lia.wellness_score:.1f}/100
+- Wellness Breakdown:
+  * Cardiovascular Health: {wellness.cardiovascular_health:.1f}/100
+  * Respiratory Health: {wellness.respiratory_health:.1f}/100
+  * Activity Level: {wellness.activity_level:.1f}/100
+  * Stress Level: {wellness.stress_level:.1f}/100
+- Risk Factors: {_join(lia.risk_factors, 'None identified')}
+- Positive Indicators: {_join(lia.positive_indicators)}
+- Recommendation: {lia.recommendation}
+"""
+
+
+def _render_ifrs(frame: StreamDataResponse) -> str:
+    ifrs = frame.ifrs_layer
+    hrv = ifrs.hrv_features
+    return f"""
+iFRS™ Layer (Frequency Analysis):
+- Dominant Frequency: {ifrs.dominant_frequency:.2f} Hz
+- Rhythm Classification: {ifrs.rhythm_classification.value}
+- HRV Score: {hrv.hrv_score:.1f}/100
+- HRV Metrics:
+  * RMSSD: {hrv.rmssd:.1f} ms
+  * SDNN: {hrv.sdnn:.1f} ms
+  * pNN50: {hrv.pnn50:.1f}%
+- LF/HF Ratio: {ifrs.frequency_bands.lf_hf_ratio:.2f}
+- Respiratory Rate: {ifrs.respiratory_rate:.1f} breaths/min
+"""
+
+
+def _render_timesystems(frame: StreamDataResponse) -> str:
+    timesystems = frame.timesystems_layer
+    return f"""
+Timesystems™ Layer (Temporal Analysis):
+- Pattern Type: {timesystems.pattern_type.value}
+- Circadian Phase: {timesystems.circadian_phase.value}
+- Temporal Consistency: {timesystems.temporal_consistency:.2f}/1.0
+- Rhythm Score: {timesystems.rhythm_score:.1f}/100
+- Circadian Alignment Score: {timesystems.circadian_alignment.alignment_score:.2f}/1.0
+"""
+
+
+def _render_clarity(frame: StreamDataResponse) -> str:
+    clarity = frame.clarity_layer
+    return f"""
+Clarity™ Layer (Signal Quality):
+- Overall Quality Score: {clarity.quality_score:.2f}/1.0
+- Signal-to-Noise Ratio: {clarity.signal_to_noise_ratio:.1f} dB
+- Quality Assessment: {clarity.quality_assessment.value}
+- Artifacts Detected: {_join(clarity.artifacts_detected)}
+"""
+
+
+# Section renderers, in CONTEXT_SECTIONS order
+SECTION_RENDERERS: Dict[str, Callable[[StreamDataResponse], str]] = {
+    "raw": _render_raw,
+    "lia": _render_lia,
+    "ifrs": _render_ifrs,
+    "timesystems": _render_timesystems,
+    "clarity": _render_clarity,
+}
+
+
+class TokenCounter:
+    """
+    Token counts for chat messages
+
+    Uses the model's tiktoken encoding when tiktoken (and its encoding
+    files) are available, otherwise ~3 characters per token, which
+    over-estimates English and numeric text so the budget still holds.
+    """
+
+    MESSAGE_OVERHEAD = 4  # Role and separators per message
+    REPLY_OVERHEAD = 3    # Priming of the assistant reply
+
+    def __init__(self, model: str):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("o200k_base")
+            except Exception:
+                self.encoding = None
+
+    @property
+    def exact(self) -> bool:
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return -(-len(text) // 3)
+
+    def count_messages(self, messages: Sequence[Dict[str, str]]) -> int:
+        return self.REPLY_OVERHEAD + sum(
+            self.MESSAGE_OVERHEAD + self.count(message["content"]) for message in messages
+        )
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Leading part of a text that fits in `max_tokens`"""
+        if self.count(text) <= max_tokens:
+            return text
+        if self.encoding is not None:
+            return self.encoding.decode(self.encoding.encode(text)[:max_tokens]) + "…"
+        return text[:max_tokens * 3] + "…"
+
+
+def summarize_exchange(user_message: str, assistant_message: str) -> str:
+    """One summary line for a past exchange: the question and the gist of the answer"""
+    question = " ".join(user_message.split())[:160]
+    answer = " ".join(assistant_message.split())
+    gist = re.split(r"(?<=[.!?])\s", answer, maxsplit=1)[0][:200]
+    return f"- User asked: {question} | LIA: {gist}"
+
+
+def relevant_sections(user_message: str) -> List[str]:
+    """
+    Context sections a question needs
+
+    Always-on sections plus those whose topics appear in the question;
+    an open question that names no topic gets every section.
+    """
+    topics = topics_in(normalize_question(user_message))
+    always = [name for name, section_topics in CONTEXT_SECTIONS.items() if not section_topics]
+    matched = [
+        name for name, section_topics in CONTEXT_SECTIONS.items()
+        if section_topics and topics.intersection(section_topics)
+    ]
+    return always + matched if matched else list(CONTEXT_SECTIONS)
+
+
+class ContextRenderer:
+    """
+    Biosignal context sections rendered once per frame
+
+    Each section is rendered by its own f-string function, so a question
+    that needs two sections formats two. With a frame key (device ID,
+    frame sequence) the rendered header and sections are cached, so every
+    chat request on the same frame (several users of one device, retries)
+    reuses them; sections not rendered yet are added to the cached frame
+    when first asked for.
+    """
+
+    HEADER = ""  # Cache slot of the header line
+
+    def __init__(self, max_frames: int = 256, ttl_seconds: float = 60.0):
+        self.frames = TTLCache(max_entries=max_frames, ttl_seconds=ttl_seconds)
+
+    def render(
+        self,
+        stream_data: StreamDataResponse,
+        sections: Optional[Iterable[str]] = None,
+        frame_key: Optional[Hashable] = None
+    ) -> Tuple[str, Dict[str, str]]:
+        """
+        Header and requested sections of a frame
+
+        Args:
+            stream_data: Frame to render
+            sections: Section names (all if omitted); unknown names are skipped
+            frame_key: (device ID, frame sequence), or None to render without caching
+
+        Returns:
+            Header line and {section name: text} in the requested order
+        """
+        names = list(SECTION_RENDERERS) if sections is None else [
+            name for name in sections if name in SECTION_RENDERERS
+        ]
+        frame = self.frames.get(frame_key) if frame_key is not None else None
+        if frame is None:
+            frame = {self.HEADER: _render_header(stream_data)}
+            if frame_key is not None:
+                self.frames.set(frame_key, frame)
+
+        for name in names:
+            if name not in frame:
+                frame[name] = SECTION_RENDERERS[name](stream_data)
+        return frame[self.HEADER], {name: frame[name] for name in names}
+
+
+class ChatContextManager:
+    """
+    Token-budgeted chat prompts
+
+    Prompt layout: system prompt, rolling summary of older turns, recent
+    history, biosignal context for this turn only, user message.
+
+    Within `max_prompt_tokens`:
+    1. The system prompt and the user message (truncated to half the
+       budget at most) are always sent.
+    2. `reserve_tokens` are set aside (tool results added after the
+       prompt is built), then the biosignal context sections relevant to
+       the question are added, dropping optional sections (last first) if
+       they do not fit.
+    3. History is added newest first while it fits. Older turns are
+       folded into the rolling summary, which is capped at
+       `summary_tokens` by dropping its oldest lines.
+
+    Summaries are extractive (question plus first sentence of the answer),
+    so compaction costs no extra completion.
+    """
+
+    def __init__(self, model: str, max_prompt_tokens: int = 3000, summary_tokens: int = 300):
+        self.counter = TokenCounter(model)
+        self.max_prompt_tokens = max_prompt_tokens
+        self.summary_tokens = summary_tokens
+
+    def fold(self, summary: str, messages: Sequence[Dict[str, str]]) -> str:
+        """Add user/assistant message pairs to a rolling summary, keeping it within budget"""
+        lines = summary.splitlines() if summary else []
+        pending_question = None
+        for message in messages:
+            if message["role"] == "user":
+                pending_question = message["content"]
+            elif message["role"] == "assistant" and pending_question is not None:
+                lines.append(summarize_exchange(pending_question, message["content"]))
+                pending_question = None
+
+        while len(lines) > 1 and self.counter.count("\n".join(lines)) > self.summary_tokens:
+            lines.pop(0)
+        summary = "\n".join(lines)
+        return self.counter.truncate(summary, self.summary_tokens) if summary else ""
+
+    def build(
+        self,
+        system_prompt: str,
+        user_message: str,
+        history: Sequence[Dict[str, str]] = (),
+        summary: str = "",
+        context_header: str = "",
+        context_sections: Optional[Dict[str, str]] = None,
+        reserve_tokens: int = 0
+    ) -> List[Dict[str, str]]:
+        """
+        Messages for one completion, within `max_prompt_tokens`
+
+        Args:
+            system_prompt: LIA system prompt
+            user_message: Current question
+            history: Stored user/assistant messages, oldest first
+            summary: Rolling summary of turns no longer in `history`
+            context_header: Opening of the biosignal context message
+            context_sections: Rendered context sections for this question, in priority order
+            reserve_tokens: Budget kept free for messages added later (tool results)
+
+        Returns:
+            OpenAI chat messages
+        """
+        count = self.counter.count
+        overhead = TokenCounter.MESSAGE_OVERHEAD
+
+        user_message = self.counter.truncate(user_message, self.max_prompt_tokens // 2)
+        system = {"role": "system", "content": system_prompt}
+        user = {"role": "user", "content": user_message}
+        remaining = self.max_prompt_tokens - self.counter.count_messages([system, user])
+
+        # Biosignal context (current turn only, never stored in history)
+        remaining -= reserve_tokens
+        context_message = None
+        if context_header or context_sections:
+            sections = dict(context_sections or {})
+            while True:
+                content = "\n".join([context_header, *sections.values()]).strip()
+                tokens = count(content) + overhead
+                if tokens <= remaining:
+                    context_message = {"role": "system", "content": content}
+                    remaining -= tokens
+                    break
+                if not sections:
+                    break
+                sections.popitem()
+
+        # Recent history, newest first, reserving room for the summary
+        summary_reserve = self.summary_tokens + overhead + 10 if (summary or history) else 0
+        kept: List[Dict[str, str]] = []
+        budget = remaining - summary_reserve
+        cut = len(history)
+        for index in range(len(history) - 1, -1, -1):
+            tokens = count(history[index]["content"]) + overhead
+            if tokens > budget:
+                break
+            budget -= tokens
+            cut = index
+        # Never start the kept history with an orphaned assistant reply
+        if cut < len(history) and history[cut]["role"] == "assistant":
+            cut += 1
+        kept = list(history[cut:])
+
+        summary = self.fold(summary, history[:cut])
+
+        messages = [system]
+        if summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{summary}"
+            })
+        messages.extend(kept)
+        if context_message:
+            messages.append(context_message)
+        messages.append(user)
+        return messages
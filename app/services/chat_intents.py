@@ -0,0 +1,197 @@
+"""
+LIA Chat Intents - Local answers for direct metric lookups
+"What's my heart rate?" is answered from the current frame in microseconds, without the LLM
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.models.schemas import SignalQuality, StreamDataResponse
+from app.services.chat_cache import normalize_question
+from app.services.chat_topics import TOPIC_PHRASES
+
+# Words a direct lookup may contain besides the metric itself
+LOOKUP_WORDS = {
+    "what", "whats", "s", "is", "are", "how", "my", "level", "levels", "value",
+    "reading", "now", "today", "check", "score", "much", "high", "and", "at", "moment"
+}
+
+# Words that make a lookup about the user's own data rather than a definition
+PERSONAL_WORDS = {"my", "now", "today", "moment"}
+
+
+class IntentRouter:
+    """
+    Keyword router for direct metric lookups
+
+    A question is answered locally only if, after normalization, every
+    word is either part of a metric phrase or a lookup word, and it asks
+    about the user's data ("my", "now") or is just the metric name. Anything
+    else ("why is my heart rate high?", "what is HRV?", "how did I sleep?")
+    goes to the LLM. Up to two metrics can be combined ("heart rate and
+    SpO2").
+    """
+
+    MODEL = "lia-local"  # Reported as the model of local answers
+
+    def __init__(self):
+        self.templates: Dict[str, Callable[[StreamDataResponse], str]] = {
+            "heart_rate": self._heart_rate,
+            "hrv": self._hrv,
+            "spo2": self._spo2,
+            "temperature": self._temperature,
+            "activity": self._activity,
+            "wellness": self._wellness,
+            "condition": self._condition,
+            "signal_quality": self._signal_quality,
+            "respiratory_rate": self._respiratory_rate,
+        }
+
+        # Metric phrases of the normalized question (see normalize_question); longest match wins
+        self.phrases = sorted(
+            ((phrase.split(), intent) for intent in self.templates for phrase in TOPIC_PHRASES[intent]),
+            key=lambda item: -len(item[0])
+        )
+
+    def match(self, user_message: str) -> List[str]:
+        """Intents of a direct lookup question (empty if it needs the LLM)"""
+        words = normalize_question(user_message).split()
+        if not words or len(words) > 10:
+            return []
+
+        intents, rest, i = [], [], 0
+        while i < len(words):
+            for phrase, intent in self.phrases:
+                if words[i:i + len(phrase)] == phrase:
+                    if intent not in intents:
+                        intents.append(intent)
+                    i += len(phrase)
+                    break
+            else:
+                rest.append(words[i])
+                i += 1
+
+        if not intents or len(intents) > 2 or any(word not in LOOKUP_WORDS for word in rest):
+            return []
+        if rest and not PERSONAL_WORDS.intersection(rest):
+            return []
+        return intents
+
+    def answer(self, user_message: str, stream_data: Optional[StreamDataResponse]) -> Optional[Tuple[List[str], str]]:
+        """
+        Templated answer for a direct lookup
+
+        Returns:
+            (intents, response text), or None if the question needs the LLM
+        """
+        if stream_data is None:
+            return None
+        intents = self.match(user_message)
+        if not intents:
+            return None
+
+        parts = [self.templates[intent](stream_data) for intent in intents]
+        if "signal_quality" not in intents and stream_data.clarity_layer.quality_assessment == SignalQuality.POOR:
+            parts.append("Note that signal quality is poor right now, so this reading may be less accurate.")
+        return intents, " ".join(parts)
+
+    # ------------------------------------------------------------------
+    # Templates
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _heart_rate(data: StreamDataResponse) -> str:
+        heart_rate, activity = data.raw_signals.heart_rate, data.raw_signals.activity
+        if heart_rate < 60:
+            band = "below the typical resting range of 60-100 BPM"
+        elif heart_rate <= 100:
+            band = "within the typical resting range of 60-100 BPM"
+        else:
+            band = "above the typical resting range of 60-100 BPM"
+        active = " That's expected while you're active." if heart_rate > 100 and activity > 50 else ""
+        return f"Your heart rate is {heart_rate:.0f} BPM right now, {band}.{active}"
+
+    @staticmethod
+    def _hrv(data: StreamDataResponse) -> str:
+        hrv = data.ifrs_layer.hrv_features
+        level = "good" if hrv.hrv_score >= 60 else "moderate" if hrv.hrv_score >= 40 else "low"
+        return (
+            f"Your HRV score is {hrv.hrv_score:.0f}/100 ({level}), with RMSSD {hrv.rmssd:.0f} ms "
+            f"and SDNN {hrv.sdnn:.0f} ms."
+        )
+
+    @staticmethod
+    def _spo2(data: StreamDataResponse) -> str:
+        spo2 = data.raw_signals.spo2
+        if spo2 >= 95:
+            note = "That's in the normal range (95-100%)."
+        elif spo2 >= 90:
+            note = "That's slightly below the normal range of 95-100%."
+        else:
+            note = (
+                "That's low. If it stays below 90% or you feel short of breath, "
+                "please contact a healthcare provider."
+            )
+        return f"Your blood oxygen (SpO2) is {spo2:.1f}%. {note}"
+
+    @staticmethod
+    def _temperature(data: StreamDataResponse) -> str:
+        temperature = data.raw_signals.temperature
+        if temperature >= 38.0:
+            note = "That's above 38°C, which indicates a fever."
+        elif temperature > 37.2:
+            note = "That's slightly elevated (normal is about 36.1-37.2°C)."
+        elif temperature >= 36.1:
+            note = "That's within the normal range."
+        else:
+            note = "That's slightly below the typical range of 36.1-37.2°C."
+        return f"Your body temperature is {temperature:.1f}°C. {note}"
+
+    @staticmethod
+    def _activity(data: StreamDataResponse) -> str:
+        activity = data.raw_signals.activity
+        if activity < 10:
+            level = "resting"
+        elif activity < 60:
+            level = "light activity"
+        elif activity < 110:
+            level = "moderate activity"
+        else:
+            level = "vigorous activity"
+        return f"Your activity level is {activity:.0f} steps/min ({level})."
+
+    @staticmethod
+    def _wellness(data: StreamDataResponse) -> str:
+        lia = data.lia_insights
+        breakdown = lia.wellness_assessment
+        return (
+            f"Your overall wellness score is {lia.wellness_score:.0f}/100 "
+            f"(cardiovascular {breakdown.cardiovascular_health:.0f}, respiratory {breakdown.respiratory_health:.0f}, "
+            f"activity {breakdown.activity_level:.0f}, stress {breakdown.stress_level:.0f})."
+        )
+
+    @staticmethod
+    def _condition(data: StreamDataResponse) -> str:
+        lia = data.lia_insights
+        risks = f" Risk factors: {', '.join(lia.risk_factors)}." if lia.risk_factors else ""
+        return (
+            f"LIA currently detects: {lia.condition} ({lia.confidence:.0%} confidence).{risks} "
+            f"{lia.recommendation}"
+        )
+
+    @staticmethod
+    def _signal_quality(data: StreamDataResponse) -> str:
+        clarity = data.clarity_layer
+        artifacts = (
+            f" Artifacts detected: {', '.join(clarity.artifacts_detected)}."
+            if clarity.artifacts_detected else ""
+        )
+        return (
+            f"Signal quality is {clarity.quality_assessment.value} "
+            f"(score {clarity.quality_score:.2f}, SNR {clarity.signal_to_noise_ratio:.1f} dB).{artifacts}"
+        )
+
+    @staticmethod
+    def _respiratory_rate(data: StreamDataResponse) -> str:
+        rate = data.ifrs_layer.respiratory_rate
+        note = "within the typical range of 12-20" if 12 <= rate <= 20 else "outside the typical range of 12-20"
+        return f"Your respiratory rate is {rate:.1f} breaths/min, {note}."
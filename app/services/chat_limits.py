@@ -0,0 +1,177 @@
+"""
+LIA Chat Limits - Admission control in front of the LLM provider
+Per-user rate limiting, coalescing of identical in-flight requests and a circuit breaker
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class RateLimited(RuntimeError):
+    """A user exceeded their request rate"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Too many chat requests, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class ProviderUnavailable(RuntimeError):
+    """The circuit breaker is open"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LIA chat is temporarily unavailable, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class ChatBusy(RuntimeError):
+    """Every completion slot stayed busy for the whole queue timeout"""
+
+    def __init__(self, max_concurrency: int, retry_after: float):
+        super().__init__(f"LIA chat is busy ({max_concurrency} requests in progress), please retry")
+        self.retry_after = retry_after
+
+
+class ProviderNotConfigured(RuntimeError):
+    """No LLM provider is configured (missing API key); only local answers are possible"""
+
+    def __init__(self):
+        super().__init__("LIA chat has no LLM provider configured (set OPENAI_API_KEY); only direct lookups are answered")
+
+
+class _LeaderCancelled(Exception):
+    """The caller running a coalesced request went away before it finished"""
+
+
+class RateLimiter:
+    """
+    Token bucket per key
+
+    Each key may burst `burst` requests and then `rate_per_minute`
+    sustained. Buckets live in an LRU-bounded OrderedDict; an evicted key
+    comes back with a full bucket, which is harmless because it had been
+    idle longest.
+    """
+
+    def __init__(self, rate_per_minute: float = 20.0, burst: int = 5, max_keys: int = 10000):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_keys = max_keys
+        self.buckets: "OrderedDict[Hashable, list]" = OrderedDict()  # key → [tokens, last refill]
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def acquire(self, key: Hashable):
+        """Take one request from the key's bucket or raise RateLimited"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        bucket = self.buckets.pop(key, None) or [float(self.burst), now]
+        bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        self.buckets[key] = bucket
+        while len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+
+        if bucket[0] < 1.0:
+            raise RateLimited((1.0 - bucket[0]) / self.rate)
+        bucket[0] -= 1.0
+
+
+class CircuitBreaker:
+    """
+    Fail fast while the provider is failing
+
+    closed → open after `failure_threshold` consecutive failures; open
+    rejects immediately for `reset_timeout` seconds; then half-open lets a
+    single trial request through, which closes the breaker on success or
+    re-opens it on failure.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        """Raise ProviderUnavailable unless a request may go to the provider"""
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return
+        retry_after = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        raise ProviderUnavailable(retry_after or 1.0)
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def cancel_trial(self):
+        """Release the half-open trial without a verdict (the caller gave up)"""
+        self.trial_in_flight = False
+
+    def status(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+
+class RequestCoalescer:
+    """
+    Share one in-flight call between identical requests
+
+    The first caller for a key runs the call; callers arriving with the
+    same key while it runs await the same result (or exception) instead of
+    issuing their own. If that first caller is cancelled (its client
+    disconnected), the waiters are not: one of them runs the call again.
+    """
+
+    def __init__(self):
+        self.inflight: Dict[Hashable, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        while key in self.inflight:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(self.inflight[key])
+            except _LeaderCancelled:
+                continue  # Lead the retry, or join whoever already does
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            future.exception()  # Mark retrieved when nobody else was waiting
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else was waiting
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self.inflight[key]
@@ -0,0 +1,308 @@
+"""
+LIA Chat Tools - Data access for the model through function calls
+The model asks for the data a question needs instead of receiving every metric on every turn
+"""
+
+import json
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.models.schemas import StreamDataResponse
+from app.services.rollups import MultiResolutionRollup
+from app.services.timesystems import TimesystemsLayer
+from app.utils.timebase import now_ms, server_utc_offset_minutes, to_datetime, to_ms
+
+# Rollup resolution → how far back it keeps buckets (ms), finest first
+RESOLUTION_RETENTION = tuple(
+    (name, bucket_ms * capacity) for name, bucket_ms, capacity in MultiResolutionRollup.LEVELS
+)
+
+TOOL_DEFINITIONS: List[Dict[str, Any]] = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_current_vitals",
+            "description": (
+                "Latest reading: heart rate, SpO2, temperature, activity, signal quality, "
+                "detected condition, wellness score, risk factors and recommendation."
+            ),
+            "parameters": {"type": "object", "properties": {}}
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_hrv_summary",
+            "description": (
+                "Current heart rate variability and frequency analysis: HRV score, RMSSD, SDNN, "
+                "pNN50, LF/HF ratio, rhythm classification, respiratory rate, stress level."
+            ),
+            "parameters": {"type": "object", "properties": {}}
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_rollups",
+            "description": (
+                "Historical statistics for a time range (e.g. last night, this morning, the past week). "
+                "Without a channel: count/mean/std/min/max per channel over the range. "
+                "With a channel: also a time series of at most 48 points."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "start": {
+                        "type": "string", "description": "Range start, ISO 8601 (wearer's local time if no offset)"
+                    },
+                    "end": {"type": "string", "description": "Range end, ISO 8601 (default: now)"},
+                    "channel": {"type": "string", "enum": list(TimesystemsLayer.CHANNELS)}
+                },
+                "required": ["start"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_session_summary",
+            "description": (
+                "Summary of a monitoring session (the device's most recent one by default): "
+                "duration, per-channel statistics, average wellness, recent change points, "
+                "current pattern and circadian phase."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "monitoring_session_id": {"type": "string", "description": "Monitoring session ID"}
+                }
+            }
+        }
+    },
+]
+
+
+def _round(value: Any) -> Any:
+    if isinstance(value, float):
+        return round(value, 2)
+    if isinstance(value, dict):
+        return {key: _round(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_round(item) for item in value]
+    return value
+
+
+def _parse_time(value: str, local: tzinfo) -> datetime:
+    """ISO 8601 → aware datetime (values without an offset are in the wearer's timezone)"""
+    parsed = datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=local)
+
+
+def _resolution_for(start_ms: int, now: Optional[int] = None) -> str:
+    """
+    Finest rollup resolution still holding data from `start_ms`
+
+    Retention is by age, not by range length: 1 s buckets only cover the
+    last 10 minutes, so five minutes from this morning come from 1 m.
+    """
+    age_ms = (now if now is not None else now_ms()) - start_ms
+    for resolution, retention_ms in RESOLUTION_RETENTION:
+        if age_ms <= retention_ms:
+            return resolution
+    return RESOLUTION_RETENTION[-1][0]
+
+
+class ChatToolbox:
+    """
+    Tools the model can call for one chat request
+
+    Current values come from the frame already computed for the request;
+    history comes from the device's Timesystems™ rollups through
+    `PipelineRunner.query`, so no tool touches raw samples or the database.
+    Results are compact JSON. Times are exchanged in the wearer's timezone
+    (the frame's UTC offset, the server's without a frame).
+    """
+
+    MAX_SERIES_POINTS = 48
+
+    def __init__(
+        self, pipeline, device_id: str,
+        stream_data: Optional[StreamDataResponse] = None, session_manager=None
+    ):
+        self.pipeline = pipeline
+        self.device_id = device_id
+        self.stream_data = stream_data
+        self.session_manager = session_manager
+        self.calls: List[str] = []
+
+        offset = None
+        if stream_data is not None:
+            offset = stream_data.timesystems_layer.time_of_day_analysis.get('utc_offset_minutes')
+        self.timezone = timezone(timedelta(
+            minutes=offset if offset is not None else server_utc_offset_minutes()
+        ))
+
+    def _local_time(self, timestamp_ms: int) -> str:
+        """Epoch ms → ISO 8601 in the wearer's timezone"""
+        return to_datetime(timestamp_ms).astimezone(self.timezone).isoformat(timespec="minutes")
+
+    @property
+    def definitions(self) -> List[Dict[str, Any]]:
+        return TOOL_DEFINITIONS
+
+    def preamble(self) -> str:
+        """Short system note replacing the full biosignal context"""
+        return (
+            f"Current local time of the wearer: {self._local_time(now_ms())}. "
+            f"The user's wearable is device {self.device_id}. "
+            "Call the provided tools to read the user's biosignal data before answering "
+            "questions about it; request only what the question needs."
+        )
+
+    async def call(self, name: str, arguments: str) -> str:
+        """
+        Run one tool call from the model
+
+        Returns:
+            JSON result (an "error" object for bad calls, so the model can recover)
+        """
+        self.calls.append(name)
+        handler = getattr(self, f"_{name}", None)
+        if name not in {tool["function"]["name"] for tool in TOOL_DEFINITIONS} or handler is None:
+            return json.dumps({"error": f"Unknown tool '{name}'"})
+        try:
+            kwargs = json.loads(arguments or "{}")
+            result = await handler(**kwargs)
+        except Exception as e:
+            result = {"error": str(e)}
+        return json.dumps(_round(result), default=str, separators=(",", ":"))
+
+    def _require_frame(self) -> StreamDataResponse:
+        if self.stream_data is None:
+            raise ValueError("No current biosignal data available")
+        return self.stream_data
+
+    async def _get_current_vitals(self) -> Dict[str, Any]:
+        frame = self._require_frame()
+        raw, lia = frame.raw_signals, frame.lia_insights
+        return {
+            "timestamp": frame.timestamp.astimezone(self.timezone).isoformat(timespec="seconds"),
+            "heart_rate_bpm": raw.heart_rate,
+            "spo2_percent": raw.spo2,
+            "temperature_c": raw.temperature,
+            "activity_steps_per_min": raw.activity,
+            "signal_quality": frame.clarity_layer.quality_assessment.value,
+            "condition": lia.condition,
+            "confidence": lia.confidence,
+            "wellness_score": lia.wellness_score,
+            "risk_factors": lia.risk_factors,
+            "positive_indicators": lia.positive_indicators,
+            "recommendation": lia.recommendation
+        }
+
+    async def _get_hrv_summary(self) -> Dict[str, Any]:
+        frame = self._require_frame()
+        ifrs, hrv = frame.ifrs_layer, frame.ifrs_layer.hrv_features
+        return {
+            "hrv_score": hrv.hrv_score,
+            "rmssd_ms": hrv.rmssd,
+            "sdnn_ms": hrv.sdnn,
+            "pnn50_percent": hrv.pnn50,
+            "lf_hf_ratio": ifrs.frequency_bands.lf_hf_ratio,
+            "rhythm": ifrs.rhythm_classification.value,
+            "respiratory_rate": ifrs.respiratory_rate,
+            "dominant_frequency_hz": ifrs.dominant_frequency,
+            "stress_level": frame.lia_insights.wellness_assessment.stress_level
+        }
+
+    async def _get_rollups(
+        self, start: str, end: Optional[str] = None, channel: Optional[str] = None
+    ) -> Dict[str, Any]:
+        start_ms = to_ms(_parse_time(start, self.timezone))
+        end_ms = to_ms(_parse_time(end, self.timezone)) if end else now_ms()
+        if end_ms <= start_ms:
+            raise ValueError("end must be after start")
+        if channel is not None and channel not in TimesystemsLayer.CHANNELS:
+            raise ValueError(f"Unknown channel '{channel}'")
+
+        resolution = _resolution_for(start_ms)
+        result = {
+            "start": self._local_time(start_ms),
+            "end": self._local_time(end_ms),
+            "resolution": resolution,
+            "summary": await self.pipeline.query(self.device_id, 'rollup_summary', resolution, start_ms, end_ms)
+        }
+        if not result["summary"]:
+            result["note"] = "No data recorded in this range"
+        elif channel is not None:
+            series = await self.pipeline.query(
+                self.device_id, 'rollup_series', resolution, channel, start_ms, end_ms
+            )
+            result["series"] = self._downsample(series)
+        return result
+
+    def _downsample(self, series: Dict[str, List]) -> List[Dict[str, Any]]:
+        """At most MAX_SERIES_POINTS count-weighted groups of consecutive buckets"""
+        counts = np.asarray(series['count'], dtype=np.float64)
+        if len(counts) == 0:
+            return []
+        groups = np.array_split(np.arange(len(counts)), min(len(counts), self.MAX_SERIES_POINTS))
+        means, minimums, maximums = (np.asarray(series[key]) for key in ('mean', 'min', 'max'))
+        return [
+            {
+                "start": self._local_time(series['start_ms'][group[0]]),
+                "mean": float(np.average(means[group], weights=np.maximum(counts[group], 1))),
+                "min": float(minimums[group].min()),
+                "max": float(maximums[group].max())
+            }
+            for group in groups
+        ]
+
+    async def _get_session_summary(self, monitoring_session_id: Optional[str] = None) -> Dict[str, Any]:
+        session = None
+        if self.session_manager is not None:
+            if monitoring_session_id:
+                session = self.session_manager.sessions.get(monitoring_session_id)
+                if session is None:
+                    raise ValueError(f"Unknown monitoring session '{monitoring_session_id}'")
+            else:
+                device_sessions = [
+                    data for data in self.session_manager.sessions.values()
+                    if data['device_id'] == self.device_id
+                ]
+                session = max(device_sessions, key=lambda data: data['start_time'], default=None)
+
+        # Session times are naive server-local datetimes; .timestamp() converts them to epoch
+        end_at = (session or {}).get('end_time')
+        end_ms = int(end_at.timestamp() * 1000) if end_at else now_ms()
+        start_ms = int(session['start_time'].timestamp() * 1000) if session else end_ms - 3600 * 1000
+        resolution = _resolution_for(start_ms)
+
+        change_points = await self.pipeline.query(self.device_id, 'recent_change_points', 20)
+        result = {
+            "monitoring_session_id": session['session_id'] if session else None,
+            "status": session['status'] if session else "no session (last hour)",
+            "start": self._local_time(start_ms),
+            "duration_minutes": (end_ms - start_ms) / 60000,
+            "average_wellness_score": session['average_wellness_score'] if session else None,
+            "statistics": await self.pipeline.query(
+                self.device_id, 'rollup_summary', resolution, start_ms, end_ms
+            ),
+            "change_points": [
+                {
+                    "channel": event.channel,
+                    "direction": event.direction.value,
+                    "onset": event.onset.astimezone(self.timezone).isoformat(timespec="minutes"),
+                    "from": event.previous_mean,
+                    "to": event.current_mean
+                }
+                for event in change_points if event.onset.timestamp() * 1000 >= start_ms
+            ][-5:]
+        }
+        if self.stream_data is not None:
+            timesystems = self.stream_data.timesystems_layer
+            result["pattern"] = timesystems.pattern_type.value
+            result["circadian_phase"] = timesystems.circadian_phase.value
+        return result
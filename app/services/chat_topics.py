@@ -0,0 +1,44 @@
+"""
+LIA Chat Topics - What a chat question is about
+One topic → phrase table for the intent router, the response cache and context selection
+"""
+
+import re
+from typing import Dict, Set, Tuple
+
+# Topic → phrases of the normalized question (see normalize_question).
+# The first nine are the metrics IntentRouter can answer locally.
+TOPIC_PHRASES: Dict[str, Tuple[str, ...]] = {
+    "hrv": ("heart rate hrv", "hrv score", "hrv"),
+    "heart_rate": ("resting heart rate", "heart rate"),
+    "spo2": ("blood oxygen", "oxygen level", "oxygen"),
+    "temperature": ("body temperature", "temperature"),
+    "activity": ("activity level", "activity"),
+    "wellness": ("wellness score", "health score", "wellness"),
+    "condition": ("health status", "condition", "status"),
+    "signal_quality": ("signal quality", "data quality", "quality"),
+    "respiratory_rate": ("respiratory rate", "breathing rate"),
+    "heart_rhythm": (
+        "heart", "rhythm", "frequency", "autonomic", "rmssd", "sdnn", "pnn50", "lf", "hf"
+    ),
+    "breathing": ("respiratory", "breathing"),
+    "stress": ("stress",),
+    "sleep": ("sleep", "tired", "energy"),
+    "circadian": ("circadian", "pattern", "trend", "routine", "consistency"),
+    "time_of_day": ("time", "day", "night", "morning", "evening"),
+    "signal": (
+        "signal", "noise", "artifact", "artifacts", "accurate", "accuracy",
+        "reliable", "snr", "sensor", "reading", "readings"
+    ),
+    "risk": ("risk",),
+}
+
+_TOPIC_PATTERNS = {
+    topic: re.compile(r"\b(?:" + "|".join(map(re.escape, phrases)) + r")\b")
+    for topic, phrases in TOPIC_PHRASES.items()
+}
+
+
+def topics_in(question: str) -> Set[str]:
+    """Topics mentioned in a normalized question"""
+    return {topic for topic, pattern in _TOPIC_PATTERNS.items() if pattern.search(question)}
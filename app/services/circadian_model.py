@@ -0,0 +1,101 @@
+"""
+Cosinor Circadian Model - Personalised 24 h rhythm fitted incrementally
+"""
+
+import numpy as np
+from typing import Dict, Optional, Sequence
+
+
+class CosinorModel:
+    """
+    Single-harmonic cosinor regression per channel
+
+        y(t) = MESOR + β·cos(2πt/24) + γ·sin(2πt/24),  t = hour of day
+
+    The normal equations (XᵀX, Xᵀy) are accumulated one hourly aggregate at
+    a time with exponential forgetting, and the 3×3 system is re-solved on
+    each update. Predictions are a dot product of the cached coefficients
+    with the basis vector, so per-sample cost never depends on history.
+
+    Derived parameters:
+    - MESOR: rhythm-adjusted mean
+    - Amplitude: √(β² + γ²)
+    - Acrophase: hour of the fitted peak, atan2(γ, β) mapped to [0, 24)
+    """
+
+    PERIOD_HOURS = 24.0
+
+    def __init__(
+        self, channels: Sequence[str], min_hours: int = 8,
+        decay: float = 0.995, ridge: float = 1e-6
+    ):
+        """
+        Args:
+            channels: Channels modelled (e.g. heart_rate, temperature)
+            min_hours: Distinct hours of day required before the fit is used
+            decay: Forgetting factor per hourly update (~6 day half-life)
+            ridge: Diagonal regularisation for the normal equations
+        """
+        self.channels = tuple(channels)
+        self.channel_index = {name: i for i, name in enumerate(self.channels)}
+        self.min_hours = min_hours
+        self.decay = decay
+        self.ridge = ridge
+
+        self.xtx = np.zeros((3, 3))
+        self.xty = np.zeros((3, len(self.channels)))
+        self.hours_observed = np.zeros(24, dtype=bool)
+        self.updates = 0
+        self.coefficients: Optional[np.ndarray] = None  # shape (3, channels)
+
+    @classmethod
+    def basis(cls, hour_of_day: float) -> np.ndarray:
+        """Design vector [1, cos, sin] for an hour of day"""
+        angle = 2 * np.pi * hour_of_day / cls.PERIOD_HOURS
+        return np.array([1.0, np.cos(angle), np.sin(angle)])
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.coefficients is not None
+
+    def update(self, hour_of_day: float, values: Sequence[float], weight: float = 1.0):
+        """
+        Fold one aggregate (e.g. an hourly mean) into the normal equations
+
+        Args:
+            hour_of_day: Centre of the aggregate in local hours [0, 24)
+            values: Channel values in `channels` order
+            weight: Observation weight
+        """
+        x = self.basis(hour_of_day)
+        y = np.asarray(values, dtype=np.float64)
+
+        self.xtx = self.decay * self.xtx + weight * np.outer(x, x)
+        self.xty = self.decay * self.xty + weight * np.outer(x, y)
+        self.hours_observed[int(hour_of_day) % 24] = True
+        self.updates += 1
+
+        if self.hours_observed.sum() >= self.min_hours:
+            self.coefficients = np.linalg.solve(
+                self.xtx + self.ridge * np.eye(3), self.xty
+            )
+
+    def expected(self, hour_of_day: float, channel: str) -> Optional[float]:
+        """Personalised expected value of a channel at an hour of day"""
+        if self.coefficients is None:
+            return None
+        return float(self.basis(hour_of_day) @ self.coefficients[:, self.channel_index[channel]])
+
+    def parameters(self, channel: str) -> Optional[Dict[str, float]]:
+        """MESOR, amplitude and acrophase (hour of peak) for a channel"""
+        if self.coefficients is None:
+            return None
+
+        mesor, beta, gamma = self.coefficients[:, self.channel_index[channel]]
+        acrophase = (np.arctan2(gamma, beta) * self.PERIOD_HOURS / (2 * np.pi)) % self.PERIOD_HOURS
+
+        return {
+            'mesor': float(mesor),
+            'amplitude': float(np.hypot(beta, gamma)),
+            'acrophase_hour': float(acrophase)
+        }
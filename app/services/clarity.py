@@ -4,7 +4,8 @@ Proprietary algorithm for biosignal enhancement and quality assessment
 """
 
 import numpy as np
-from typing import Dict, List
+from collections import deque
+from typing import Collection, Dict, List, Optional
 import random
 
 from app.models.schemas import (
@@ -23,35 +24,53 @@ class ClarityLayer:
     - Quality scoring for each biosignal channel
     - Artifact detection (motion, electrode noise, saturation)
     - Real-time quality assessment
+    - Per-channel processing at each channel's own sample rate
     """
 
+    CHANNELS = ('heart_rate', 'spo2', 'temperature', 'activity')
+
     def __init__(self):
         self.noise_threshold = 0.3
         self.quality_threshold = 0.7
         self.history_buffer = []
         self.buffer_size = 50
 
-    def process(self, raw_data: BiosignalData) -> Dict:
+        # Real readings per channel (held values of slow channels are not repeated)
+        self.channel_history = {
+            channel: deque(maxlen=self.buffer_size) for channel in self.CHANNELS
+        }
+        self.channel_quality_cache: Dict[str, float] = {}
+        self.processed_value_cache: Dict[str, float] = {}
+
+    def process(
+        self, raw_data: BiosignalData, fresh_channels: Optional[Collection[str]] = None
+    ) -> Dict:
         """
         Process raw biosignal data through Clarity™ layer
 
         Args:
-            raw_data: Raw biosignal data from BLE device
+            raw_data: Raw (aligned) biosignal data from BLE device
+            fresh_channels: Channels with a new reading in this sample
+                (None = all); others reuse their cached quality and value
 
         Returns:
             Clarity layer processing results
         """
+        fresh = set(self.CHANNELS if fresh_channels is None else fresh_channels)
+
         # Add to history buffer
         self.history_buffer.append(raw_data.dict())
         if len(self.history_buffer) > self.buffer_size:
             self.history_buffer.pop(0)
+        for channel in fresh:
+            self.channel_history[channel].append(getattr(raw_data, channel))
 
         # Calculate signal quality metrics
-        quality_metrics = self._calculate_quality_metrics(raw_data)
+        quality_metrics = self._calculate_quality_metrics(raw_data, fresh)
 
         # Apply noise reduction
         processed_data, noise_reduced = self._apply_noise_reduction(
-            raw_data, quality_metrics
+            raw_data, quality_metrics, fresh
         )
 
         # Calculate SNR
@@ -82,7 +101,7 @@ class ClarityLayer:
             'processing_notes': notes
         }
 
-    def _calculate_quality_metrics(self, data: BiosignalData) -> QualityMetrics:
+    def _calculate_quality_metrics(self, data: BiosignalData, fresh: set) -> QualityMetrics:
         """
         Calculate quality metrics for each signal channel
 
@@ -90,46 +109,19 @@ class ClarityLayer:
         - Signal stability
         - Value within expected range
         - Historical consistency
+
+        Only channels with a new reading are re-scored.
         """
-        metrics = {}
-
-        # Heart rate quality
-        hr = data.heart_rate
-        hr_quality = 1.0
-        if hr < 40 or hr > 180:
-            hr_quality *= 0.5
-        if hr < 50 or hr > 150:
-            hr_quality *= 0.8
-        hr_quality *= self._calculate_stability('heart_rate')
-        metrics['heart_rate_quality'] = max(0.0, min(1.0, hr_quality))
-
-        # SpO2 quality
-        spo2 = data.spo2
-        spo2_quality = 1.0
-        if spo2 < 90:
-            spo2_quality *= 0.6
-        if spo2 > 100:
-            spo2_quality *= 0.7
-        spo2_quality *= self._calculate_stability('spo2')
-        metrics['spo2_quality'] = max(0.0, min(1.0, spo2_quality))
-
-        # Temperature quality
-        temp = data.temperature
-        temp_quality = 1.0
-        if temp < 35 or temp > 39:
-            temp_quality *= 0.5
-        if temp < 36 or temp > 38:
-            temp_quality *= 0.9
-        temp_quality *= self._calculate_stability('temperature')
-        metrics['temperature_quality'] = max(0.0, min(1.0, temp_quality))
-
-        # Activity quality
-        activity = data.activity
-        activity_quality = 1.0
-        if activity < 0 or activity > 200:
-            activity_quality *= 0.5
-        activity_quality *= self._calculate_stability('activity')
-        metrics['activity_quality'] = max(0.0, min(1.0, activity_quality))
+        for channel in self.CHANNELS:
+            if channel in fresh or channel not in self.channel_quality_cache:
+                self.channel_quality_cache[channel] = self._channel_quality(
+                    channel, getattr(data, channel)
+                )
+
+        metrics = {
+            f'{channel}_quality': self.channel_quality_cache[channel]
+            for channel in self.CHANNELS
+        }
 
         # Overall quality (weighted average)
         metrics['overall_quality'] = (
@@ -141,17 +133,41 @@ class ClarityLayer:
 
         return QualityMetrics(**metrics)
 
+    def _channel_quality(self, channel: str, value: float) -> float:
+        """Range and stability score of one channel reading"""
+        quality = 1.0
+
+        if channel == 'heart_rate':
+            if value < 40 or value > 180:
+                quality *= 0.5
+            if value < 50 or value > 150:
+                quality *= 0.8
+        elif channel == 'spo2':
+            if value < 90:
+                quality *= 0.6
+            if value > 100:
+                quality *= 0.7
+        elif channel == 'temperature':
+            if value < 35 or value > 39:
+                quality *= 0.5
+            if value < 36 or value > 38:
+                quality *= 0.9
+        elif channel == 'activity':
+            if value < 0 or value > 200:
+                quality *= 0.5
+
+        quality *= self._calculate_stability(channel)
+        return max(0.0, min(1.0, quality))
+
     def _calculate_stability(self, signal_type: str) -> float:
         """
         Calculate signal stability based on historical data
         """
-        if len(self.history_buffer) < 5:
+        history = self.channel_history[signal_type]
+        if len(history) < 5:
             return 0.9  # Assume good quality with limited history
 
-        recent_values = [
-            sample[signal_type]
-            for sample in self.history_buffer[-10:]
-        ]
+        recent_values = list(history)[-10:]
 
         # Calculate coefficient of variation
         mean_val = np.mean(recent_values)
@@ -167,12 +183,13 @@ class ClarityLayer:
         return min(1.0, stability)
 
     def _apply_noise_reduction(
-        self, raw_data: BiosignalData, quality_metrics: QualityMetrics
+        self, raw_data: BiosignalData, quality_metrics: QualityMetrics, fresh: set
     ) -> tuple[BiosignalData, bool]:
         """
         Apply adaptive noise reduction using wavelet-inspired smoothing
 
-        Applies noise reduction if quality is below threshold
+        Applies noise reduction if quality is below threshold. Channels
+        without a new reading keep their previously processed value.
         """
         noise_reduced = False
 
@@ -184,12 +201,10 @@ class ClarityLayer:
             noise_reduced = True
 
             # Simulate wavelet denoising by smoothing with historical data
-            if len(self.history_buffer) >= 3:
-                for signal_type in ['heart_rate', 'spo2', 'temperature', 'activity']:
-                    recent_values = [
-                        sample[signal_type]
-                        for sample in self.history_buffer[-5:]
-                    ]
+            for signal_type in fresh:
+                history = self.channel_history[signal_type]
+                if len(history) >= 3:
+                    recent_values = list(history)[-5:]
                     recent_values.append(data_dict[signal_type])
 
                     # Apply weighted moving average (more recent = more weight)
@@ -199,6 +214,12 @@ class ClarityLayer:
                     smoothed_value = np.average(recent_values, weights=weights)
                     processed_dict[signal_type] = round(float(smoothed_value), 2)
 
+        for signal_type in self.CHANNELS:
+            if signal_type in fresh or signal_type not in self.processed_value_cache:
+                self.processed_value_cache[signal_type] = processed_dict[signal_type]
+            else:
+                processed_dict[signal_type] = self.processed_value_cache[signal_type]
+
         return BiosignalData(**processed_dict), noise_reduced
 
     def _calculate_snr(
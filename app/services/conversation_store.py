@@ -0,0 +1,283 @@
+"""
+Conversation Store - Bounded LIA chat history with write-behind persistence
+Per-session caps, idle expiry and global LRU eviction in memory; history survives restarts in the database
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class ConversationEntry:
+    """In-memory history of one chat session"""
+
+    __slots__ = ("messages", "summary", "last_active")
+
+    def __init__(self, messages: Optional[List[Dict[str, str]]] = None, summary: str = ""):
+        self.messages = messages or []
+        self.summary = summary
+        self.last_active = time.monotonic()
+
+
+class ConversationStore:
+    """
+    Chat history keyed by session_id, bounded in memory and persisted
+
+    Memory bounds:
+    - `max_messages` per session and `max_message_chars` per message
+    - sessions idle for `idle_ttl` seconds are dropped from memory
+    - at most `max_sessions` sessions are kept; the least recently used
+      one is evicted first (an OrderedDict in access order, so expiry and
+      eviction both pop from the front)
+
+    Persistence is write-behind: changes only mark the session dirty, and
+    `flush()` (run every `flush_interval` seconds by `run()`, and on
+    shutdown) upserts a snapshot of each dirty session in one transaction
+    off the event loop. Evicted sessions are reloaded from the database on
+    their next message. If the database is unreachable, unsaved snapshots
+    are retried on later flushes, up to `max_pending_writes` sessions.
+    Without a database only the memory bounds apply.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 10000,
+        max_messages: int = 20,
+        max_message_chars: int = 4000,
+        idle_ttl: float = 86400.0,
+        flush_interval: float = 2.0,
+        persist: bool = False,
+        max_pending_writes: int = 10000
+    ):
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self.max_message_chars = max_message_chars
+        self.idle_ttl = idle_ttl
+        self.flush_interval = flush_interval
+        self.persist = persist
+        self.max_pending_writes = max_pending_writes
+
+        self.entries: "OrderedDict[str, ConversationEntry]" = OrderedDict()
+        # session_id → snapshot to write (None = delete); only grows while the database is unreachable
+        self.pending: "OrderedDict[str, Optional[Tuple[List[Dict[str, str]], str]]]" = OrderedDict()
+        self.writing: Dict[str, Optional[Tuple[List[Dict[str, str]], str]]] = {}  # Batch being flushed
+        self.dirty: set = set()
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls, max_messages: int = 20) -> "ConversationStore":
+        """Store configured from LIA_CHAT_* environment variables"""
+        persist_default = "1" if os.getenv("DB_PASSWORD") else "0"
+        return cls(
+            max_sessions=int(os.getenv("LIA_CHAT_MAX_SESSIONS", "10000")),
+            max_messages=max_messages,
+            max_message_chars=int(os.getenv("LIA_CHAT_MAX_MESSAGE_CHARS", "4000")),
+            idle_ttl=float(os.getenv("LIA_CHAT_SESSION_TTL", "86400")),
+            flush_interval=float(os.getenv("LIA_CHAT_FLUSH_INTERVAL", "2")),
+            persist=os.getenv("LIA_CHAT_PERSIST", persist_default).lower() in ("1", "true", "yes"),
+            max_pending_writes=int(os.getenv("LIA_CHAT_MAX_PENDING_WRITES", "10000"))
+        )
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # ------------------------------------------------------------------
+    # In-memory access
+    # ------------------------------------------------------------------
+
+    def history(self, session_id: str) -> List[Dict[str, str]]:
+        """Messages of a session held in memory (oldest first)"""
+        entry = self._touch(session_id)
+        return entry.messages if entry else []
+
+    def summary(self, session_id: str) -> str:
+        """Rolling summary of a session's older turns"""
+        entry = self._touch(session_id)
+        return entry.summary if entry else ""
+
+    def put(self, session_id: str, messages: List[Dict[str, str]], summary: str = ""):
+        """Replace a session's history, applying the per-session caps"""
+        messages = [
+            {"role": message["role"], "content": message["content"][:self.max_message_chars]}
+            for message in messages[-self.max_messages:]
+        ]
+        entry = self.entries.get(session_id)
+        if entry is None:
+            entry = self.entries[session_id] = ConversationEntry()
+        entry.messages, entry.summary = messages, summary
+        entry.last_active = time.monotonic()
+        self.entries.move_to_end(session_id)
+        self.dirty.add(session_id)
+        self._enforce_limits()
+
+    def clear(self, session_id: str):
+        """Forget a session in memory and in the database"""
+        self.entries.pop(session_id, None)
+        self.dirty.discard(session_id)
+        if self.persist:
+            self._queue(session_id, None)
+
+    def _touch(self, session_id: str) -> Optional[ConversationEntry]:
+        entry = self.entries.get(session_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.last_active > self.idle_ttl:
+            self._evict(session_id)
+            return None
+        entry.last_active = time.monotonic()
+        self.entries.move_to_end(session_id)
+        return entry
+
+    def _enforce_limits(self):
+        """Drop idle sessions, then least recently used ones beyond max_sessions"""
+        now = time.monotonic()
+        while self.entries:
+            session_id, entry = next(iter(self.entries.items()))
+            if now - entry.last_active <= self.idle_ttl and len(self.entries) <= self.max_sessions:
+                break
+            self._evict(session_id)
+
+    def _evict(self, session_id: str):
+        entry = self.entries.pop(session_id)
+        self.evictions += 1
+        if session_id in self.dirty:
+            self.dirty.discard(session_id)
+            if self.persist:
+                self._queue(session_id, (entry.messages, entry.summary))
+
+    def _queue(self, session_id: str, snapshot: Optional[Tuple[List[Dict[str, str]], str]]):
+        self.pending[session_id] = snapshot
+        self.pending.move_to_end(session_id)
+        while len(self.pending) > self.max_pending_writes:
+            dropped, _ = self.pending.popitem(last=False)
+            logger.error(f"❌ Conversation write backlog full, dropped unsaved history of {dropped}")
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    async def load(self, session_id: str) -> List[Dict[str, str]]:
+        """
+        Session history, reloading it from the database if not in memory
+
+        Returns:
+            Messages of the session (oldest first)
+        """
+        entry = self._touch(session_id)
+        if entry is not None or not self.persist:
+            return entry.messages if entry else []
+
+        if session_id in self.pending:
+            snapshot = self.pending[session_id]
+        elif session_id in self.writing:
+            snapshot = self.writing[session_id]
+        else:
+            try:
+                snapshot = await asyncio.to_thread(self._read, session_id)
+            except Exception as e:
+                logger.error(f"❌ Conversation load failed for {session_id}: {str(e)}")
+                snapshot = None
+
+        # A message recorded while the read was in flight wins
+        if session_id not in self.entries and snapshot is not None:
+            self.entries[session_id] = ConversationEntry(*snapshot)
+            self._enforce_limits()
+        return self.history(session_id)
+
+    async def flush(self) -> int:
+        """
+        Write dirty and evicted sessions to the database
+
+        Returns:
+            Number of sessions written or deleted
+        """
+        if not self.persist:
+            self.dirty.clear()
+            return 0
+
+        for session_id in self.dirty:
+            if session_id in self.entries:
+                entry = self.entries[session_id]
+                self._queue(session_id, (list(entry.messages), entry.summary))
+        self.dirty.clear()
+        if not self.pending:
+            return 0
+
+        batch, self.pending = self.pending, OrderedDict()
+        self.writing = batch
+        try:
+            await asyncio.to_thread(self._write, batch)
+        except Exception as e:
+            logger.error(f"❌ Conversation flush failed ({len(batch)} sessions): {str(e)}")
+            # Retry on the next flush, newer changes first
+            for session_id, snapshot in batch.items():
+                if session_id not in self.pending:
+                    self._queue(session_id, snapshot)
+            return 0
+        finally:
+            self.writing = {}
+        return len(batch)
+
+    async def run(self):
+        """Periodic write-behind until cancelled (final flush on shutdown)"""
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+        finally:
+            await self.flush()
+
+    def stats(self) -> Dict:
+        return {
+            "sessions": len(self.entries),
+            "max_sessions": self.max_sessions,
+            "dirty": len(self.dirty),
+            "pending_writes": len(self.pending),
+            "evictions": self.evictions,
+            "persist": self.persist
+        }
+
+    @staticmethod
+    def _read(session_id: str) -> Optional[Tuple[List[Dict[str, str]], str]]:
+        from app.database import SessionLocal
+        from app.models.db_models import ChatConversation
+
+        db = SessionLocal()
+        try:
+            row = db.query(ChatConversation).filter(ChatConversation.session_id == session_id).first()
+            return (list(row.messages or []), row.summary or "") if row else None
+        finally:
+            db.close()
+
+    @staticmethod
+    def _write(batch: Dict[str, Optional[Tuple[List[Dict[str, str]], str]]]):
+        from app.database import SessionLocal
+        from app.models.db_models import ChatConversation
+
+        db = SessionLocal()
+        try:
+            rows = {
+                row.session_id: row for row in
+                db.query(ChatConversation).filter(ChatConversation.session_id.in_(list(batch)))
+            }
+            for session_id, snapshot in batch.items():
+                row = rows.get(session_id)
+                if snapshot is None:
+                    if row is not None:
+                        db.delete(row)
+                elif row is None:
+                    db.add(ChatConversation(session_id=session_id, messages=snapshot[0], summary=snapshot[1]))
+                else:
+                    row.messages, row.summary = snapshot
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
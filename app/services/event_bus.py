@@ -0,0 +1,103 @@
+"""
+Event Bus - In-process fan-out of LIA events
+One retained event log serves WebSocket, SSE and long-poll subscribers
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
+
+
+class EventBus:
+    """
+    Sequenced event log with async waiting
+
+    Every published event gets a monotonically increasing `event_id`.
+    Subscribers never register queues: each one remembers the last id it
+    has seen and waits for newer events matching its filter, so slow or
+    disconnected clients cost nothing and can resume (SSE Last-Event-ID,
+    long-poll `after`) as long as the events are still retained.
+
+    Ids start at the boot time (epoch ms × 1000), so every id issued after
+    a restart is greater than any id from before it: a client resuming
+    with a cursor from the previous run receives all new events instead of
+    skipping the ones whose ids it had already seen. Cursors ahead of the
+    newest id are rejected.
+    """
+
+    def __init__(self, retention: int = 5000):
+        self.events: deque = deque(maxlen=retention)
+        self.last_event_id = int(time.time() * 1000) * 1000
+        self.condition = asyncio.Condition()
+        self.subscribers = 0
+
+    def check_cursor(self, after: int):
+        """Raise ValueError for a cursor this bus never issued"""
+        if after > self.last_event_id:
+            raise ValueError(f"Event id {after} is ahead of the latest event ({self.last_event_id})")
+
+    @contextmanager
+    def subscription(self):
+        """Count an active subscriber (long-poll, SSE or WebSocket) while inside"""
+        self.subscribers += 1
+        try:
+            yield
+        finally:
+            self.subscribers -= 1
+
+    async def publish(self, device_id: str, events: Sequence[Dict]) -> List[Dict]:
+        """Append events for a device and wake waiting subscribers"""
+        if not events:
+            return []
+
+        async with self.condition:
+            published = []
+            for event in events:
+                self.last_event_id += 1
+                published.append({**event, 'event_id': self.last_event_id, 'device_id': device_id})
+            self.events.extend(published)
+            self.condition.notify_all()
+        return published
+
+    def since(
+        self, after: int, device_id: Optional[str] = None,
+        types: Optional[Sequence[str]] = None
+    ) -> List[Dict]:
+        """Retained events newer than `after` matching the filter, oldest first"""
+        matches = []
+        for event in reversed(self.events):
+            if event['event_id'] <= after:
+                break
+            if device_id and event['device_id'] != device_id:
+                continue
+            if types and event['type'] not in types:
+                continue
+            matches.append(event)
+        matches.reverse()
+        return matches
+
+    async def wait(
+        self, after: int, device_id: Optional[str] = None,
+        types: Optional[Sequence[str]] = None, timeout: float = 25.0
+    ) -> List[Dict]:
+        """
+        Events newer than `after`, waiting up to `timeout` seconds for one
+
+        Returns:
+            Matching events, or an empty list on timeout
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        async with self.condition:
+            while True:
+                events = self.since(after, device_id, types)
+                remaining = deadline - loop.time()
+                if events or remaining <= 0:
+                    return events
+                try:
+                    await asyncio.wait_for(self.condition.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return self.since(after, device_id, types)
@@ -0,0 +1,157 @@
+"""
+Nonlinear HRV Features
+Poincaré descriptors, sample entropy and detrended fluctuation analysis (DFA)
+computed off the hot path on a shared background executor
+"""
+
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+from scipy.spatial import cKDTree
+
+
+# Shared executor for all devices; numpy/scipy release the GIL while crunching
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_workers = 2
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get (lazily creating) the background executor for nonlinear HRV"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=_executor_workers,
+            thread_name_prefix="hrv-nonlinear"
+        )
+    return _executor
+
+
+def submit_nonlinear_features(rr_intervals: np.ndarray) -> Future:
+    """Schedule nonlinear feature extraction on the background executor"""
+    return get_executor().submit(compute_nonlinear_features, rr_intervals)
+
+
+def compute_nonlinear_features(rr_intervals: np.ndarray) -> Dict[str, Optional[float]]:
+    """
+    Compute all nonlinear HRV features for an R-R interval series (ms)
+
+    Returns:
+        Dict with sd1, sd2, sample_entropy and dfa_alpha1 (None if undefined)
+    """
+    rr = np.asarray(rr_intervals, dtype=float)
+
+    sd1, sd2 = poincare_descriptors(rr)
+    sampen = sample_entropy(rr)
+    alpha1 = dfa_alpha1(rr)
+
+    return {
+        'sd1': _round(sd1),
+        'sd2': _round(sd2),
+        'sample_entropy': _round(sampen, 3),
+        'dfa_alpha1': _round(alpha1, 3)
+    }
+
+
+def poincare_descriptors(rr: np.ndarray) -> tuple[Optional[float], Optional[float]]:
+    """
+    Poincaré plot descriptors
+
+    SD1: short-term variability (spread perpendicular to the identity line)
+    SD2: long-term variability (spread along the identity line)
+    """
+    if len(rr) < 3:
+        return None, None
+
+    diff_var = np.var(np.diff(rr))
+    sd1_sq = diff_var / 2.0
+    sd2_sq = 2.0 * np.var(rr) - diff_var / 2.0
+
+    return float(np.sqrt(sd1_sq)), float(np.sqrt(max(sd2_sq, 0.0)))
+
+
+def sample_entropy(rr: np.ndarray, m: int = 2, r_factor: float = 0.2) -> Optional[float]:
+    """
+    Sample entropy (SampEn) using KD-tree neighbour counting
+
+    Template matching under the Chebyshev distance is delegated to a
+    cKDTree, which counts all pairs within tolerance in roughly
+    O(n log n) instead of the naive O(n²) pairwise comparison.
+
+    Args:
+        rr: R-R interval series
+        m: Embedding dimension
+        r_factor: Tolerance as a fraction of the series standard deviation
+    """
+    n = len(rr)
+    if n < m + 10:
+        return None
+
+    tolerance = r_factor * np.std(rr)
+    if tolerance == 0:
+        return None
+
+    # Use the same N - m templates for both lengths (Richman & Moorman)
+    templates = n - m
+    embedded = np.lib.stride_tricks.sliding_window_view(rr, m + 1)[:templates]
+
+    matches_m = _count_template_matches(embedded[:, :m], tolerance)
+    matches_m1 = _count_template_matches(embedded, tolerance)
+
+    if matches_m == 0 or matches_m1 == 0:
+        return None
+
+    return float(-np.log(matches_m1 / matches_m))
+
+
+def _count_template_matches(vectors: np.ndarray, tolerance: float) -> int:
+    """Count unordered template pairs within tolerance, excluding self-matches"""
+    tree = cKDTree(vectors)
+    ordered_pairs = tree.count_neighbors(tree, tolerance, p=np.inf)
+    return int((ordered_pairs - len(vectors)) // 2)
+
+
+def dfa_alpha1(
+    rr: np.ndarray, min_scale: int = 4, max_scale: int = 16, n_scales: int = 8
+) -> Optional[float]:
+    """
+    Short-term DFA scaling exponent (α1)
+
+    The integrated profile is split into non-overlapping windows for each
+    log-spaced scale, and all windows of a scale are linearly detrended in
+    a single vectorized least-squares solve.
+    """
+    if len(rr) < max_scale * 2:
+        return None
+
+    profile = np.cumsum(rr - np.mean(rr))
+    scales = np.unique(
+        np.floor(np.logspace(np.log10(min_scale), np.log10(max_scale), n_scales))
+    ).astype(int)
+
+    fluctuations = np.empty(len(scales))
+    for i, scale in enumerate(scales):
+        n_windows = len(profile) // scale
+        windows = profile[:n_windows * scale].reshape(n_windows, scale)
+
+        # Closed-form linear fit for every window at once
+        x = np.arange(scale, dtype=float)
+        x_centered = x - x.mean()
+        slopes = windows @ x_centered / np.dot(x_centered, x_centered)
+        intercepts = windows.mean(axis=1) - slopes * x.mean()
+        residuals = windows - (intercepts[:, None] + slopes[:, None] * x)
+
+        fluctuations[i] = np.sqrt(np.mean(residuals ** 2))
+
+    valid = fluctuations > 0
+    if valid.sum() < 2:
+        return None
+
+    alpha, _ = np.polyfit(np.log(scales[valid]), np.log(fluctuations[valid]), 1)
+    return float(alpha)
+
+
+def _round(value: Optional[float], digits: int = 1) -> Optional[float]:
+    """Round a feature value, preserving None"""
+    if value is None or not np.isfinite(value):
+        return None
+    return round(value, digits)
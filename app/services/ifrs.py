@@ -4,13 +4,19 @@ Proprietary frequency domain analysis for biosignals
 """
 
 import numpy as np
-from typing import Dict
+import time
+from collections import deque
+from typing import Dict, List
 import random
 
 from app.models.schemas import (
     BiosignalData, iFRSLayerResult, FrequencyBands,
     HRVFeatures, RhythmClassification
 )
+from app.services.hrv_nonlinear import submit_nonlinear_features
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
 
 
 class iFRSLayer:
@@ -20,6 +26,7 @@ class iFRSLayer:
     Features:
     - Fast Fourier Transform (FFT) for frequency analysis
     - Heart Rate Variability (HRV) feature extraction
+    - Nonlinear HRV (Poincaré, sample entropy, DFA) on a background executor
     - Frequency band power analysis (VLF, LF, HF)
     - Rhythm classification
     - Respiratory rate estimation
@@ -30,7 +37,27 @@ class iFRSLayer:
         self.sample_rate = 100  # Hz
         self.buffer_size = 256  # FFT window size
         self.hr_buffer = []
-        self.rr_intervals = []  # R-R intervals for HRV
+
+        # Beat-level R-R intervals for HRV (ms), processed at beat rate
+        self.rr_buffer_size = 300  # ~4-5 minutes of beats
+        self.rr_intervals = deque(maxlen=self.rr_buffer_size)
+        self.rr_batch_size = 4  # Beats accumulated before HRV is recomputed
+        self.rr_valid_range = (300.0, 2000.0)  # Physiological RR bounds in ms
+        self.pending_rr = []
+
+        # Fallback beat clock for devices that only report heart rate
+        self.tick_seconds = 0.1  # 10Hz sensor stream
+        self.beat_phase = 0.0
+
+        # HRV features are cached between beat batches
+        self.hrv_cache = None
+
+        # Nonlinear HRV runs in the background at a low cadence
+        self.nonlinear_interval = 30.0  # seconds between recomputes
+        self.nonlinear_min_beats = 64
+        self.nonlinear_future = None
+        self.nonlinear_submitted_at = None
+        self.nonlinear_features = {}
 
     def process(self, data: BiosignalData) -> Dict:
         """
@@ -47,8 +74,8 @@ class iFRSLayer:
         if len(self.hr_buffer) > self.buffer_size:
             self.hr_buffer.pop(0)
 
-        # Simulate R-R intervals from heart rate
-        self._update_rr_intervals(data.heart_rate)
+        # Queue beat-level R-R intervals and fold them in at beat rate
+        self._update_rr_intervals(data)
 
         # Perform frequency analysis
         dominant_freq, frequency_stability = self._analyze_frequency()
@@ -56,8 +83,13 @@ class iFRSLayer:
         # Calculate frequency band powers
         frequency_bands = self._calculate_frequency_bands()
 
-        # Extract HRV features
-        hrv_features = self._extract_hrv_features()
+        # Pick up / schedule nonlinear HRV without blocking on it
+        self._refresh_nonlinear_features()
+
+        # Extract HRV features (recomputed only when a beat batch lands)
+        if self.hrv_cache is None:
+            self.hrv_cache = self._extract_hrv_features()
+        hrv_features = self.hrv_cache
 
         # Classify rhythm
         rhythm_classification = self._classify_rhythm(
@@ -86,18 +118,82 @@ class iFRSLayer:
             'processing_notes': notes
         }
 
-    def _update_rr_intervals(self, heart_rate: float):
+    def _update_rr_intervals(self, data: BiosignalData):
+        """
+        Queue R-R intervals for the current sample and commit full batches
+
+        Devices that report beat-to-beat intervals are used directly (an
+        empty list means no beat landed in this sample). For heart-rate-only
+        devices one interval (60,000ms / heart_rate) is derived per elapsed
+        beat rather than per 10Hz tick.
+        """
+        if data.rr_intervals is not None:
+            self.pending_rr.extend(data.rr_intervals)
+        else:
+            self.pending_rr.extend(self._derive_rr_from_heart_rate(data.heart_rate))
+
+        if len(self.pending_rr) >= self.rr_batch_size:
+            self._commit_rr_batch()
+
+    def _derive_rr_from_heart_rate(self, heart_rate: float) -> List[float]:
+        """Emit one R-R interval for every beat elapsed during this tick"""
+        if heart_rate <= 0:
+            return []
+
+        self.beat_phase += self.tick_seconds * heart_rate / 60.0
+        beats = int(self.beat_phase)
+        self.beat_phase -= beats
+
+        return [60000.0 / heart_rate] * beats
+
+    def _commit_rr_batch(self):
         """
-        Update R-R intervals buffer from heart rate
-        R-R interval = 60,000ms / heart_rate
+        Fold pending beats into the R-R buffer and invalidate cached HRV
+
+        Intervals outside the physiological range (missed or extra beats)
+        are rejected before they reach the HRV statistics.
         """
-        if heart_rate > 0:
-            rr_interval = 60000.0 / heart_rate  # in milliseconds
-            self.rr_intervals.append(rr_interval)
+        batch = np.asarray(self.pending_rr, dtype=float)
+        self.pending_rr = []
+
+        low, high = self.rr_valid_range
+        batch = batch[(batch >= low) & (batch <= high)]
+        if batch.size == 0:
+            return
 
-            # Keep only recent intervals
-            if len(self.rr_intervals) > 100:
-                self.rr_intervals.pop(0)
+        self.rr_intervals.extend(batch.tolist())
+        self.hrv_cache = None
+
+    def _refresh_nonlinear_features(self):
+        """
+        Harvest finished nonlinear HRV results and schedule the next run
+
+        Never waits on the executor: the hot path only reads the cached
+        values, which are refreshed at most every `nonlinear_interval` seconds.
+        """
+        if self.nonlinear_future is not None:
+            if not self.nonlinear_future.done():
+                return
+
+            try:
+                self.nonlinear_features = self.nonlinear_future.result()
+                self.hrv_cache = None
+            except Exception as e:
+                logger.warning(f"Nonlinear HRV computation failed: {str(e)}")
+            self.nonlinear_future = None
+
+        if len(self.rr_intervals) < self.nonlinear_min_beats:
+            return
+
+        now = time.monotonic()
+        if (self.nonlinear_submitted_at is not None
+                and now - self.nonlinear_submitted_at < self.nonlinear_interval):
+            return
+
+        self.nonlinear_submitted_at = now
+        self.nonlinear_future = submit_nonlinear_features(
+            np.array(self.rr_intervals, dtype=float)
+        )
 
     def _analyze_frequency(self) -> tuple[float, float]:
         """
@@ -191,16 +287,18 @@ class iFRSLayer:
         RMSSD: Root Mean Square of Successive Differences
         SDNN: Standard Deviation of NN intervals
         pNN50: Percentage of successive NN intervals that differ by > 50ms
+        SD1/SD2, SampEn, DFA α1: latest background nonlinear results
         """
         if len(self.rr_intervals) < 5:
             return HRVFeatures(
                 rmssd=42.0,
                 sdnn=65.0,
                 pnn50=25.0,
-                hrv_score=75.0
+                hrv_score=75.0,
+                **self.nonlinear_features
             )
 
-        rr_array = np.array(self.rr_intervals[-50:])  # Use recent data
+        rr_array = np.array(self.rr_intervals)[-50:]  # Use recent beats
 
         # SDNN: Standard deviation of NN intervals
         sdnn = float(np.std(rr_array))
@@ -221,7 +319,8 @@ class iFRSLayer:
             rmssd=round(rmssd, 1),
             sdnn=round(sdnn, 1),
             pnn50=round(float(pnn50), 1),
-            hrv_score=round(hrv_score, 1)
+            hrv_score=round(hrv_score, 1),
+            **self.nonlinear_features
         )
 
     def _classify_rhythm(
@@ -300,6 +399,8 @@ class iFRSLayer:
         notes.append(f"Rhythm: {rhythm.value.replace('_', ' ').title()}")
         notes.append(f"HRV Score: {hrv.hrv_score:.1f}/100")
         notes.append(f"RMSSD: {hrv.rmssd:.1f}ms, SDNN: {hrv.sdnn:.1f}ms")
+        if hrv.sd1 is not None and hrv.sd2 is not None:
+            notes.append(f"SD1/SD2: {hrv.sd1:.1f}/{hrv.sd2:.1f}ms")
         notes.append("FFT analysis completed with Hanning window")
 
         return " | ".join(notes)
@@ -1,18 +1,31 @@
 """
 LIA Core™ Conversational Module
 Natural language interface for interacting with biosignal data and health insights
-Integrates with OpenAI API to provide conversational AI capabilities
+Integrates with an LLM provider (OpenAI by default) to provide conversational AI capabilities
 """
 
+import asyncio
+import hashlib
+import json
 import os
-from typing import List, Dict, Optional
+from contextlib import aclosing
+from typing import AsyncIterator, Hashable, List, Dict, Optional, Tuple
 from datetime import datetime
-from openai import OpenAI
 from dotenv import load_dotenv
 
 from app.models.schemas import (
     BiosignalData, LIAInsights, StreamDataResponse
 )
+from app.services.chat_cache import ChatResponseCache
+from app.services.chat_context import ChatContextManager, ContextRenderer, relevant_sections
+from app.services.conversation_store import ConversationStore
+from app.services.chat_tools import ChatToolbox
+from app.services.chat_intents import IntentRouter
+from app.services.chat_limits import (
+    ChatBusy, CircuitBreaker, ProviderNotConfigured, ProviderUnavailable, RateLimited, RateLimiter,
+    RequestCoalescer
+)
+from app.services.llm_providers import LLMProvider, create_provider
 
 # Load environment variables
 load_dotenv()
@@ -28,25 +41,88 @@ class LIAChatEngine:
     - Getting personalized health insights
     - Analyzing trends and patterns
     - Interactive health coaching
+
+    Completions go through an LLMProvider (pooled async OpenAI client, or
+    the deterministic local provider), so a slow completion never blocks
+    the event loop (and with it the real-time streams). Before a request
+    reaches the provider: a per-client rate limit, a circuit breaker that
+    fails fast while the provider is failing, coalescing of identical
+    in-flight completions, and a semaphore capping concurrent completions
+    (callers that cannot get a slot in time get a busy reply). The breaker
+    is checked before queueing for a slot, so an open breaker fails fast.
+    Direct lookups ("what's my heart rate?") are answered locally from the
+    current frame, and repeated questions about unchanged vitals from a
+    response cache, both without an API call. They keep working without a
+    provider (no API key); only questions that need the model then fail.
     """
 
-    def __init__(self):
-        """Initialize the LIA Chat Engine with OpenAI API"""
-        self.api_key = os.getenv("OPENAI_API_KEY")
-        if not self.api_key:
-            raise ValueError("OPENAI_API_KEY not found in environment variables")
-
-        # Initialize OpenAI client
-        self.client = OpenAI(
-            api_key=self.api_key,
-            timeout=30.0,
-            max_retries=2
+    def __init__(self, provider: Optional[LLMProvider] = None):
+        """
+        Initialize the LIA Chat Engine
+
+        Args:
+            provider: Completion backend (default: create_provider(), selected
+                by LIA_CHAT_PROVIDER; none if OpenAI has no API key)
+        """
+        # Request limits
+        self.max_concurrency = int(os.getenv("LIA_CHAT_MAX_CONCURRENCY", "8"))
+        self.queue_timeout = float(os.getenv("LIA_CHAT_QUEUE_TIMEOUT", "10"))
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.active_completions = 0
+
+        # Admission control in front of the provider
+        self.rate_limiter = RateLimiter(
+            rate_per_minute=float(os.getenv("LIA_CHAT_RATE_PER_MINUTE", "20")),
+            burst=int(os.getenv("LIA_CHAT_RATE_BURST", "5"))
+        )
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("LIA_CHAT_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.getenv("LIA_CHAT_BREAKER_RESET", "30"))
         )
-        self.model = "gpt-4o-mini"  # Using GPT-4o-mini for cost-effectiveness and speed
+        self.coalescer = RequestCoalescer()
+
+        self.provider = provider or create_provider(max_connections=self.max_concurrency)
+        self.model = self.provider.model if self.provider else os.getenv("LIA_CHAT_MODEL", "gpt-4o-mini")
+        self.completion_parameters = {
+            "temperature": 0.7,
+            "max_tokens": 500,
+            "top_p": 0.9,
+            "frequency_penalty": 0.3,
+            "presence_penalty": 0.3
+        }
 
         # Conversation history per session
-        self.conversations: Dict[str, List[Dict[str, str]]] = {}
         self.max_history = 20  # Keep last 20 messages per session
+        # Bounded in memory (idle TTL, LRU), written behind to the database
+        self.conversations = ConversationStore.from_env(max_messages=self.max_history)
+
+        # Prompt budget (system prompt + summary + history + context + message)
+        self.context_manager = ChatContextManager(
+            self.model,
+            max_prompt_tokens=int(os.getenv("LIA_CHAT_PROMPT_TOKENS", "3000")),
+            summary_tokens=int(os.getenv("LIA_CHAT_SUMMARY_TOKENS", "300"))
+        )
+
+        # Biosignal context rendered once per (device, frame sequence)
+        self.context_renderer = ContextRenderer(
+            max_frames=int(os.getenv("LIA_CHAT_CONTEXT_FRAMES", "256"))
+        )
+
+        # Tool calling: completion rounds per message and tokens of tool results per message
+        self.tools_enabled = os.getenv("LIA_CHAT_TOOLS", "1").lower() in ("1", "true", "yes")
+        self.max_tool_rounds = int(os.getenv("LIA_CHAT_MAX_TOOL_ROUNDS", "3"))
+        self.tool_result_tokens = int(os.getenv("LIA_CHAT_TOOL_TOKENS", "800"))
+
+        # Direct metric lookups answered locally from the current frame
+        self.intent_router = (
+            IntentRouter() if os.getenv("LIA_CHAT_FAST_PATH", "1").lower() in ("1", "true", "yes") else None
+        )
+
+        # Answers to repeated questions (0 disables)
+        self.response_cache = ChatResponseCache(
+            max_entries=int(os.getenv("LIA_CHAT_CACHE_SIZE", "1000")),
+            ttl_seconds=float(os.getenv("LIA_CHAT_CACHE_TTL", "300"))
+        )
 
         # System prompt defining LIA's personality and capabilities
         self.system_prompt = """You are LIA (Lifestyle Intelligence Analysis), an advanced AI health assistant integrated with a wearable biosignal monitoring system.
@@ -81,76 +157,250 @@ When responding:
 - Keep responses concise but informative (2-4 sentences typically)
 """
 
-    def get_context_from_stream_data(self, stream_data: StreamDataResponse) -> str:
+    def render_context_sections(
+        self,
+        stream_data: StreamDataResponse,
+        sections: Optional[List[str]] = None,
+        frame_key: Optional[Hashable] = None
+    ) -> Tuple[str, Dict[str, str]]:
+        """
+        Biosignal context as separately budgetable sections
+
+        Args:
+            stream_data: Current biosignal stream data with all layer outputs
+            sections: Section names to render (all if omitted)
+            frame_key: (device ID, frame sequence) to reuse the frame's rendered sections
+
+        Returns:
+            Header line and {section name: text} in the requested order
+        """
+        return self.context_renderer.render(stream_data, sections, frame_key)
+
+    def get_context_from_stream_data(
+        self,
+        stream_data: StreamDataResponse,
+        sections: Optional[List[str]] = None,
+        frame_key: Optional[Hashable] = None
+    ) -> str:
         """
         Extract relevant context from stream data for the conversation
 
         Args:
             stream_data: Current biosignal stream data with all layer outputs
+            sections: Section names to include (all if omitted)
+            frame_key: (device ID, frame sequence) to reuse the frame's rendered sections
 
         Returns:
             Formatted context string for the AI
         """
-        raw = stream_data.raw_signals
-        clarity = stream_data.clarity_layer
-        ifrs = stream_data.ifrs_layer
-        timesystems = stream_data.timesystems_layer
-        lia = stream_data.lia_insights
-
-        context = f"""
-CURRENT BIOSIGNAL DATA (as of {stream_data.timestamp.strftime('%Y-%m-%d %H:%M:%S')}):
-
-Raw Signals:
-- Heart Rate: {raw.heart_rate:.1f} BPM
-- Blood Oxygen (SpO2): {raw.spo2:.1f}%
-- Body Temperature: {raw.temperature:.1f}°C
-- Activity Level: {raw.activity:.1f} steps/min
-
-Clarity™ Layer (Signal Quality):
-- Overall Quality Score: {clarity.quality_score:.2f}/1.0
-- Signal-to-Noise Ratio: {clarity.signal_to_noise_ratio:.1f} dB
-- Quality Assessment: {clarity.quality_assessment.value}
-- Artifacts Detected: {', '.join(clarity.artifacts_detected) if clarity.artifacts_detected else 'None'}
-
-iFRS™ Layer (Frequency Analysis):
-- Dominant Frequency: {ifrs.dominant_frequency:.2f} Hz
-- Rhythm Classification: {ifrs.rhythm_classification.value}
-- HRV Score: {ifrs.hrv_features.hrv_score:.1f}/100
-- HRV Metrics:
-  * RMSSD: {ifrs.hrv_features.rmssd:.1f} ms
-  * SDNN: {ifrs.hrv_features.sdnn:.1f} ms
-  * pNN50: {ifrs.hrv_features.pnn50:.1f}%
-- LF/HF Ratio: {ifrs.frequency_bands.lf_hf_ratio:.2f}
-- Respiratory Rate: {ifrs.respiratory_rate:.1f} breaths/min
-
-Timesystems™ Layer (Temporal Analysis):
-- Pattern Type: {timesystems.pattern_type.value}
-- Circadian Phase: {timesystems.circadian_phase.value}
-- Temporal Consistency: {timesystems.temporal_consistency:.2f}/1.0
-- Rhythm Score: {timesystems.rhythm_score:.1f}/100
-- Circadian Alignment Score: {timesystems.circadian_alignment.alignment_score:.2f}/1.0
-
-LIA Health Insights:
-- Detected Condition: {lia.condition}
-- Confidence: {lia.confidence:.1%}
-- Overall Wellness Score: {lia.wellness_score:.1f}/100
-- Wellness Breakdown:
-  * Cardiovascular Health: {lia.wellness_assessment.cardiovascular_health:.1f}/100
-  * Respiratory Health: {lia.wellness_assessment.respiratory_health:.1f}/100
-  * Activity Level: {lia.wellness_assessment.activity_level:.1f}/100
-  * Stress Level: {lia.wellness_assessment.stress_level:.1f}/100
-- Risk Factors: {', '.join(lia.risk_factors) if lia.risk_factors else 'None identified'}
-- Positive Indicators: {', '.join(lia.positive_indicators) if lia.positive_indicators else 'None'}
-- Recommendation: {lia.recommendation}
-"""
-        return context
+        header, rendered = self.render_context_sections(stream_data, sections, frame_key)
+        return "\n" + header + "\n" + "".join(rendered.values())
+
+    def _build_messages(
+        self,
+        user_message: str,
+        stream_data: Optional[StreamDataResponse],
+        session_id: str,
+        include_context: bool,
+        tools: Optional[ChatToolbox] = None,
+        frame_key: Optional[Hashable] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Token-budgeted prompt for one message
+
+        System prompt, rolling summary, as much recent history as fits,
+        the biosignal data for this turn only and the user message, within
+        `max_prompt_tokens`. With tools, the data is a short note and the
+        model fetches values itself (room for tool results is reserved);
+        otherwise it is the context sections relevant to the question.
+        """
+        header, sections, reserve = "", None, 0
+        if tools is not None:
+            # Tool results plus the assistant messages carrying the calls
+            header, reserve = tools.preamble(), self.tool_result_tokens + 60 * self.max_tool_rounds
+        elif include_context and stream_data:
+            header, sections = self.render_context_sections(
+                stream_data, relevant_sections(user_message), frame_key
+            )
+            header = "Here is the user's current real-time biosignal data:\n" + header
+
+        return self.context_manager.build(
+            system_prompt=self.system_prompt,
+            user_message=user_message,
+            history=self.conversations.history(session_id),
+            summary=self.conversations.summary(session_id),
+            context_header=header,
+            context_sections=sections,
+            reserve_tokens=reserve
+        )
+
+    def _record_exchange(self, session_id: str, user_message: str, assistant_message: str):
+        """Append a completed exchange to the session history"""
+        history = self.conversations.history(session_id) + [
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": assistant_message}
+        ]
+        summary = self.conversations.summary(session_id)
+
+        # Trim history if too long, folding the oldest turns into the rolling summary
+        if len(history) > self.max_history:
+            trimmed = len(history) - self.max_history
+            summary = self.context_manager.fold(summary, history[:trimmed])
+            history = history[trimmed:]
+
+        self.conversations.put(session_id, history, summary)
 
-    def chat(
+    def _cache_key(
+        self,
+        user_message: str,
+        stream_data: Optional[StreamDataResponse],
+        session_id: str,
+        include_context: bool
+    ) -> Optional[tuple]:
+        """Response cache key for a message (None if it must go to the model)"""
+        has_history = bool(self.conversations.history(session_id))
+        return self.response_cache.key(user_message, stream_data, include_context, has_history)
+
+    def _local_answer(
+        self, user_message: str, stream_data: Optional[StreamDataResponse], include_context: bool
+    ) -> Optional[Tuple[List[str], str]]:
+        """(intents, templated answer) for a direct metric lookup, else None"""
+        if self.intent_router is None or not include_context:
+            return None
+        return self.intent_router.answer(user_message, stream_data)
+
+    def _local_result(self, session_id: str, intents: List[str], response: str) -> Dict[str, any]:
+        """Chat result for an answer from the local intent fast-path"""
+        return {
+            "success": True,
+            "response": response,
+            "timestamp": datetime.now().isoformat(),
+            "session_id": session_id,
+            "tokens_used": 0,
+            "model": IntentRouter.MODEL,
+            "cached": False,
+            "intents": intents
+        }
+
+    def _cached_result(self, session_id: str, cached: Dict) -> Dict[str, any]:
+        """Chat result for an answer served from the response cache"""
+        return {
+            "success": True,
+            "response": cached["response"],
+            "timestamp": datetime.now().isoformat(),
+            "session_id": session_id,
+            "tokens_used": 0,
+            "model": cached["model"],
+            "cached": True
+        }
+
+    async def _acquire_slot(self):
+        """
+        Admit one completion: circuit breaker first, then a concurrency slot
+
+        Waiting for the slot is bounded by the queue timeout (ChatBusy). A
+        half-open trial granted by the breaker is released if no slot is
+        obtained.
+        """
+        self.circuit_breaker.allow()
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.circuit_breaker.cancel_trial()
+            raise ChatBusy(self.max_concurrency, self.queue_timeout)
+        except BaseException:
+            self.circuit_breaker.cancel_trial()
+            raise
+        self.active_completions += 1
+
+    def _release_slot(self):
+        self.active_completions -= 1
+        self.semaphore.release()
+
+    async def _complete(self, messages: List[Dict], tools: Optional[ChatToolbox], round_index: int) -> Dict:
+        """
+        One completion, shared with identical requests already in flight
+
+        Identical requests (same model, parameters and messages, e.g. a
+        retried or double-submitted message) wait for the first one's
+        result instead of calling the provider again.
+        """
+        parameters = {**self._tool_parameters(tools, round_index), **self.completion_parameters}
+        key = hashlib.sha1(
+            json.dumps([self.model, messages, parameters], sort_keys=True, default=str).encode()
+        ).hexdigest()
+        snapshot = list(messages)
+        return await self.coalescer.run(key, lambda: self._call_provider(snapshot, parameters))
+
+    async def _call_provider(self, messages: List[Dict], parameters: Dict) -> Dict:
+        """Provider completion guarded by the circuit breaker, inside a concurrency slot"""
+        await self._acquire_slot()
+        try:
+            try:
+                completion = await self.provider.complete(messages, **parameters)
+            except asyncio.CancelledError:
+                self.circuit_breaker.cancel_trial()
+                raise
+            except Exception:
+                self.circuit_breaker.record_failure()
+                raise
+            self.circuit_breaker.record_success()
+            return completion
+        finally:
+            self._release_slot()
+
+    @staticmethod
+    def _error_status(error: Exception) -> Dict[str, any]:
+        """HTTP status and retry hint for admission errors"""
+        if isinstance(error, RateLimited):
+            return {"status_code": 429, "retry_after": error.retry_after}
+        if isinstance(error, (ProviderUnavailable, ChatBusy)):
+            return {"status_code": 503, "retry_after": error.retry_after}
+        if isinstance(error, ProviderNotConfigured):
+            return {"status_code": 503, "retry_after": None}
+        return {}
+
+    async def _run_tools(
+        self, messages: List[Dict], tools: ChatToolbox, calls: List[Dict], budget: int
+    ) -> int:
+        """
+        Execute the model's tool calls and append the results to the messages
+
+        Results share one token budget per request (reserved in the prompt
+        budget); a call made after it is spent gets an error result.
+
+        Returns:
+            Remaining tool result budget
+        """
+        messages.append({"role": "assistant", "content": None, "tool_calls": calls})
+        for call in calls:
+            if budget > 0:
+                result = await tools.call(call["function"]["name"], call["function"]["arguments"])
+                result = self.context_manager.counter.truncate(result, budget)
+            else:
+                result = '{"error":"Data budget for this answer is used up"}'
+            budget -= self.context_manager.counter.count(result) + 4
+            messages.append({"role": "tool", "tool_call_id": call["id"], "content": result})
+        return budget
+
+    def _tool_parameters(self, tools: Optional[ChatToolbox], round_index: int) -> Dict:
+        """Tool definitions for a completion round (the last round must answer)"""
+        if tools is None:
+            return {}
+        return {
+            "tools": tools.definitions,
+            "tool_choice": "auto" if round_index < self.max_tool_rounds else "none"
+        }
+
+    async def chat(
         self,
         user_message: str,
         stream_data: Optional[StreamDataResponse] = None,
         session_id: str = "default",
-        include_context: bool = True
+        include_context: bool = True,
+        tools: Optional[ChatToolbox] = None,
+        frame_key: Optional[Hashable] = None,
+        client_id: str = "anonymous"
     ) -> Dict[str, any]:
         """
         Process a user message and generate a response
@@ -160,68 +410,62 @@ LIA Health Insights:
             stream_data: Current biosignal data (optional, for context)
             session_id: Session identifier for conversation history
             include_context: Whether to include biosignal data context
+            tools: Data access tools; when given, the model fetches the data it
+                needs through tool calls instead of receiving the context block
+            frame_key: (device ID, frame sequence) of stream_data; requests on
+                the same frame share its rendered context
+            client_id: Caller identity the rate limit is keyed on (remote
+                address or auth subject, never the client-chosen session_id)
 
         Returns:
             Dictionary containing response and metadata
         """
         try:
-            # Initialize conversation history for this session if needed
-            if session_id not in self.conversations:
-                self.conversations[session_id] = []
-
-            # Build messages array
-            messages = [
-                {"role": "system", "content": self.system_prompt}
-            ]
-
-            # Add conversation history
-            messages.extend(self.conversations[session_id])
-
-            # Add current biosignal data context if available and requested
-            if include_context and stream_data:
-                context = self.get_context_from_stream_data(stream_data)
-                context_message = {
-                    "role": "system",
-                    "content": f"Here is the user's current real-time biosignal data:\n{context}"
-                }
-                messages.append(context_message)
-
-            # Add user message
-            messages.append({"role": "user", "content": user_message})
-
-            # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=500,
-                top_p=0.9,
-                frequency_penalty=0.3,
-                presence_penalty=0.3
+            await self.conversations.load(session_id)
+            local = self._local_answer(user_message, stream_data, include_context)
+            if local is not None:
+                intents, response = local
+                self._record_exchange(session_id, user_message, response)
+                return self._local_result(session_id, intents, response)
+
+            cache_key = self._cache_key(user_message, stream_data, session_id, include_context)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self._record_exchange(session_id, user_message, cached["response"])
+                return self._cached_result(session_id, cached)
+
+            tools = tools if include_context else None
+            messages = self._build_messages(
+                user_message, stream_data, session_id, include_context, tools, frame_key
             )
 
+            # Provider call(s): rate limit per client, then coalesced, bounded completions
+            if self.provider is None:
+                raise ProviderNotConfigured()
+            self.rate_limiter.acquire(client_id)
+            tokens_used, budget = 0, self.tool_result_tokens
+            for round_index in range(self.max_tool_rounds + 1):
+                completion = await self._complete(messages, tools, round_index)
+                tokens_used += completion["tokens_used"]
+                if not completion["tool_calls"]:
+                    break
+                budget = await self._run_tools(messages, tools, completion["tool_calls"], budget)
+
             # Extract response
-            assistant_message = response.choices[0].message.content
+            assistant_message = completion["content"] or ""
 
             # Update conversation history
-            self.conversations[session_id].append(
-                {"role": "user", "content": user_message}
-            )
-            self.conversations[session_id].append(
-                {"role": "assistant", "content": assistant_message}
-            )
-
-            # Trim history if too long
-            if len(self.conversations[session_id]) > self.max_history:
-                self.conversations[session_id] = self.conversations[session_id][-self.max_history:]
+            self._record_exchange(session_id, user_message, assistant_message)
+            self.response_cache.set(cache_key, assistant_message, self.model, tokens_used)
 
             return {
                 "success": True,
                 "response": assistant_message,
                 "timestamp": datetime.now().isoformat(),
                 "session_id": session_id,
-                "tokens_used": response.usage.total_tokens,
-                "model": self.model
+                "tokens_used": tokens_used,
+                "model": self.model,
+                "cached": False
             }
 
         except Exception as e:
@@ -230,14 +474,160 @@ LIA Health Insights:
                 "error": str(e),
                 "response": "I'm sorry, I encountered an error processing your request. Please try again.",
                 "timestamp": datetime.now().isoformat(),
-                "session_id": session_id
+                "session_id": session_id,
+                **self._error_status(e)
+            }
+
+    async def chat_stream(
+        self,
+        user_message: str,
+        stream_data: Optional[StreamDataResponse] = None,
+        session_id: str = "default",
+        include_context: bool = True,
+        tools: Optional[ChatToolbox] = None,
+        frame_key: Optional[Hashable] = None,
+        client_id: str = "anonymous"
+    ) -> AsyncIterator[Dict[str, any]]:
+        """
+        Process a user message, yielding the response as it is generated
+
+        Yields dicts with a "type":
+        - start: session_id, model
+        - tool: name (the model is reading data through a tool)
+        - token: content (text delta)
+        - done: response (full text), tokens_used, timestamp
+        - error: error, response (fallback text)
+
+        The exchange is added to the conversation history only once the
+        completion has finished; an abandoned stream is closed upstream
+        and leaves the history unchanged. Local and cached answers arrive
+        as a single token. Arguments are the same as for chat().
+        """
+        try:
+            await self.conversations.load(session_id)
+            local = self._local_answer(user_message, stream_data, include_context)
+            if local is not None:
+                intents, response = local
+                yield {"type": "start", "session_id": session_id, "model": IntentRouter.MODEL}
+                yield {"type": "token", "content": response}
+                self._record_exchange(session_id, user_message, response)
+                yield {"type": "done", **self._local_result(session_id, intents, response)}
+                return
+
+            cache_key = self._cache_key(user_message, stream_data, session_id, include_context)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                yield {"type": "start", "session_id": session_id, "model": cached["model"]}
+                yield {"type": "token", "content": cached["response"]}
+                self._record_exchange(session_id, user_message, cached["response"])
+                yield {"type": "done", **self._cached_result(session_id, cached)}
+                return
+
+            if self.provider is None:
+                raise ProviderNotConfigured()
+            self.rate_limiter.acquire(client_id)
+            tools = tools if include_context else None
+            messages = self._build_messages(
+                user_message, stream_data, session_id, include_context, tools, frame_key
+            )
+            await self._acquire_slot()
+        except Exception as e:
+            yield self._stream_error(session_id, e)
+            return
+
+        try:
+            yield {"type": "start", "session_id": session_id, "model": self.model}
+
+            parts, tokens_used, budget = [], None, self.tool_result_tokens
+            for round_index in range(self.max_tool_rounds + 1):
+                if round_index:
+                    self.circuit_breaker.allow()  # Round 0 was admitted with the slot
+                calls: Dict[int, Dict] = {}
+                try:
+                    async with aclosing(self.provider.stream(
+                        messages, **self._tool_parameters(tools, round_index), **self.completion_parameters
+                    )) as events:
+                        async for event in events:
+                            if event["type"] == "usage":
+                                tokens_used = (tokens_used or 0) + event["tokens_used"]
+                            elif event["type"] == "token":
+                                parts.append(event["content"])
+                                yield {"type": "token", "content": event["content"]}
+                            elif event["type"] == "tool_call":
+                                # Tool calls arrive in fragments keyed by index
+                                call = calls.setdefault(event["index"], {
+                                    "id": None, "type": "function", "function": {"name": "", "arguments": ""}
+                                })
+                                call["id"] = event["id"] or call["id"]
+                                call["function"]["name"] += event["name"] or ""
+                                call["function"]["arguments"] += event["arguments"] or ""
+                except Exception:
+                    self.circuit_breaker.record_failure()
+                    raise
+                except BaseException:
+                    # Client went away mid-stream: not the provider's fault
+                    self.circuit_breaker.cancel_trial()
+                    raise
+                self.circuit_breaker.record_success()
+
+                if not calls:
+                    break
+                for call in calls.values():
+                    yield {"type": "tool", "name": call["function"]["name"]}
+                budget = await self._run_tools(messages, tools, [calls[i] for i in sorted(calls)], budget)
+
+            assistant_message = "".join(parts)
+            self._record_exchange(session_id, user_message, assistant_message)
+            self.response_cache.set(cache_key, assistant_message, self.model, tokens_used)
+
+            yield {
+                "type": "done",
+                "response": assistant_message,
+                "timestamp": datetime.now().isoformat(),
+                "session_id": session_id,
+                "tokens_used": tokens_used,
+                "model": self.model,
+                "cached": False
             }
+        except Exception as e:
+            yield self._stream_error(session_id, e)
+        finally:
+            self._release_slot()
+
+    def _stream_error(self, session_id: str, error: Exception) -> Dict[str, any]:
+        return {
+            "type": "error",
+            "error": str(error),
+            "response": "I'm sorry, I encountered an error processing your request. Please try again.",
+            "timestamp": datetime.now().isoformat(),
+            "session_id": session_id,
+            **self._error_status(error)
+        }
+
+    def status(self) -> Dict[str, any]:
+        """Provider and admission control state"""
+        breaker = self.circuit_breaker.status()
+        return {
+            "provider": self.provider.name if self.provider else "none",
+            "model": self.model,
+            "circuit_breaker": breaker["state"],
+            "consecutive_failures": breaker["consecutive_failures"],
+            "active_completions": self.active_completions,
+            "max_concurrency": self.max_concurrency,
+            "rate_limit_per_minute": self.rate_limiter.rate * 60,
+            "rate_limit_burst": self.rate_limiter.burst,
+            "coalesced_requests": self.coalescer.coalesced
+        }
+
+    async def aclose(self):
+        """Close the provider's connections"""
+        if self.provider is not None:
+            await self.provider.aclose()
 
     def clear_history(self, session_id: str = "default"):
         """Clear conversation history for a session"""
-        if session_id in self.conversations:
-            self.conversations[session_id] = []
+        self.conversations.clear(session_id)
 
-    def get_conversation_history(self, session_id: str = "default") -> List[Dict[str, str]]:
-        """Get conversation history for a session"""
-        return self.conversations.get(session_id, [])
+    async def get_conversation_history(self, session_id: str = "default") -> List[Dict[str, str]]:
+        """Get conversation history for a session (reloaded from the database if evicted)"""
+        return list(await self.conversations.load(session_id))
@@ -0,0 +1,107 @@
+"""
+LIA Classifier - Calibrated condition probabilities
+Binned multinomial logistic regression with batched pure-numpy inference
+"""
+
+import json
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+
+class LIAClassifier:
+    """
+    Multinomial logistic regression over binned features
+
+    Numeric features are cut into fixed bins and categorical features are
+    one-hot encoded (with an extra slot for unknown values), so the model is
+    additive per feature and captures threshold-shaped effects. With a
+    one-hot design, X @ W reduces to summing one weight row per feature:
+
+        logits = b + Σ_f W[offset_f + bin_f]
+        p = softmax(logits / T)
+
+    where T is the temperature fitted on held-out data after training.
+
+    Model directory layout (written by train_lia_classifier.py):
+    - weights.npy: [bins, classes] float32, memory-mapped
+    - bias.npy: [classes] float32
+    - model.json: classes, bin edges, vocabularies, temperature, metrics
+
+    Weights are mapped read-only, so every worker process shares the same
+    page-cache copy. New models are written as new files, never in place.
+    """
+
+    def __init__(self, model_dir: Path):
+        model_dir = Path(model_dir)
+        with open(model_dir / "model.json", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        self.version = self.meta.get('version')
+        self.classes: List[str] = self.meta['classes']
+        self.temperature = float(self.meta.get('temperature', 1.0))
+
+        self.numeric_edges = {
+            name: np.asarray(edges, dtype=np.float64)
+            for name, edges in self.meta['numeric'].items()
+        }
+        self.categories: Dict[str, List[str]] = self.meta['categorical']
+
+        # Row offset of each feature's block in the weight matrix
+        self.offsets = {}
+        offset = 0
+        for name, edges in self.numeric_edges.items():
+            self.offsets[name] = offset
+            offset += len(edges) + 1
+        for name, vocabulary in self.categories.items():
+            self.offsets[name] = offset
+            offset += len(vocabulary) + 1
+
+        self.weights = np.load(model_dir / "weights.npy", mmap_mode='r')
+        self.bias = np.load(model_dir / "bias.npy")
+        if self.weights.shape != (offset, len(self.classes)):
+            raise ValueError(
+                f"Classifier weights have shape {self.weights.shape}, expected {(offset, len(self.classes))}"
+            )
+
+    @property
+    def feature_names(self) -> List[str]:
+        return list(self.numeric_edges) + list(self.categories)
+
+    def bin_indices(self, rows: Sequence[Dict]) -> np.ndarray:
+        """
+        Feature dicts → [samples, features] weight-row indices
+
+        Numeric values are binned with searchsorted per column; categorical
+        values map to their vocabulary slot (last slot if unknown).
+        """
+        indices = np.empty((len(rows), len(self.offsets)), dtype=np.int64)
+
+        for j, (name, edges) in enumerate(self.numeric_edges.items()):
+            column = np.fromiter((row[name] for row in rows), dtype=np.float64, count=len(rows))
+            indices[:, j] = self.offsets[name] + np.searchsorted(edges, column, side='right')
+
+        j = len(self.numeric_edges)
+        for name, vocabulary in self.categories.items():
+            lookup = {value: i for i, value in enumerate(vocabulary)}
+            unknown = len(vocabulary)
+            indices[:, j] = [self.offsets[name] + lookup.get(row[name], unknown) for row in rows]
+            j += 1
+
+        return indices
+
+    def predict_proba_indices(self, indices: np.ndarray) -> np.ndarray:
+        """Calibrated [samples, classes] probabilities from bin indices"""
+        logits = self.weights[indices].sum(axis=1, dtype=np.float64) + self.bias
+        logits /= self.temperature
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        return probabilities
+
+    def predict_proba(self, rows: Sequence[Dict]) -> np.ndarray:
+        """Calibrated [samples, classes] probabilities for feature dicts"""
+        if len(rows) == 0:
+            return np.zeros((0, len(self.classes)))
+        return self.predict_proba_indices(self.bin_indices(rows))
+
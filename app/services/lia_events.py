@@ -0,0 +1,98 @@
+"""
+LIA Events - Condition transitions and risk alerts with hysteresis
+Turns per-sample LIA output into a few typed events per hour
+"""
+
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+from app.utils.timebase import now_ms
+
+
+class LIAEventDetector:
+    """
+    Debounced LIA state changes
+
+    Condition: the reported condition switches only when one condition
+    holds at least `confirm_fraction` of the last `confirm_window` entries
+    of the engine's condition history, so a flicker between two conditions
+    near a rule boundary never produces an event.
+
+    Risk factors: asymmetric hysteresis — raised after `risk_enter`
+    consecutive samples with the risk, cleared after `risk_exit`
+    consecutive samples without it.
+
+    Events (dicts):
+    - condition_changed: condition, previous_condition
+    - risk_raised / risk_cleared: risk_factor, condition
+    """
+
+    def __init__(
+        self, confirm_window: int = 20, confirm_fraction: float = 0.8,
+        risk_enter: int = 10, risk_exit: int = 50
+    ):
+        self.confirm_window = confirm_window
+        self.confirm_fraction = confirm_fraction
+        self.risk_enter = risk_enter
+        self.risk_exit = risk_exit
+
+        self.reported_condition: Optional[str] = None
+        self.active_risks: Dict[str, int] = {}    # risk → consecutive samples without it
+        self.pending_risks: Dict[str, int] = {}   # risk → consecutive samples with it
+
+    def update(
+        self, condition_history: Sequence[str], risk_factors: Sequence[str],
+        confidence: float, timestamp_ms: Optional[int] = None,
+        lia_version: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Advance the detector by one analysed sample
+
+        Args:
+            condition_history: LIAEngine.condition_history, newest last
+            risk_factors: Risk factors flagged on this sample
+            confidence: Confidence in this sample's condition
+            timestamp_ms: Sample time (now if omitted)
+            lia_version: Model version that produced the sample
+
+        Returns:
+            Events triggered by this sample (usually none)
+        """
+        timestamp_ms = timestamp_ms if timestamp_ms is not None else now_ms()
+        current = condition_history[-1] if condition_history else None
+        base = {
+            'timestamp_ms': timestamp_ms, 'confidence': confidence, 'lia_version': lia_version
+        }
+        events = []
+
+        window = condition_history[-self.confirm_window:]
+        if len(window) == self.confirm_window:
+            candidate, count = Counter(window).most_common(1)[0]
+            if candidate != self.reported_condition and count >= self.confirm_fraction * len(window):
+                events.append({
+                    **base, 'type': 'condition_changed', 'condition': candidate,
+                    'previous_condition': self.reported_condition
+                })
+                self.reported_condition = candidate
+
+        present = set(risk_factors)
+        for risk in present:
+            if risk in self.active_risks:
+                self.active_risks[risk] = 0
+                continue
+            self.pending_risks[risk] = self.pending_risks.get(risk, 0) + 1
+            if self.pending_risks[risk] >= self.risk_enter:
+                del self.pending_risks[risk]
+                self.active_risks[risk] = 0
+                events.append({**base, 'type': 'risk_raised', 'risk_factor': risk, 'condition': current})
+
+        for risk in [r for r in self.pending_risks if r not in present]:
+            del self.pending_risks[risk]
+
+        for risk in [r for r in self.active_risks if r not in present]:
+            self.active_risks[risk] += 1
+            if self.active_risks[risk] >= self.risk_exit:
+                del self.active_risks[risk]
+                events.append({**base, 'type': 'risk_cleared', 'risk_factor': risk, 'condition': current})
+
+        return events
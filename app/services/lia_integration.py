@@ -4,12 +4,14 @@ Combines outputs from all proprietary layers for comprehensive health insights
 """
 
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence
 import random
 
 from app.models.schemas import (
     BiosignalData, WellnessAssessment, LIAInsights
 )
+from app.services.lia_events import LIAEventDetector
+from app.services.lia_registry import LIAModelBundle, LIAModelRegistry, get_registry
 
 
 class LIAEngine:
@@ -27,9 +29,20 @@ class LIAEngine:
     - Risk factor identification
     - Personalized recommendations
     - Multi-dimensional health assessment
+    - Debounced condition-change and risk events
+
+    Condition, risk-factor and positive-indicator rules come from a
+    declarative table compiled to numpy masks; probabilities from a
+    calibrated classifier trained offline, and confidence from signal
+    quality and the classifier's agreement with the rules; recommendations from a
+    text table. All three are versioned in the LIA model registry and
+    resolved per call, so new versions apply without a restart.
     """
 
-    def __init__(self):
+    def __init__(
+        self, device_id: Optional[str] = None,
+        registry: Optional[LIAModelRegistry] = None
+    ):
         self.conditions = [
             'Normal Resting',
             'Light Activity',
@@ -45,13 +58,20 @@ class LIAEngine:
 
         self.condition_history = []
         self.history_size = 100
+        self.event_detector = LIAEventDetector()
+
+        self.device_id = device_id
+        self.registry = registry or get_registry()
+        self.last_features: Optional[Dict] = None
 
     def analyze(
         self,
         raw_data: BiosignalData,
         clarity_result: Dict,
         ifrs_result: Dict,
-        timesystems_result: Dict
+        timesystems_result: Dict,
+        classification: Optional[Dict] = None,
+        bundle: Optional[LIAModelBundle] = None
     ) -> Dict:
         """
         Perform comprehensive LIA analysis
@@ -61,6 +81,9 @@ class LIAEngine:
             clarity_result: Clarity™ layer output
             ifrs_result: iFRS™ layer output
             timesystems_result: Timesystems™ layer output
+            classification: This sample's row from classify when a whole
+                block was classified at once (computed here if omitted)
+            bundle: Model version that produced `classification`
 
         Returns:
             LIA insights including condition, wellness, recommendations
@@ -68,24 +91,26 @@ class LIAEngine:
         # Extract key metrics from each layer
         signal_quality = clarity_result['quality_score']
         hrv_features = ifrs_result['hrv_features']
-        rhythm_class = ifrs_result['rhythm_classification']
-        pattern_type = timesystems_result['pattern_type']
         circadian_alignment = timesystems_result['circadian_alignment']
 
-        # Classify condition using ensemble approach
-        condition = self._classify_condition(
-            raw_data, hrv_features, rhythm_class, pattern_type
+        # Classify condition and flag risks/positives from the rule tables
+        self.last_features = self.extract_features(
+            raw_data, clarity_result, ifrs_result, timesystems_result
         )
+        bundle = bundle or self.model_bundle()
+        if classification is None:
+            classification = self.classify([self.last_features], bundle)[0]
+        condition = classification['condition']
+
+        # Calibrated probability distribution from the classifier
+        probabilities = classification['probabilities']
 
-        # Calculate confidence in classification
+        # Confidence: measurement quality, discounted when the classifier disagrees with the rules
         confidence = self._calculate_confidence(
             signal_quality, clarity_result['signal_to_noise_ratio'],
-            timesystems_result['temporal_consistency']
+            timesystems_result['temporal_consistency'], probabilities, condition
         )
 
-        # Generate probability distribution
-        probabilities = self._generate_probabilities(condition)
-
         # Perform wellness assessment
         wellness_assessment = self._assess_wellness(
             raw_data, hrv_features, circadian_alignment, signal_quality
@@ -94,19 +119,13 @@ class LIAEngine:
         # Calculate overall wellness score
         wellness_score = wellness_assessment.overall_wellness
 
-        # Identify risk factors
-        risk_factors = self._identify_risk_factors(
-            raw_data, hrv_features, clarity_result, circadian_alignment
-        )
-
-        # Identify positive indicators
-        positive_indicators = self._identify_positive_indicators(
-            raw_data, hrv_features, signal_quality, circadian_alignment
-        )
+        # Risk factors and positive indicators
+        risk_factors = classification['risk_factors']
+        positive_indicators = classification['positive_indicators']
 
         # Generate recommendation
         recommendation = self._generate_recommendation(
-            condition, wellness_score, risk_factors
+            bundle.recommendations, condition, wellness_score, risk_factors
         )
 
         # Store in history
@@ -114,6 +133,12 @@ class LIAEngine:
         if len(self.condition_history) > self.history_size:
             self.condition_history.pop(0)
 
+        # Condition transitions and risk alerts (hysteresis over history)
+        events = self.event_detector.update(
+            self.condition_history, risk_factors, confidence,
+            raw_data.timestamp_ms, bundle.version
+        )
+
         return {
             'condition': condition,
             'confidence': confidence,
@@ -122,120 +147,103 @@ class LIAEngine:
             'recommendation': recommendation,
             'wellness_assessment': wellness_assessment,
             'risk_factors': risk_factors,
-            'positive_indicators': positive_indicators
+            'positive_indicators': positive_indicators,
+            'lia_version': bundle.version,
+            'events': events
         }
 
-    def _classify_condition(
-        self, data: BiosignalData, hrv, rhythm, pattern
-    ) -> str:
+    def extract_features(
+        self, raw_data: BiosignalData, clarity_result: Dict,
+        ifrs_result: Dict, timesystems_result: Dict
+    ) -> Dict:
         """
-        Classify health condition using multi-factor analysis
+        Flatten layer outputs into the rule-table feature row
 
-        Classification logic:
-        - Heart rate zones
-        - Activity level
-        - HRV features
-        - Rhythm classification
-        - Pattern type
+        Multi-factor inputs:
+        - Heart rate zones, activity, SpO2, temperature
+        - HRV score and rhythm classification
+        - Pattern type and circadian alignment
+        - Signal quality and artifact count
         """
-        hr = data.heart_rate
-        activity = data.activity
-        hrv_score = hrv.hrv_score
-
-        # Sleep state
-        if hr < 60 and activity < 5 and pattern.value == 'stable':
-            return 'Sleep State'
-
-        # Deep rest
-        if hr < 65 and activity < 10 and hrv_score > 70:
-            return 'Deep Rest'
-
-        # Intense exercise
-        if hr > 140 and activity > 100:
-            return 'Intense Exercise'
+        return {
+            'heart_rate': raw_data.heart_rate,
+            'activity': raw_data.activity,
+            'spo2': raw_data.spo2,
+            'temperature': raw_data.temperature,
+            'hrv_score': ifrs_result['hrv_features'].hrv_score,
+            'signal_quality': clarity_result['quality_score'],
+            'alignment_score': timesystems_result['circadian_alignment'].alignment_score,
+            'artifact_count': len(clarity_result['artifacts_detected']),
+            'pattern': timesystems_result['pattern_type'].value,
+            'rhythm': ifrs_result['rhythm_classification'].value
+        }
 
-        # Moderate exercise
-        if hr > 110 and activity > 60:
-            return 'Moderate Exercise'
+    def model_bundle(self) -> LIAModelBundle:
+        """LIA model version currently serving this device"""
+        return self.registry.bundle_for(self.device_id)
 
-        # Light activity
-        if 90 < hr < 110 and activity > 30:
-            return 'Light Activity'
+    def evaluate_rules(
+        self, feature_rows: Sequence[Dict], bundle: Optional[LIAModelBundle] = None
+    ) -> List[Dict]:
+        """
+        Classify any number of feature rows in one vectorized pass
 
-        # Elevated stress (high HR, low HRV, low activity)
-        if hr > 85 and hrv_score < 50 and activity < 20:
-            return 'Elevated Stress'
+        Works for a single sample, a block of buffered samples or a fleet
+        snapshot (one row per device).
 
-        # Relaxation (good HRV, low activity, normal HR)
-        if 60 <= hr <= 75 and hrv_score > 70 and activity < 20:
-            return 'Relaxation'
+        Returns:
+            Per row: condition, risk_factors, positive_indicators
+        """
+        rules = (bundle or self.model_bundle()).rules
+        return rules.evaluate(rules.encode(feature_rows))
 
-        # Recovery mode
-        if rhythm.value == 'athletic' and hrv_score > 80:
-            return 'Recovery Mode'
+    def classify(
+        self, feature_rows: Sequence[Dict], bundle: Optional[LIAModelBundle] = None
+    ) -> List[Dict]:
+        """
+        Rule-table labels plus calibrated condition probabilities
 
-        # Optimal wellness
-        if 65 <= hr <= 75 and hrv_score > 75 and 60 <= data.spo2 <= 100:
-            return 'Optimal Wellness'
+        Both run as single batched passes over all rows, against one model
+        version (the device's current one unless `bundle` is given).
 
-        # Default: Normal resting
-        return 'Normal Resting'
+        Returns:
+            Per row: condition, risk_factors, positive_indicators, probabilities
+        """
+        bundle = bundle or self.model_bundle()
+        results = self.evaluate_rules(feature_rows, bundle)
+        probabilities = bundle.classifier.predict_proba(feature_rows)
+
+        index = {name: i for i, name in enumerate(bundle.classifier.classes)}
+        columns = [index.get(condition) for condition in self.conditions]
+        for result, row in zip(results, probabilities.tolist()):
+            result['probabilities'] = {
+                condition: round(row[c], 3) if c is not None else 0.0
+                for condition, c in zip(self.conditions, columns)
+            }
+        return results
 
     def _calculate_confidence(
-        self, signal_quality: float, snr: float, temporal_consistency: float
+        self, signal_quality: float, snr: float, temporal_consistency: float,
+        probabilities: Dict[str, float], condition: str
     ) -> float:
         """
-        Calculate confidence in classification
+        Calculate confidence in the rule-detected condition
 
         Based on:
-        - Signal quality from Clarity™
-        - SNR
-        - Temporal consistency from Timesystems™
+        - Signal quality from Clarity™, SNR and temporal consistency from
+          Timesystems™ (floored at 0.70)
+        - Agreement of the classifier: its probability for the condition
+          relative to its most likely class. Full agreement keeps the
+          quality factor; outright disagreement halves it.
         """
-        # Weight factors
-        quality_weight = 0.4
-        snr_weight = 0.3
-        consistency_weight = 0.3
-
         # Normalize SNR (typical range: 20-50 dB)
         snr_normalized = min(1.0, max(0.0, (snr - 20) / 30))
+        quality = 0.4 * signal_quality + 0.3 * snr_normalized + 0.3 * temporal_consistency
+        quality = max(0.70, min(0.99, quality))
 
-        # Calculate weighted confidence
-        confidence = (
-            signal_quality * quality_weight +
-            snr_normalized * snr_weight +
-            temporal_consistency * consistency_weight
-        )
-
-        # Ensure minimum confidence of 0.70
-        confidence = max(0.70, min(0.99, confidence))
-
-        return round(confidence, 3)
-
-    def _generate_probabilities(self, detected_condition: str) -> Dict[str, float]:
-        """
-        Generate probability distribution across all conditions
-
-        Uses Dirichlet distribution with higher probability for detected condition
-        """
-        # Create alpha values (higher for detected condition)
-        alphas = []
-        for condition in self.conditions:
-            if condition == detected_condition:
-                alphas.append(10.0)  # High probability
-            else:
-                alphas.append(1.0)   # Low probability
-
-        # Generate probabilities
-        probs = np.random.dirichlet(alphas)
-
-        # Create dictionary
-        prob_dict = {
-            condition: round(float(prob), 3)
-            for condition, prob in zip(self.conditions, probs)
-        }
-
-        return prob_dict
+        top = max(probabilities.values(), default=0.0)
+        agreement = probabilities.get(condition, 0.0) / top if top > 0 else 0.0
+        return round(quality * (0.5 + 0.5 * agreement), 3)
 
     def _assess_wellness(
         self, data: BiosignalData, hrv, circadian_alignment, signal_quality: float
@@ -326,114 +334,26 @@ class LIAEngine:
             overall_wellness=round(float(overall), 1)
         )
 
-    def _identify_risk_factors(
-        self, data: BiosignalData, hrv, clarity_result, circadian_alignment
-    ) -> List[str]:
-        """Identify potential risk factors"""
-        risks = []
-
-        # Heart rate risks
-        if data.heart_rate > 100:
-            risks.append("Elevated heart rate")
-        elif data.heart_rate < 50:
-            risks.append("Low heart rate (bradycardia)")
-
-        # HRV risks
-        if hrv.hrv_score < 50:
-            risks.append("Low heart rate variability")
-
-        # SpO2 risks
-        if data.spo2 < 95:
-            risks.append("Low blood oxygen saturation")
-
-        # Temperature risks
-        if data.temperature > 38:
-            risks.append("Elevated body temperature")
-        elif data.temperature < 36:
-            risks.append("Low body temperature")
-
-        # Signal quality risks
-        if clarity_result['quality_score'] < 0.6:
-            risks.append("Poor signal quality - check sensor placement")
-
-        # Circadian misalignment
-        if circadian_alignment.alignment_score < 0.6:
-            risks.append("Circadian rhythm misalignment")
-
-        # Artifacts
-        if len(clarity_result['artifacts_detected']) > 2:
-            risks.append("Multiple signal artifacts detected")
-
-        return risks
-
-    def _identify_positive_indicators(
-        self, data: BiosignalData, hrv, signal_quality: float, circadian_alignment
-    ) -> List[str]:
-        """Identify positive health indicators"""
-        positives = []
-
-        # Good HRV
-        if hrv.hrv_score > 75:
-            positives.append("Excellent heart rate variability")
-        elif hrv.hrv_score > 65:
-            positives.append("Good heart rate variability")
-
-        # Good SpO2
-        if data.spo2 >= 98:
-            positives.append("Optimal blood oxygen saturation")
-
-        # Good signal quality
-        if signal_quality > 0.85:
-            positives.append("Excellent signal quality")
-
-        # Good circadian alignment
-        if circadian_alignment.alignment_score > 0.85:
-            positives.append("Strong circadian rhythm alignment")
-
-        # Normal temperature
-        if 36.5 <= data.temperature <= 37.2:
-            positives.append("Normal body temperature")
-
-        # Optimal heart rate
-        if 60 <= data.heart_rate <= 75:
-            positives.append("Optimal resting heart rate")
-
-        return positives
-
     def _generate_recommendation(
-        self, condition: str, wellness_score: float, risk_factors: List[str]
+        self, table: Dict, condition: str, wellness_score: float, risk_factors: List[str]
     ) -> str:
         """
         Generate personalized recommendation based on current state
-        """
-        recommendations = {
-            'Normal Resting': 'Maintain current activity levels and hydration',
-            'Light Activity': 'Continue with light movement, stay hydrated',
-            'Moderate Exercise': 'Good workout intensity, monitor heart rate recovery',
-            'Intense Exercise': 'High intensity detected - ensure proper rest periods',
-            'Deep Rest': 'Excellent recovery state, maintain relaxation',
-            'Sleep State': 'Sleep pattern detected, ensure adequate rest duration',
-            'Elevated Stress': 'Consider stress-reduction techniques like deep breathing',
-            'Relaxation': 'Excellent relaxation state, continue current activity',
-            'Recovery Mode': 'Optimal recovery detected, light activity recommended',
-            'Optimal Wellness': 'Excellent health indicators, maintain current lifestyle'
-        }
 
-        base_rec = recommendations.get(condition, 'Continue monitoring health metrics')
+        Text comes from the model version's recommendations table.
+        """
+        base_rec = table['condition'].get(condition, table['default'])
 
         # Add risk-based recommendations
-        if risk_factors:
-            if 'Low heart rate variability' in risk_factors:
-                base_rec += ' | Consider relaxation exercises to improve HRV'
-            if 'Low blood oxygen saturation' in risk_factors:
-                base_rec += ' | Deep breathing exercises recommended'
-            if 'Circadian rhythm misalignment' in risk_factors:
-                base_rec += ' | Try to maintain consistent sleep schedule'
+        for risk_factor, advice in table['risk_factors'].items():
+            if risk_factor in risk_factors:
+                base_rec += f' | {advice}'
 
         # Wellness-based recommendations
-        if wellness_score < 60:
-            base_rec += ' | Consult healthcare provider if symptoms persist'
-        elif wellness_score > 85:
-            base_rec += ' | Great health status - keep it up!'
+        wellness = table['wellness']
+        if wellness_score < wellness['low']['below']:
+            base_rec += f" | {wellness['low']['text']}"
+        elif wellness_score > wellness['high']['above']:
+            base_rec += f" | {wellness['high']['text']}"
 
         return base_rec
@@ -0,0 +1,270 @@
+"""
+LIA Model Registry - Versioned, hot-swappable LIA parameters and weights
+Atomic version swaps on file change or API call, with per-device pinning
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.services.lia_classifier import LIAClassifier
+from app.services.lia_rules import LIARuleEngine
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_REGISTRY_PATH = Path(__file__).resolve().parent.parent / "models" / "lia"
+DEFAULT_STATE_PATH = Path("data") / "lia"
+VERSION_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]{0,63}")
+
+
+def _signature(path: Path) -> Tuple:
+    """(name, mtime, size) of every file under a version directory"""
+    return tuple(sorted(
+        (str(file.relative_to(path)), file.stat().st_mtime_ns, file.stat().st_size)
+        for file in path.rglob("*") if file.is_file()
+    ))
+
+
+class LIAModelBundle:
+    """
+    One immutable LIA model version
+
+    Version directory layout:
+    - rules.json: condition / risk-factor / positive-indicator tables
+    - recommendations.json: recommendation text per condition and risk factor
+    - classifier/: calibrated classifier (memory-mapped weights)
+    """
+
+    def __init__(self, version: str, path: Path):
+        self.version = version
+        self.path = path
+        self.signature = _signature(path)
+
+        self.rules = LIARuleEngine.from_file(path / "rules.json")
+        self.classifier = LIAClassifier(path / "classifier")
+        with open(path / "recommendations.json", encoding="utf-8") as f:
+            self.recommendations = json.load(f)
+        self.loaded_at = datetime.now()
+
+        conditions = self.rules.tables['condition']
+        missing = set([conditions.default] + conditions.labels) - set(self.classifier.classes)
+        if missing:
+            raise ValueError(f"Classifier in {version} has no class for: {', '.join(sorted(missing))}")
+
+
+class LIAModelRegistry:
+    """
+    Versioned LIA models with atomic hot swap and per-device pinning
+
+    The registry root holds one directory per version plus a default
+    manifest (registry.json) naming the active version and device pins. The
+    live manifest is kept in a separate state directory, seeded from the
+    default on first use, so API changes never rewrite the source tree. Every process
+    keeps its own registry and polls the manifest and loaded version
+    directories at most every `poll_seconds`; a change loads the new bundle
+    fully before swapping one reference, so in-flight samples finish on the
+    version they started with and layer state is never touched.
+
+    API-driven changes rewrite the live manifest atomically (os.replace),
+    which is how worker processes pick them up. Versions are only accepted
+    if they name an existing version directory.
+    """
+
+    MANIFEST = "registry.json"
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        poll_seconds: Optional[float] = None,
+        state_dir: Optional[Path] = None
+    ):
+        self.root = Path(root or os.getenv("LIA_MODEL_REGISTRY_PATH", DEFAULT_REGISTRY_PATH))
+        self.state_dir = Path(state_dir or os.getenv("LIA_MODEL_STATE_PATH", DEFAULT_STATE_PATH))
+        self.poll_seconds = (
+            poll_seconds if poll_seconds is not None
+            else float(os.getenv("LIA_MODEL_POLL_SECONDS", "2"))
+        )
+
+        self.lock = threading.Lock()
+        self.bundles: Dict[str, LIAModelBundle] = {}
+        self.active_version: Optional[str] = None
+        self.pins: Dict[str, str] = {}
+        self.manifest_mtime: Optional[int] = None
+        self.failed_state: Optional[Tuple] = None
+        self.last_check = 0.0
+
+        if not self.manifest_path.exists():
+            with open(self.root / self.MANIFEST, encoding="utf-8") as f:
+                self._write_manifest(json.load(f))
+            logger.info(f"📁 LIA model manifest seeded at {self.manifest_path}")
+        self.reload()
+
+    @property
+    def manifest_path(self) -> Path:
+        """Live (mutable) manifest in the state directory"""
+        return self.state_dir / self.MANIFEST
+
+    def versions(self) -> List[str]:
+        """Version directories available under the registry root"""
+        return sorted(
+            entry.name for entry in self.root.iterdir()
+            if entry.is_dir() and not entry.name.startswith(".")
+            and (entry / "rules.json").exists()
+        )
+
+    def bundle_for(self, device_id: Optional[str] = None) -> LIAModelBundle:
+        """Model version serving a device (its pin, else the active version)"""
+        self.check()
+        active, pins, bundles = self.snapshot
+        return bundles[pins.get(device_id, active)]
+
+    def check(self) -> bool:
+        """
+        Reload if the manifest or a loaded version changed on disk
+
+        Rate-limited to once per `poll_seconds`. A state that failed to
+        load is not retried until the files change again. Returns True on
+        reload.
+        """
+        now = time.monotonic()
+        if now - self.last_check < self.poll_seconds:
+            return False
+        self.last_check = now
+
+        try:
+            manifest_mtime = self.manifest_path.stat().st_mtime_ns
+            signatures = tuple(_signature(bundle.path) for bundle in self.bundles.values())
+        except OSError as e:
+            logger.error(f"❌ LIA model registry check failed: {str(e)}")
+            return False
+
+        state = (manifest_mtime, signatures)
+        unchanged = manifest_mtime == self.manifest_mtime and signatures == tuple(
+            bundle.signature for bundle in self.bundles.values()
+        )
+        if unchanged or state == self.failed_state:
+            return False
+
+        try:
+            self.reload()
+        except Exception as e:
+            self.failed_state = state
+            logger.error(f"❌ LIA model reload failed, keeping {self.active_version}: {str(e)}")
+            return False
+        return True
+
+    def reload(self) -> Dict:
+        """
+        Re-read the manifest and (re)load every referenced version
+
+        Bundles are built first and swapped in as one dict, so a bad
+        version leaves the current models serving.
+        """
+        with self.lock:
+            mtime = self.manifest_path.stat().st_mtime_ns
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+
+            active, pins = manifest['active'], dict(manifest.get('pins', {}))
+            bundles = {}
+            for version in {active, *pins.values()}:
+                current = self.bundles.get(version)
+                path = self._version_path(version)
+                if current is not None and _signature(path) == current.signature:
+                    bundles[version] = current
+                else:
+                    bundles[version] = LIAModelBundle(version, path)
+
+            if active != self.active_version or bundles.keys() != self.bundles.keys():
+                logger.info(f"🔁 LIA models: active={active} pins={len(pins)} loaded={sorted(bundles)}")
+            self.bundles, self.active_version, self.pins = bundles, active, pins
+            self.snapshot = (active, pins, bundles)
+            self.manifest_mtime = mtime
+
+        return self.status()
+
+    def activate(self, version: str) -> Dict:
+        """Make a version active for all unpinned devices"""
+        self._update_manifest(active=version)
+        return self.status()
+
+    def pin(self, device_id: str, version: str) -> Dict:
+        """Serve a device from a specific version (canary rollout)"""
+        self._update_manifest(pins={**self.pins, device_id: version})
+        return self.status()
+
+    def unpin(self, device_id: str) -> Dict:
+        """Return a device to the active version"""
+        self._update_manifest(pins={k: v for k, v in self.pins.items() if k != device_id})
+        return self.status()
+
+    def status(self) -> Dict:
+        """Active version, pins and loaded bundles"""
+        return {
+            'active_version': self.active_version,
+            'available_versions': self.versions(),
+            'pins': dict(self.pins),
+            'loaded': {
+                version: {
+                    'loaded_at': bundle.loaded_at,
+                    'rules_version': bundle.rules.version,
+                    'classifier_version': bundle.classifier.version
+                }
+                for version, bundle in self.bundles.items()
+            }
+        }
+
+    def _update_manifest(self, active: Optional[str] = None, pins: Optional[Dict[str, str]] = None):
+        """Validate, write the manifest atomically and swap in the result"""
+        active = active or self.active_version
+        pins = self.pins if pins is None else pins
+
+        available = self.versions()
+        for version in {active, *pins.values()}:
+            if version not in available:
+                raise KeyError(f"Unknown LIA model version '{version}'")
+            if version not in self.bundles:
+                LIAModelBundle(version, self._version_path(version))  # Fail before publishing
+
+        self._write_manifest({'active': active, 'pins': pins})
+        self.reload()
+
+    def _version_path(self, version: str) -> Path:
+        """Directory of a version; names are plain directory names, never paths"""
+        if not isinstance(version, str) or not VERSION_PATTERN.fullmatch(version):
+            raise KeyError(f"Unknown LIA model version '{version}'")
+        return self.root / version
+
+    def _write_manifest(self, manifest: Dict):
+        """Write the live manifest atomically (temporary file + os.replace)"""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=self.state_dir, prefix=".registry.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+                f.write("\n")
+            os.replace(temporary, self.manifest_path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+
+_registry: Optional[LIAModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> LIAModelRegistry:
+    """Process-wide registry (one per worker process)"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = LIAModelRegistry()
+    return _registry
@@ -0,0 +1,151 @@
+"""
+LIA Rule Engine - Declarative rule tables compiled to numpy mask evaluation
+Classifies a single sample, a block of samples or a fleet snapshot in one call
+"""
+
+import json
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+# Operator codes used in the compiled clause arrays
+OPERATORS = ('<', '<=', '>', '>=', '==', '!=')
+
+
+class CompiledRuleSet:
+    """
+    One rule table compiled to flat clause arrays
+
+    All clauses of all rules are evaluated at once as a [samples, clauses]
+    comparison, then AND-reduced per rule with `np.logical_and.reduceat`.
+
+    Match modes:
+    - first: label of the first matching rule per sample (else `default`)
+    - all: every matching label per sample
+    """
+
+    def __init__(self, spec: Dict, feature_index: Dict[str, int], categories: Dict[str, List[str]]):
+        self.match = spec.get('match', 'all')
+        if self.match not in ('first', 'all'):
+            raise ValueError(f"Unknown rule match mode '{self.match}'")
+        self.default = spec.get('default')
+        self.labels = [rule['label'] for rule in spec['rules']]
+
+        columns, operators, thresholds, starts = [], [], [], []
+        for rule in spec['rules']:
+            if not rule['when']:
+                raise ValueError(f"Rule '{rule['label']}' has no clauses")
+            starts.append(len(columns))
+            for feature, operator, value in rule['when']:
+                if feature not in feature_index:
+                    raise ValueError(f"Rule '{rule['label']}' uses unknown feature '{feature}'")
+                if operator not in OPERATORS:
+                    raise ValueError(f"Rule '{rule['label']}' uses unknown operator '{operator}'")
+                if feature in categories:
+                    if operator not in ('==', '!='):
+                        raise ValueError(f"Categorical feature '{feature}' only supports == and !=")
+                    value = categories[feature].index(value)
+                columns.append(feature_index[feature])
+                operators.append(OPERATORS.index(operator))
+                thresholds.append(float(value))
+
+        self.columns = np.array(columns, dtype=np.int64)
+        self.operators = np.array(operators, dtype=np.int64)
+        self.thresholds = np.array(thresholds, dtype=np.float64)
+        self.rule_starts = np.array(starts, dtype=np.int64)
+
+    def evaluate(self, X: np.ndarray) -> np.ndarray:
+        """Boolean [samples, rules] matrix of matching rules"""
+        values = X[:, self.columns]
+        thresholds = self.thresholds
+        ops = self.operators
+
+        clauses = np.select(
+            [ops == 0, ops == 1, ops == 2, ops == 3, ops == 4],
+            [values < thresholds, values <= thresholds, values > thresholds,
+             values >= thresholds, values == thresholds],
+            default=values != thresholds
+        )
+        return np.logical_and.reduceat(clauses, self.rule_starts, axis=1)
+
+    def first_match(self, X: np.ndarray) -> List[str]:
+        """First matching label per sample (rules are in priority order)"""
+        masks = self.evaluate(X)
+        matched = masks.any(axis=1)
+        first = np.argmax(masks, axis=1)
+        return [
+            self.labels[i] if hit else self.default
+            for i, hit in zip(first.tolist(), matched.tolist())
+        ]
+
+    def apply(self, X: np.ndarray) -> list:
+        """Labels per sample according to the table's match mode"""
+        return self.first_match(X) if self.match == 'first' else self.all_matches(X)
+
+    def all_matches(self, X: np.ndarray) -> List[List[str]]:
+        """All matching labels per sample, in table order"""
+        masks = self.evaluate(X)
+        return [
+            [self.labels[i] for i in np.flatnonzero(row)]
+            for row in masks
+        ]
+
+
+class LIARuleEngine:
+    """
+    Compiled LIA rule tables (condition, risk factors, positive indicators)
+
+    Samples are encoded as a float feature matrix: numeric features as-is,
+    categorical features as their index in the table's vocabulary (-1 if
+    unknown), so any number of samples or devices share one evaluation.
+    """
+
+    TABLES = ('condition', 'risk_factors', 'positive_indicators')
+
+    def __init__(self, spec: Dict):
+        features = spec['features']
+        self.version = spec.get('version')
+        self.categories: Dict[str, List[str]] = features.get('categorical', {})
+        self.feature_names = list(features['numeric']) + list(self.categories)
+        self.feature_index = {name: i for i, name in enumerate(self.feature_names)}
+
+        self.tables = {
+            name: CompiledRuleSet(spec[name], self.feature_index, self.categories)
+            for name in self.TABLES
+        }
+
+    @classmethod
+    def from_file(cls, path: Path) -> 'LIARuleEngine':
+        """Parse and compile a rule file (see LIAModelRegistry for versioned loading)"""
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def encode(self, rows: Sequence[Dict]) -> np.ndarray:
+        """Feature dicts → [samples, features] matrix"""
+        X = np.empty((len(rows), len(self.feature_names)))
+        for i, row in enumerate(rows):
+            for name, j in self.feature_index.items():
+                value = row[name]
+                if name in self.categories:
+                    vocabulary = self.categories[name]
+                    X[i, j] = vocabulary.index(value) if value in vocabulary else -1
+                else:
+                    X[i, j] = value
+        return X
+
+    def evaluate(self, X: np.ndarray) -> List[Dict]:
+        """
+        Evaluate all tables for a block of samples or a fleet snapshot
+
+        Returns:
+            Per row: condition, risk_factors and positive_indicators
+        """
+        conditions = self.tables['condition'].apply(X)
+        risks = self.tables['risk_factors'].apply(X)
+        positives = self.tables['positive_indicators'].apply(X)
+
+        return [
+            {'condition': c, 'risk_factors': r, 'positive_indicators': p}
+            for c, r, p in zip(conditions, risks, positives)
+        ]
+
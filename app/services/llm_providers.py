@@ -0,0 +1,244 @@
+"""
+LLM Providers - Completion backends for LIA chat
+OpenAI for production, a deterministic local provider for offline use, tests and benchmarks
+"""
+
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class LLMProvider:
+    """
+    Chat completion backend
+
+    Providers take OpenAI-format messages and tool definitions and return
+    plain dicts, so the chat engine does not depend on any SDK:
+
+    - complete(): {"content", "tool_calls" (OpenAI format), "tokens_used"}
+    - stream(): yields {"type": "token", "content"},
+      {"type": "tool_call", "index", "id", "name", "arguments"} fragments
+      and a final {"type": "usage", "tokens_used"}
+    """
+
+    name = "base"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    async def complete(
+        self, messages: List[Dict], tools: Optional[List[Dict]] = None,
+        tool_choice: Optional[str] = None, **parameters
+    ) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def stream(
+        self, messages: List[Dict], tools: Optional[List[Dict]] = None,
+        tool_choice: Optional[str] = None, **parameters
+    ) -> AsyncIterator[Dict[str, Any]]:
+        raise NotImplementedError
+        yield  # pragma: no cover - marks this as an async generator
+
+    async def aclose(self):
+        """Release connections"""
+
+
+class OpenAIProvider(LLMProvider):
+    """
+    OpenAI chat completions over one pooled async HTTP client
+
+    Keep-alive connections to the API host are shared by all requests, so
+    a slow completion never blocks the event loop.
+    """
+
+    name = "openai"
+
+    def __init__(self, model: str = "gpt-4o-mini", api_key: Optional[str] = None, max_connections: int = 8):
+        from openai import AsyncOpenAI
+
+        super().__init__(model)
+        self.timeout = float(os.getenv("LIA_CHAT_TIMEOUT", "30"))
+        self.max_retries = int(os.getenv("LIA_CHAT_MAX_RETRIES", "2"))
+
+        # Shared connection pool (keep-alive to the API host)
+        self.http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout, connect=float(os.getenv("LIA_CHAT_CONNECT_TIMEOUT", "5"))),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+        self.client = AsyncOpenAI(
+            api_key=api_key or os.getenv("OPENAI_API_KEY"),
+            timeout=self.timeout,
+            max_retries=self.max_retries,
+            http_client=self.http_client
+        )
+
+    @staticmethod
+    def _tool_parameters(tools: Optional[List[Dict]], tool_choice: Optional[str]) -> Dict:
+        return {"tools": tools, "tool_choice": tool_choice or "auto"} if tools else {}
+
+    async def complete(self, messages, tools=None, tool_choice=None, **parameters):
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            **self._tool_parameters(tools, tool_choice),
+            **parameters
+        )
+        message = response.choices[0].message
+        return {
+            "content": message.content,
+            "tool_calls": [
+                call.model_dump(include={"id", "type", "function"}) for call in message.tool_calls or []
+            ],
+            "tokens_used": response.usage.total_tokens if response.usage else 0
+        }
+
+    async def stream(self, messages, tools=None, tool_choice=None, **parameters):
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            stream=True,
+            extra_body={"stream_options": {"include_usage": True}},
+            **self._tool_parameters(tools, tool_choice),
+            **parameters
+        )
+        try:
+            async for chunk in stream:
+                # Final usage chunk (typed in newer SDKs, a raw extra field in older ones)
+                usage = getattr(chunk, "usage", None)
+                if usage is not None:
+                    total = usage["total_tokens"] if isinstance(usage, dict) else usage.total_tokens
+                    yield {"type": "usage", "tokens_used": total}
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    yield {"type": "token", "content": delta.content}
+                for fragment in delta.tool_calls or []:
+                    function = fragment.function
+                    yield {
+                        "type": "tool_call",
+                        "index": fragment.index,
+                        "id": fragment.id,
+                        "name": function.name if function else None,
+                        "arguments": function.arguments if function else None
+                    }
+        finally:
+            await stream.close()
+
+    async def aclose(self):
+        await self.client.close()
+
+
+class LocalProvider(LLMProvider):
+    """
+    Deterministic offline stand-in for an LLM
+
+    Same input, same output, no network: if tools are offered and none has
+    been called for the current question, it calls get_current_vitals;
+    otherwise it answers with the question and the data it was given (tool
+    results or the biosignal context). `latency` seconds are added per
+    completion to simulate a remote model in benchmarks.
+    """
+
+    name = "local"
+
+    def __init__(self, model: str = "lia-local-provider", latency: float = 0.0):
+        super().__init__(model)
+        self.latency = latency
+
+    @staticmethod
+    def _current_turn(messages: List[Dict]) -> List[Dict]:
+        last_user = max((i for i, message in enumerate(messages) if message["role"] == "user"), default=-1)
+        return messages[last_user:]
+
+    def _respond(self, messages: List[Dict], tools: Optional[List[Dict]], tool_choice: Optional[str]) -> Dict:
+        turn = self._current_turn(messages)
+        question = turn[0]["content"] if turn else ""
+        tool_names = {tool["function"]["name"] for tool in tools or []}
+        results = [message["content"] for message in turn if message["role"] == "tool"]
+
+        if "get_current_vitals" in tool_names and tool_choice != "none" and not results:
+            return {
+                "content": None,
+                "tool_calls": [{
+                    "id": "local-call-1", "type": "function",
+                    "function": {"name": "get_current_vitals", "arguments": "{}"}
+                }]
+            }
+
+        facts = []
+        for result in results:
+            try:
+                data = json.loads(result)
+            except ValueError:
+                continue
+            if isinstance(data, dict):
+                facts.extend(
+                    f"{key}={value}" for key, value in data.items() if isinstance(value, (int, float, str))
+                )
+        if not facts:
+            context = [m["content"] for m in messages if m["role"] == "system" and "BIOSIGNAL DATA" in m["content"]]
+            facts = [line.strip("- ").strip() for line in (context[0].splitlines() if context else []) if ": " in line]
+
+        data_note = f" Current data: {'; '.join(facts[:6])}." if facts else ""
+        return {
+            "content": f"(offline LIA) You asked: \"{question}\".{data_note}",
+            "tool_calls": []
+        }
+
+    @staticmethod
+    def _estimate_tokens(messages: List[Dict], content: Optional[str]) -> int:
+        text = "".join(str(message.get("content") or "") for message in messages) + (content or "")
+        return len(text) // 4 + 1
+
+    async def complete(self, messages, tools=None, tool_choice=None, **parameters):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        response = self._respond(messages, tools, tool_choice)
+        response["tokens_used"] = self._estimate_tokens(messages, response["content"])
+        return response
+
+    async def stream(self, messages, tools=None, tool_choice=None, **parameters):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        response = self._respond(messages, tools, tool_choice)
+        for index, call in enumerate(response["tool_calls"]):
+            yield {
+                "type": "tool_call", "index": index, "id": call["id"],
+                "name": call["function"]["name"], "arguments": call["function"]["arguments"]
+            }
+        words = response["content"].split(" ") if response["content"] else []
+        for i, word in enumerate(words):
+            yield {"type": "token", "content": (" " if i else "") + word}
+        yield {"type": "usage", "tokens_used": self._estimate_tokens(messages, response["content"])}
+
+
+def create_provider(max_connections: int = 8) -> Optional[LLMProvider]:
+    """
+    Provider selected by LIA_CHAT_PROVIDER ("openai", the default, or "local")
+
+    The local provider is opt-in only. OpenAI without OPENAI_API_KEY returns
+    None: the chat engine still answers locally (intent fast path, cache),
+    and only questions that need the model get a 503.
+    """
+    name = os.getenv("LIA_CHAT_PROVIDER", "openai").lower()
+    if name == "openai":
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            logger.warning(
+                "⚠️ OPENAI_API_KEY is not set: LIA chat answers local lookups only "
+                "(set LIA_CHAT_PROVIDER=local for the offline provider)"
+            )
+            return None
+        return OpenAIProvider(os.getenv("LIA_CHAT_MODEL", "gpt-4o-mini"), api_key, max_connections)
+    if name == "local":
+        logger.warning("⚠️ LIA chat uses the offline local provider (LIA_CHAT_PROVIDER=local)")
+        return LocalProvider(latency=float(os.getenv("LIA_LOCAL_PROVIDER_LATENCY", "0")))
+    raise ValueError(f"Unknown LIA chat provider '{name}'")
@@ -0,0 +1,286 @@
+"""
+Matrix Profile - Motif and discord discovery for Timesystems™
+Z-normalised subsequence nearest-neighbour distances via FFT sliding dot products
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+# Subsequences flatter than this are treated as constant
+FLAT_STD = 1e-8
+
+
+def sliding_dot_product(query: np.ndarray, series: np.ndarray) -> np.ndarray:
+    """
+    Dot product of `query` with every subsequence of `series` (O(n log n))
+
+    Returns:
+        Array of length len(series) - len(query) + 1
+    """
+    m, n = len(query), len(series)
+    n_fft = 1 << (n + m - 1).bit_length()
+    product = np.fft.irfft(
+        np.fft.rfft(series, n_fft) * np.fft.rfft(query[::-1], n_fft), n_fft
+    )
+    return product[m - 1:n]
+
+
+def sliding_mean_std(series: np.ndarray, m: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Mean and population std of every length-m subsequence (cumulative sums)"""
+    centre = series.mean()
+    centred = series - centre
+    sums = np.concatenate(([0.0], np.cumsum(centred)))
+    squares = np.concatenate(([0.0], np.cumsum(centred * centred)))
+
+    mean = (sums[m:] - sums[:-m]) / m
+    variance = (squares[m:] - squares[:-m]) / m - mean * mean
+    return mean + centre, np.sqrt(np.maximum(variance, 0.0))
+
+
+def distance_profile(
+    qt: np.ndarray, m: int, mean_i: float, std_i: float,
+    means: np.ndarray, stds: np.ndarray
+) -> np.ndarray:
+    """
+    Z-normalised Euclidean distances from dot products
+
+        d = √(2m · (1 - (QT - m·μi·μj) / (m·σi·σj)))
+
+    Two constant subsequences are at distance 0; a constant and a
+    non-constant one at √m.
+    """
+    flat = stds < FLAT_STD
+    if std_i < FLAT_STD:
+        return np.where(flat, 0.0, np.sqrt(m))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = (qt - m * mean_i * means) / (m * std_i * stds)
+    distances = np.sqrt(2 * m * (1 - np.clip(correlation, -1.0, 1.0)))
+    distances[flat] = np.sqrt(m)
+    return distances
+
+
+def stomp(
+    series: np.ndarray, m: int, exclusion: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Batch matrix profile (STOMP)
+
+    The first row of dot products comes from one FFT; each following row
+    is derived from the previous one in O(n), so the full self-join costs
+    O(n²) vectorized operations instead of O(n² m).
+
+    Args:
+        series: Signal (e.g. rollup means)
+        m: Subsequence length
+        exclusion: Trivial-match exclusion half-width (default m/4)
+
+    Returns:
+        (profile, index): nearest-neighbour distance and position per subsequence
+    """
+    series = np.asarray(series, dtype=np.float64)
+    length = len(series) - m + 1
+    if m < 3 or length < 2:
+        raise ValueError(f"Series of length {len(series)} is too short for window {m}")
+
+    exclusion = exclusion if exclusion is not None else int(np.ceil(m / 4))
+    means, stds = sliding_mean_std(series, m)
+
+    first_row = sliding_dot_product(series[:m], series)
+    qt = first_row.copy()
+    profile = np.full(length, np.inf)
+    index = np.full(length, -1, dtype=np.int64)
+
+    for i in range(length):
+        if i > 0:
+            qt[1:] = (
+                qt[:-1]
+                - series[:length - 1] * series[i - 1]
+                + series[m:m + length - 1] * series[i + m - 1]
+            )
+            qt[0] = first_row[i]
+
+        distances = distance_profile(qt, m, means[i], stds[i], means, stds)
+        distances[max(0, i - exclusion):min(length, i + exclusion + 1)] = np.inf
+
+        j = int(np.argmin(distances))
+        if np.isfinite(distances[j]):
+            profile[i] = distances[j]
+            index[i] = j
+
+    return profile, index
+
+
+def top_motifs(
+    profile: np.ndarray, index: np.ndarray, m: int, k: int = 3
+) -> List[Tuple[int, int, float]]:
+    """Up to k non-overlapping (i, j, distance) motif pairs, best first"""
+    available = np.isfinite(profile).copy()
+    motifs = []
+
+    while len(motifs) < k and available.any():
+        i = int(np.argmin(np.where(available, profile, np.inf)))
+        j = int(index[i])
+        motifs.append((i, j, float(profile[i])))
+        for position in (i, j):
+            available[max(0, position - m + 1):position + m] = False
+
+    return motifs
+
+
+def top_discords(profile: np.ndarray, m: int, k: int = 3) -> List[Tuple[int, float]]:
+    """Up to k non-overlapping (i, distance) discords, most anomalous first"""
+    available = np.isfinite(profile).copy()
+    discords = []
+
+    while len(discords) < k and available.any():
+        i = int(np.argmax(np.where(available, profile, -np.inf)))
+        discords.append((i, float(profile[i])))
+        available[max(0, i - m + 1):i + m] = False
+
+    return discords
+
+
+class IncrementalMatrixProfile:
+    """
+    Streaming matrix profile (STAMPI)
+
+    Each appended point creates one new subsequence. Its dot products with
+    all earlier subsequences are derived from the previous row in O(n),
+    giving its distance profile; earlier entries are lowered where the new
+    subsequence is a closer neighbour. History is left-trimmed to
+    `max_length` points, so per-point cost and memory stay bounded.
+
+    Points and per-subsequence state live in preallocated blocks twice the
+    retained length; trimming only advances the window start, and the
+    window is moved back to the front once per `max_length` appends.
+    """
+
+    def __init__(self, m: int, max_length: int, exclusion: Optional[int] = None):
+        if max_length < 2 * m:
+            raise ValueError("max_length must hold at least two windows")
+
+        self.m = m
+        self.max_length = max_length
+        self.exclusion = exclusion if exclusion is not None else int(np.ceil(m / 4))
+        self.clear()
+
+    def clear(self):
+        capacity = 2 * (self.max_length + 1)
+        # Subsequence k starts at point k, so all blocks share one window
+        self._series = np.zeros(capacity)
+        self._means = np.zeros(capacity)
+        self._stds = np.zeros(capacity)
+        self._profile = np.zeros(capacity)
+        self._index = np.zeros(capacity, dtype=np.int64)
+        self._start = 0  # Oldest retained point
+        self._end = 0  # One past the newest point
+        self.last_qt: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        """Number of subsequences"""
+        return max(0, self._end - self._start - self.m + 1)
+
+    @property
+    def series(self) -> np.ndarray:
+        return self._series[self._start:self._end]
+
+    @property
+    def means(self) -> np.ndarray:
+        return self._means[self._start:self._start + len(self)]
+
+    @property
+    def stds(self) -> np.ndarray:
+        return self._stds[self._start:self._start + len(self)]
+
+    @property
+    def profile(self) -> np.ndarray:
+        return self._profile[self._start:self._start + len(self)]
+
+    @property
+    def index(self) -> np.ndarray:
+        return self._index[self._start:self._start + len(self)]
+
+    def append(self, value: float):
+        """Add one point and update the profile"""
+        if self._end == len(self._series):
+            self._compact()
+        self._series[self._end] = float(value)
+        self._end += 1
+
+        m = self.m
+        series = self.series
+        if len(series) < m:
+            return
+
+        k = len(series) - m  # New subsequence
+        window = series[k:]
+        mean_k, std_k = float(window.mean()), float(window.std())
+        self._means[self._start + k] = mean_k
+        self._stds[self._start + k] = std_k
+
+        if self.last_qt is None:
+            qt = np.array([float(np.dot(window, window))])
+        else:
+            qt = np.empty(k + 1)
+            qt[1:] = self.last_qt - series[k - 1] * series[:k] + series[k + m - 1] * series[m:m + k]
+            qt[0] = float(np.dot(series[:m], window))
+        self.last_qt = qt
+
+        distances = distance_profile(qt, m, mean_k, std_k, self.means, self.stds)
+        distances[max(0, k - self.exclusion):] = np.inf
+
+        # New subsequence's nearest (earlier) neighbour
+        profile, index = self.profile, self.index
+        j = int(np.argmin(distances))
+        profile[k] = distances[j]
+        index[k] = j if np.isfinite(distances[j]) else -1
+
+        # Earlier subsequences that found a closer neighbour
+        improved = distances < profile
+        profile[improved] = distances[improved]
+        index[improved] = k
+
+        if len(series) > self.max_length:
+            self._trim(len(series) - self.max_length)
+
+    def _trim(self, drop: int):
+        """Forget the oldest points (profiles keep their best-known distance)"""
+        self._start += drop
+        index = self.index
+        index -= drop
+        index[index < 0] = -1
+        self.last_qt = self.last_qt[drop:]
+
+    def _compact(self):
+        """Move the retained window to the front of its blocks"""
+        size = self._end - self._start
+        for block in (self._series, self._means, self._stds, self._profile, self._index):
+            block[:size] = block[self._start:self._end]
+        self._start, self._end = 0, size
+
+    def normalized(self, distance: float) -> float:
+        """Map a distance to [0, 1] (0 identical shape, 1 perfectly anti-correlated)"""
+        return float(min(1.0, distance / (2 * np.sqrt(self.m))))
+
+    def summary(self) -> Optional[Dict]:
+        """
+        Current motif/discord state
+
+        Returns:
+            None until there are enough subsequences; otherwise the best motif
+            distance, the latest subsequence's nearest-neighbour distance and
+            the profile mean/std (all normalised to [0, 1])
+        """
+        finite = self.profile[np.isfinite(self.profile)]
+        if len(finite) < 2 * self.m:
+            return None
+
+        return {
+            'motif_distance': self.normalized(finite.min()),
+            'latest_distance': (
+                self.normalized(self.profile[-1]) if np.isfinite(self.profile[-1]) else None
+            ),
+            'profile_mean': self.normalized(finite.mean()),
+            'profile_std': self.normalized(finite.std())
+        }
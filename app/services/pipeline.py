@@ -0,0 +1,465 @@
+"""
+Processing Pipeline - Off-event-loop execution of the proprietary layers
+Runs Clarity™ → iFRS™ → Timesystems™ → LIA per device on a thread or process pool
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.models.schemas import BiosignalData, BiosignalSample
+from app.services.clarity import ClarityLayer
+from app.services.ifrs import iFRSLayer
+from app.services.timesystems import TimesystemsLayer
+from app.services.lia_integration import LIAEngine
+from app.services.lia_registry import LIAModelBundle, get_registry
+from app.services.matrix_profile import stomp, top_discords, top_motifs
+
+
+class UnknownDevice(LookupError):
+    """No pipeline state exists for a device (it never sent data or was evicted)"""
+
+    def __init__(self, device_id: str):
+        super().__init__(f"Unknown device '{device_id}'")
+        self.device_id = device_id
+
+
+class DevicePipeline:
+    """
+    Layer chain for a single device
+
+    Each device keeps its own layer instances so temporal buffers, HRV
+    history and condition history never mix between devices.
+    """
+
+    def __init__(self, device_id: str):
+        self.device_id = device_id
+        self.clarity = ClarityLayer()
+        self.ifrs = iFRSLayer()
+        self.timesystems = TimesystemsLayer()
+        self.lia_engine = LIAEngine(device_id)
+
+    def process(self, raw_data: BiosignalSample) -> Dict:
+        """
+        Process one sample through all layers
+
+        Channels are first aligned onto the sample's timestamp (slow
+        channels held at their last reading), then run through the layers.
+
+        Returns:
+            Dict with the aligned input under 'aligned' and each layer's
+            output under 'clarity', 'ifrs', 'timesystems' and 'lia'
+        """
+        aligned, alignment = self.timesystems.synchronize_signals(raw_data)
+        return self._run_layers(aligned, alignment)
+
+    def _run_layers(
+        self, aligned: BiosignalData, alignment: Dict, local_hour: Optional[float] = None
+    ) -> Dict:
+        """Clarity™ → iFRS™ → Timesystems™ → LIA for one aligned sample"""
+        results = self._run_signal_layers(aligned, alignment, local_hour)
+        results['lia'] = self._run_lia(results)
+        return results
+
+    def _run_signal_layers(
+        self, aligned: BiosignalData, alignment: Dict, local_hour: Optional[float] = None
+    ) -> Dict:
+        """Clarity™ → iFRS™ → Timesystems™ for one aligned sample"""
+        clarity_result = self.clarity.process(aligned, fresh_channels=alignment['fresh'])
+        ifrs_result = self.ifrs.process(clarity_result['processed_data'])
+        timesystems_result = self.timesystems.process(
+            ifrs_result['enhanced_data'], local_hour=local_hour, alignment=alignment
+        )
+
+        return {
+            'aligned': aligned,
+            'clarity': clarity_result,
+            'ifrs': ifrs_result,
+            'timesystems': timesystems_result
+        }
+
+    def _run_lia(
+        self, results: Dict, classification: Optional[Dict] = None,
+        bundle: Optional[LIAModelBundle] = None
+    ) -> Dict:
+        """LIA analysis on top of the signal layers' outputs"""
+        return self.lia_engine.analyze(
+            raw_data=results['aligned'],
+            clarity_result=results['clarity'],
+            ifrs_result=results['ifrs'],
+            timesystems_result=results['timesystems'],
+            classification=classification,
+            bundle=bundle
+        )
+
+    def process_batch(self, samples: List[BiosignalSample]) -> List[Dict]:
+        """
+        Process a block of buffered samples in device order
+
+        Channel alignment and wearer-local hours for the whole block are
+        computed in vectorized passes over the int64 device timestamps, and
+        the LIA rules and classifier score the whole block in one pass.
+        """
+        timestamps_ms = np.array([sample.timestamp_ms for sample in samples], dtype=np.int64)
+        local_hours = self.timesystems.local_hours(timestamps_ms)
+        aligned_samples = self.timesystems.synchronize_block(samples)
+
+        block = [
+            self._run_signal_layers(aligned, alignment, float(local_hour))
+            for (aligned, alignment), local_hour in zip(aligned_samples, local_hours)
+        ]
+
+        lia = self.lia_engine
+        bundle = lia.model_bundle()
+        classifications = lia.classify([
+            lia.extract_features(r['aligned'], r['clarity'], r['ifrs'], r['timesystems'])
+            for r in block
+        ], bundle)
+        for results, classification in zip(block, classifications):
+            results['lia'] = self._run_lia(results, classification, bundle)
+        return block
+
+    def set_utc_offset(self, utc_offset_minutes: int):
+        """Set the wearer's local timezone for circadian analysis"""
+        self.timesystems.set_utc_offset(utc_offset_minutes)
+
+    def rollup_series(
+        self, resolution: str, channel: str,
+        start_ms: Optional[int] = None, end_ms: Optional[int] = None
+    ) -> Dict[str, List]:
+        """Timesystems™ rollup buckets for one channel as plain lists, plus late-sample counts"""
+        rollups = self.timesystems.rollups
+        series = rollups.series(resolution, channel, start_ms, end_ms)
+        return {
+            **{key: values.tolist() for key, values in series.items()},
+            'late': rollups.late_samples()[resolution]
+        }
+
+    def rollup_summary(
+        self, resolution: str,
+        start_ms: Optional[int] = None, end_ms: Optional[int] = None
+    ) -> Dict[str, Dict[str, float]]:
+        """Per-channel aggregate over a time range from Timesystems™ rollups"""
+        return self.timesystems.rollups.summary(resolution, start_ms, end_ms)
+
+    def latest_features(self) -> Optional[Dict]:
+        """LIA rule-table feature row of the most recent sample"""
+        return self.lia_engine.last_features
+
+    def recent_change_points(self, limit: int = 50) -> List:
+        """Most recent Timesystems™ change-point events, newest last"""
+        return list(self.timesystems.recent_change_points)[-limit:]
+
+    def matrix_profile(
+        self, resolution: str, channel: str, window: int, top_k: int = 3
+    ) -> Dict[str, Any]:
+        """
+        Batch (STOMP) motifs and discords over closed rollup buckets
+
+        Runs on pre-aggregated means, so days of history are a few thousand
+        points rather than millions of raw samples.
+        """
+        series = self.timesystems.rollups.series(resolution, channel, include_open=False)
+        starts, values = series['start_ms'], series['mean']
+        if len(values) < 2 * window:
+            return {'subsequences': 0, 'motifs': [], 'discords': []}
+
+        profile, index = stomp(values, window)
+        scale = 2 * np.sqrt(window)
+
+        return {
+            'subsequences': len(profile),
+            'motifs': [
+                (int(starts[i]), int(starts[j]), min(1.0, distance / scale))
+                for i, j, distance in top_motifs(profile, index, window, top_k)
+            ],
+            'discords': [
+                (int(starts[i]), min(1.0, distance / scale))
+                for i, distance in top_discords(profile, window, top_k)
+            ]
+        }
+
+
+# Pipelines owned by a process-pool worker (populated inside the worker only)
+_worker_pipelines: Dict[str, DevicePipeline] = {}
+
+
+def _worker_pipeline(device_id: str) -> DevicePipeline:
+    """Get (creating if needed) a device pipeline inside a worker process"""
+    pipeline = _worker_pipelines.get(device_id)
+    if pipeline is None:
+        pipeline = DevicePipeline(device_id)
+        _worker_pipelines[device_id] = pipeline
+    return pipeline
+
+
+def _process_in_worker(device_id: str, raw_data: BiosignalSample) -> Dict:
+    """Process-pool entry point: layer state lives in the worker process"""
+    return _worker_pipeline(device_id).process(raw_data)
+
+
+def _process_batch_in_worker(device_id: str, samples: List[BiosignalSample]) -> List[Dict]:
+    """Process-pool entry point for buffered sample blocks"""
+    return _worker_pipeline(device_id).process_batch(samples)
+
+
+def _query_in_worker(device_id: str, method: str, args: tuple) -> Any:
+    """Process-pool entry point for read-only queries against layer state"""
+    return getattr(_worker_pipeline(device_id), method)(*args)
+
+
+def _evict_in_worker(device_id: str):
+    """Process-pool entry point dropping an evicted device's state"""
+    _worker_pipelines.pop(device_id, None)
+
+
+class PipelineRunner:
+    """
+    Dispatches layer computation off the asyncio event loop
+
+    Execution modes:
+    - inline: run on the event loop (legacy behaviour, useful for debugging)
+    - thread: shared thread pool; numpy releases the GIL during FFTs/fits
+    - process: one single-worker process per shard, devices pinned to a
+      shard so their layer state stays in one process
+
+    Samples from the same device are processed strictly in arrival order.
+    A caller cancelled while its work runs (client disconnect) keeps the
+    device lock until that work has finished, so the next sample never
+    runs concurrently on the same device state.
+
+    Device state is created by samples (and configuration), never by
+    read-only queries, which raise UnknownDevice for devices without
+    state. At most `PIPELINE_MAX_DEVICES` devices are kept; the least
+    recently active one is evicted first, and devices idle for longer
+    than `PIPELINE_DEVICE_TTL` seconds are evicted too.
+    """
+
+    MODES = ('inline', 'thread', 'process')
+
+    def __init__(self, mode: Optional[str] = None, max_workers: Optional[int] = None):
+        self.mode = (mode or os.getenv("PIPELINE_EXECUTION_MODE", "thread")).lower()
+        if self.mode not in self.MODES:
+            raise ValueError(
+                f"Invalid pipeline execution mode '{self.mode}' (expected one of {', '.join(self.MODES)})"
+            )
+        self.max_workers = max_workers or int(os.getenv("PIPELINE_WORKERS", "4"))
+
+        self.max_devices = int(os.getenv("PIPELINE_MAX_DEVICES", "1000"))
+        self.device_ttl = float(os.getenv("PIPELINE_DEVICE_TTL", "86400"))
+
+        self.pipelines: Dict[str, DevicePipeline] = {}
+        # Known devices in least recently active order
+        self.device_locks: "OrderedDict[str, asyncio.Lock]" = OrderedDict()
+        self.last_active: Dict[str, float] = {}
+        self.evictions = 0
+
+        self.thread_pool: Optional[ThreadPoolExecutor] = None
+        self.process_shards: List[ProcessPoolExecutor] = []
+
+        if self.mode == 'thread':
+            self.thread_pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="pipeline"
+            )
+        elif self.mode == 'process':
+            # Spawn avoids forking the running event loop and its threads
+            context = multiprocessing.get_context("spawn")
+            self.process_shards = [
+                ProcessPoolExecutor(max_workers=1, mp_context=context)
+                for _ in range(self.max_workers)
+            ]
+
+    def get_pipeline(self, device_id: str) -> DevicePipeline:
+        """
+        Get (creating if needed) the in-process pipeline for a device
+
+        Not available in process mode, where layer state lives in workers.
+        """
+        if self.mode == 'process':
+            raise RuntimeError("Layer state lives in worker processes in 'process' mode")
+
+        pipeline = self.pipelines.get(device_id)
+        if pipeline is None:
+            pipeline = DevicePipeline(device_id)
+            self.pipelines[device_id] = pipeline
+        return pipeline
+
+    async def process(self, device_id: str, raw_data: BiosignalSample) -> Dict:
+        """
+        Process one sample for a device without blocking the event loop
+
+        Args:
+            device_id: Device the sample belongs to
+            raw_data: Raw biosignal sample
+
+        Returns:
+            Layer outputs as produced by DevicePipeline.process
+        """
+        async with self._device_lock(device_id):
+            if self.mode == 'inline':
+                return self.get_pipeline(device_id).process(raw_data)
+
+            if self.mode == 'thread':
+                pipeline = self.get_pipeline(device_id)
+                return await self._run_to_completion(self.thread_pool, pipeline.process, raw_data)
+
+            shard = self._shard_for(device_id)
+            return await self._run_to_completion(shard, _process_in_worker, device_id, raw_data)
+
+    async def process_batch(self, device_id: str, samples: List[BiosignalSample]) -> List[Dict]:
+        """
+        Process a block of buffered samples for a device off the event loop
+
+        The whole block runs as one task, in order, under the device lock.
+        """
+        async with self._device_lock(device_id):
+            if self.mode == 'inline':
+                return self.get_pipeline(device_id).process_batch(samples)
+
+            if self.mode == 'thread':
+                pipeline = self.get_pipeline(device_id)
+                return await self._run_to_completion(self.thread_pool, pipeline.process_batch, samples)
+
+            shard = self._shard_for(device_id)
+            return await self._run_to_completion(shard, _process_batch_in_worker, device_id, samples)
+
+    @staticmethod
+    async def _run_to_completion(executor: Executor, fn: Callable, *args) -> Any:
+        """
+        Run a call in an executor and await it
+
+        If the awaiting task is cancelled, the call (already running or
+        queued in the executor) is still waited for before the
+        cancellation propagates, so the caller's device lock covers it.
+        """
+        future = asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            while not future.done():
+                try:
+                    await asyncio.wait({future})
+                except asyncio.CancelledError:
+                    continue
+            if not future.cancelled():
+                future.exception()  # Result is discarded; mark any error retrieved
+            raise
+
+    def register(self, device_id: str):
+        """Create state for a device before its first sample (e.g. the simulated device)"""
+        self._device_lock(device_id, create=True)
+
+    async def query(self, device_id: str, method: str, *args, create: bool = False) -> Any:
+        """
+        Run a DevicePipeline query/configuration method where the device's state lives
+
+        Queries are serialised with the device's samples, so they never
+        observe a half-processed sample.
+
+        Args:
+            create: Create the device's state if needed (configuration
+                calls); otherwise an unknown device raises UnknownDevice
+        """
+        async with self._device_lock(device_id, create=create):
+            if self.mode == 'inline':
+                return getattr(self.get_pipeline(device_id), method)(*args)
+
+            if self.mode == 'thread':
+                call = partial(getattr(self.get_pipeline(device_id), method), *args)
+                return await self._run_to_completion(self.thread_pool, call)
+
+            shard = self._shard_for(device_id)
+            return await self._run_to_completion(shard, _query_in_worker, device_id, method, args)
+
+    async def fleet_conditions(self) -> Dict[str, Dict]:
+        """
+        Classify the latest sample of every known device
+
+        Devices are grouped by the model version serving them (pins), with
+        one rule evaluation per version.
+
+        Returns:
+            device_id → condition, risk_factors, positive_indicators
+        """
+        device_ids = list(self.device_locks)
+        rows = await asyncio.gather(*(
+            self.query(device_id, 'latest_features') for device_id in device_ids
+        ), return_exceptions=True)
+        for row in rows:
+            if isinstance(row, BaseException) and not isinstance(row, UnknownDevice):
+                raise row
+        snapshot = [
+            (device_id, features) for device_id, features in zip(device_ids, rows)
+            if features is not None and not isinstance(features, UnknownDevice)
+        ]
+        if not snapshot:
+            return {}
+
+        registry = get_registry()
+        groups: Dict[str, tuple] = {}
+        for device_id, features in snapshot:
+            bundle = registry.bundle_for(device_id)
+            groups.setdefault(bundle.version, (bundle, []))[1].append((device_id, features))
+
+        conditions = {}
+        for bundle, members in groups.values():
+            rules = bundle.rules
+            results = rules.evaluate(rules.encode([features for _, features in members]))
+            for (device_id, _), result in zip(members, results):
+                conditions[device_id] = {**result, 'lia_version': bundle.version}
+        return conditions
+
+    def _device_lock(self, device_id: str, create: bool = True) -> asyncio.Lock:
+        """
+        Per-device lock preserving sample order
+
+        Marks the device active. Creating a device evicts idle and least
+        recently active ones beyond the limits.
+        """
+        lock = self.device_locks.get(device_id)
+        if lock is None:
+            if not create:
+                raise UnknownDevice(device_id)
+            lock = asyncio.Lock()
+            self.device_locks[device_id] = lock
+            self._evict(exclude=device_id)
+        self.device_locks.move_to_end(device_id)
+        self.last_active[device_id] = time.monotonic()
+        return lock
+
+    def _evict(self, exclude: str):
+        """Drop the state of idle devices and of the least recently active beyond max_devices"""
+        now = time.monotonic()
+        while self.device_locks:
+            device_id, lock = next(iter(self.device_locks.items()))
+            over_limit = len(self.device_locks) > self.max_devices
+            idle = now - self.last_active.get(device_id, now) > self.device_ttl
+            if device_id == exclude or lock.locked() or not (over_limit or idle):
+                break
+            del self.device_locks[device_id]
+            self.last_active.pop(device_id, None)
+            self.pipelines.pop(device_id, None)
+            if self.process_shards:
+                self._shard_for(device_id).submit(_evict_in_worker, device_id)
+            self.evictions += 1
+
+    def _shard_for(self, device_id: str) -> Executor:
+        """Stable device → worker process assignment"""
+        index = zlib.crc32(device_id.encode()) % len(self.process_shards)
+        return self.process_shards[index]
+
+    def shutdown(self):
+        """Release executor resources"""
+        if self.thread_pool is not None:
+            self.thread_pool.shutdown(wait=False, cancel_futures=True)
+        for shard in self.process_shards:
+            shard.shutdown(wait=False, cancel_futures=True)
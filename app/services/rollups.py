@@ -0,0 +1,367 @@
+"""
+Multi-Resolution Rollups - Cascading pre-aggregated biosignal history
+Maintains 1 s / 1 min / 1 h / 1 day buckets per channel with bounded memory
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+
+def _merge_moments(
+    count_a: int, mean_a: np.ndarray, m2_a: np.ndarray,
+    count_b: int, mean_b: np.ndarray, m2_b: np.ndarray
+) -> tuple:
+    """Chan et al. parallel merge of two (count, mean, M2) aggregates"""
+    total = count_a + count_b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * (count_b / total)
+    m2 = m2_a + m2_b + delta * delta * (count_a * count_b / total)
+    return total, mean, m2
+
+
+class RollupLevel:
+    """
+    One resolution of the rollup cascade
+
+    Holds the currently open bucket plus a fixed-capacity ring of closed
+    buckets. Each bucket stores count, mean, M2 (sum of squared deviations),
+    min and max per channel, so buckets can be merged exactly with Chan's
+    parallel variance formula.
+
+    Aggregates normally arrive in time order. A late one (earlier than the
+    open bucket, e.g. a buffered upload) is merged into its closed bucket
+    if the ring still holds it (`late_merged`); otherwise, when that bucket
+    was empty or has aged out, it is counted in `late_dropped`.
+    """
+
+    def __init__(self, name: str, bucket_ms: int, capacity: int, n_channels: int):
+        self.name = name
+        self.bucket_ms = bucket_ms
+        self.capacity = capacity
+        self.n_channels = n_channels
+
+        # Closed buckets (ring)
+        self.starts = np.zeros(capacity, dtype=np.int64)
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.means = np.zeros((capacity, n_channels))
+        self.m2s = np.zeros((capacity, n_channels))
+        self.mins = np.zeros((capacity, n_channels))
+        self.maxs = np.zeros((capacity, n_channels))
+        self.head = 0
+        self.size = 0
+
+        # Open bucket
+        self.open_start: Optional[int] = None
+        self.open_count = 0
+        self.open_mean = np.zeros(n_channels)
+        self.open_m2 = np.zeros(n_channels)
+        self.open_min = np.full(n_channels, np.inf)
+        self.open_max = np.full(n_channels, -np.inf)
+
+        # Samples that arrived after their bucket had closed
+        self.late_merged = 0
+        self.late_dropped = 0
+
+    def add(
+        self, start_ms: int, count: int, mean: np.ndarray, m2: np.ndarray,
+        minimum: np.ndarray, maximum: np.ndarray
+    ) -> Optional[tuple]:
+        """
+        Merge a partial aggregate (a raw sample or a finer closed bucket)
+
+        Returns:
+            The bucket closed by this call as (start, count, mean, m2, min, max),
+            or None if the open bucket is still accumulating (or the
+            aggregate was late, see merge_late)
+        """
+        bucket_start = start_ms - start_ms % self.bucket_ms
+        closed = None
+
+        if self.open_start is None:
+            self.open_start = bucket_start
+        elif bucket_start > self.open_start:
+            closed = self._close_open_bucket()
+            self.open_start = bucket_start
+        elif bucket_start < self.open_start:
+            self.merge_late(start_ms, count, mean, m2, minimum, maximum)
+            return None
+
+        self._merge_open(count, mean, m2, minimum, maximum)
+        return closed
+
+    def is_late(self, start_ms: int) -> bool:
+        """Whether an aggregate at start_ms belongs before the open bucket"""
+        return self.open_start is not None and start_ms - start_ms % self.bucket_ms < self.open_start
+
+    def merge_late(
+        self, start_ms: int, count: int, mean: np.ndarray, m2: np.ndarray,
+        minimum: np.ndarray, maximum: np.ndarray
+    ) -> bool:
+        """
+        Merge an out-of-order aggregate into the bucket it belongs to
+
+        Returns:
+            True if it landed in the open bucket (coarser levels will get it
+            when that bucket closes), False if a closed bucket took it or it
+            was dropped (coarser levels must merge it themselves)
+        """
+        bucket_start = start_ms - start_ms % self.bucket_ms
+        if self.open_start is None or bucket_start >= self.open_start:
+            if self.open_start is None:
+                self.open_start = bucket_start
+            self._merge_open(count, mean, m2, minimum, maximum)
+            return True
+
+        i = self._find_closed(bucket_start)
+        if i is None:
+            self.late_dropped += count
+            return False
+
+        total, self.means[i], self.m2s[i] = _merge_moments(
+            int(self.counts[i]), self.means[i], self.m2s[i], count, mean, m2
+        )
+        self.counts[i] = total
+        self.mins[i] = np.minimum(self.mins[i], minimum)
+        self.maxs[i] = np.maximum(self.maxs[i], maximum)
+        self.late_merged += count
+        return False
+
+    def _find_closed(self, bucket_start: int) -> Optional[int]:
+        """Ring index of the closed bucket starting at bucket_start, if retained"""
+        idx = self.ordered_indices()
+        position = int(np.searchsorted(self.starts[idx], bucket_start))
+        if position < len(idx) and self.starts[idx[position]] == bucket_start:
+            return int(idx[position])
+        return None
+
+    def _merge_open(
+        self, count: int, mean: np.ndarray, m2: np.ndarray,
+        minimum: np.ndarray, maximum: np.ndarray
+    ):
+        self.open_count, self.open_mean, self.open_m2 = _merge_moments(
+            self.open_count, self.open_mean, self.open_m2, count, mean, m2
+        )
+        self.open_min = np.minimum(self.open_min, minimum)
+        self.open_max = np.maximum(self.open_max, maximum)
+
+    def _close_open_bucket(self) -> tuple:
+        """Move the open bucket into the ring and reset it"""
+        i = self.head
+        self.starts[i] = self.open_start
+        self.counts[i] = self.open_count
+        self.means[i] = self.open_mean
+        self.m2s[i] = self.open_m2
+        self.mins[i] = self.open_min
+        self.maxs[i] = self.open_max
+
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+        closed = (
+            self.open_start, self.open_count, self.open_mean.copy(),
+            self.open_m2.copy(), self.open_min.copy(), self.open_max.copy()
+        )
+
+        self.open_count = 0
+        self.open_mean = np.zeros(self.n_channels)
+        self.open_m2 = np.zeros(self.n_channels)
+        self.open_min = np.full(self.n_channels, np.inf)
+        self.open_max = np.full(self.n_channels, -np.inf)
+
+        return closed
+
+    def ordered_indices(self) -> np.ndarray:
+        """Ring indices of closed buckets, oldest first"""
+        if self.size < self.capacity:
+            return np.arange(self.size)
+        return (np.arange(self.capacity) + self.head) % self.capacity
+
+    def buckets(
+        self, start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+        include_open: bool = False
+    ) -> Dict[str, np.ndarray]:
+        """
+        Buckets within [start_ms, end_ms), oldest first
+
+        Returns:
+            Dict of arrays: start_ms, count, mean, std, min, max
+            (per-channel arrays have shape [buckets, channels])
+        """
+        idx = self.ordered_indices()
+        starts = self.starts[idx]
+        counts = self.counts[idx]
+        means, m2s = self.means[idx], self.m2s[idx]
+        mins, maxs = self.mins[idx], self.maxs[idx]
+
+        if include_open and self.open_count > 0:
+            starts = np.append(starts, self.open_start)
+            counts = np.append(counts, self.open_count)
+            means = np.vstack([means, self.open_mean])
+            m2s = np.vstack([m2s, self.open_m2])
+            mins = np.vstack([mins, self.open_min])
+            maxs = np.vstack([maxs, self.open_max])
+
+        mask = np.ones(len(starts), dtype=bool)
+        if start_ms is not None:
+            mask &= starts >= start_ms
+        if end_ms is not None:
+            mask &= starts < end_ms
+
+        counts = counts[mask]
+        return {
+            'start_ms': starts[mask],
+            'count': counts,
+            'mean': means[mask],
+            'std': np.sqrt(m2s[mask] / np.maximum(counts, 1)[:, None]),
+            'm2': m2s[mask],
+            'min': mins[mask],
+            'max': maxs[mask]
+        }
+
+
+class MultiResolutionRollup:
+    """
+    Cascading per-device rollups: 1 s → 1 min → 1 h → 1 day
+
+    Raw samples update only the 1 s open bucket; when a bucket closes it is
+    merged into the next coarser level, so the amortised cost per sample is
+    O(1) and memory is fixed by the level capacities regardless of how long
+    a device streams.
+    """
+
+    # (name, bucket length in ms, buckets retained)
+    LEVELS = (
+        ('1s', 1000, 600),               # 10 minutes
+        ('1m', 60 * 1000, 1440),         # 1 day
+        ('1h', 60 * 60 * 1000, 1008),    # 6 weeks
+        ('1d', 24 * 60 * 60 * 1000, 365)  # 1 year
+    )
+
+    def __init__(self, channels: Sequence[str]):
+        self.channels = tuple(channels)
+        self.channel_index = {name: i for i, name in enumerate(self.channels)}
+        self.levels: Dict[str, RollupLevel] = {
+            name: RollupLevel(name, bucket_ms, capacity, len(self.channels))
+            for name, bucket_ms, capacity in self.LEVELS
+        }
+        self.level_order = [name for name, _, _ in self.LEVELS]
+
+    def add(self, timestamp_ms: int, values: Sequence[float]) -> List[str]:
+        """
+        Add a raw sample
+
+        A late sample (before the open 1 s bucket) is merged into its
+        bucket at every level instead of cascading; see RollupLevel.
+
+        Returns:
+            Names of the levels whose bucket closed on this sample
+        """
+        v = np.asarray(values, dtype=np.float64)
+        sample = (timestamp_ms, 1, v, np.zeros_like(v), v, v)
+
+        finest = self.levels[self.level_order[0]]
+        if finest.is_late(timestamp_ms):
+            for name in self.level_order:
+                if self.levels[name].merge_late(*sample):
+                    break
+            return []
+
+        closed = finest.add(*sample)
+
+        closed_levels = []
+        for finer, coarser in zip(self.level_order, self.level_order[1:]):
+            if closed is None:
+                break
+            closed_levels.append(finer)
+            closed = self.levels[coarser].add(*closed)
+
+        if closed is not None:
+            closed_levels.append(self.level_order[-1])
+
+        return closed_levels
+
+    def late_samples(self) -> Dict[str, Dict[str, int]]:
+        """Per level: late samples merged into closed buckets and dropped"""
+        return {
+            name: {'merged': level.late_merged, 'dropped': level.late_dropped}
+            for name, level in self.levels.items()
+        }
+
+    def last_closed(self, resolution: str) -> Optional[tuple]:
+        """(start_ms, per-channel means) of the most recently closed bucket"""
+        level = self.levels[resolution]
+        if level.size == 0:
+            return None
+        i = (level.head - 1) % level.capacity
+        return int(level.starts[i]), level.means[i].copy()
+
+    def series(
+        self, resolution: str, channel: str, start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None, include_open: bool = True
+    ) -> Dict[str, np.ndarray]:
+        """Per-bucket statistics of one channel at one resolution"""
+        buckets = self.levels[resolution].buckets(start_ms, end_ms, include_open)
+        c = self.channel_index[channel]
+
+        return {
+            'start_ms': buckets['start_ms'],
+            'count': buckets['count'],
+            'mean': buckets['mean'][:, c],
+            'std': buckets['std'][:, c],
+            'min': buckets['min'][:, c],
+            'max': buckets['max'][:, c]
+        }
+
+    def summary(
+        self, resolution: str, start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Merge all buckets in a range into one aggregate per channel
+
+        Used for session/period analytics without touching raw samples.
+        Open buckets of finer levels (not yet cascaded) are included so the
+        most recent samples are always counted.
+        """
+        parts = [self.levels[resolution].buckets(start_ms, end_ms, include_open=True)]
+        for name in self.level_order[:self.level_order.index(resolution)]:
+            level = self.levels[name]
+            if level.open_count == 0:
+                continue
+            if start_ms is not None and level.open_start < start_ms:
+                continue
+            if end_ms is not None and level.open_start >= end_ms:
+                continue
+            parts.append({
+                'count': np.array([level.open_count]),
+                'mean': level.open_mean[None, :],
+                'm2': level.open_m2[None, :],
+                'min': level.open_min[None, :],
+                'max': level.open_max[None, :]
+            })
+
+        counts = np.concatenate([part['count'] for part in parts])
+        total = int(counts.sum())
+        if total == 0:
+            return {}
+
+        means = np.vstack([part['mean'] for part in parts])
+        m2s = np.vstack([part['m2'] for part in parts])
+        mins = np.vstack([part['min'] for part in parts])
+        maxs = np.vstack([part['max'] for part in parts])
+
+        weights = counts[:, None].astype(np.float64)
+        mean = (means * weights).sum(axis=0) / total
+        # Exact pooled M2 = Σ M2_i + Σ n_i (mean_i - mean)²
+        m2 = m2s.sum(axis=0) + (weights * (means - mean) ** 2).sum(axis=0)
+
+        return {
+            channel: {
+                'count': total,
+                'mean': float(mean[i]),
+                'std': float(np.sqrt(m2[i] / total)),
+                'min': float(mins[:, i].min()),
+                'max': float(maxs[:, i].max())
+            }
+            for i, channel in enumerate(self.channels)
+        }
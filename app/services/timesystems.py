@@ -4,14 +4,22 @@ Proprietary time-domain pattern recognition and circadian alignment
 """
 
 import numpy as np
-from datetime import datetime, time
-from typing import Dict, Optional
-import random
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from app.models.schemas import (
-    BiosignalData, TimesystemsLayerResult, PatternType,
-    CircadianPhase, PatternRecognition, CircadianAlignment
+    BiosignalData, BiosignalSample, TimesystemsLayerResult, PatternType,
+    CircadianPhase, PatternRecognition, CircadianAlignment,
+    ChangePointEvent
 )
+from app.utils.ring_buffer import ColumnarRingBuffer
+from app.utils.running_stats import RunningTrendWindow
+from app.services.rollups import MultiResolutionRollup
+from app.services.circadian_model import CosinorModel
+from app.services.matrix_profile import IncrementalMatrixProfile
+from app.services.change_points import ChangePointMonitor
+from app.services.alignment import MultiRateAligner
+from app.utils.timebase import local_hour_of_day, now_ms, server_utc_offset_minutes, to_datetime
 
 
 class TimesystemsLayer:
@@ -21,50 +29,226 @@ class TimesystemsLayer:
     Features:
     - Circadian rhythm detection and phase identification
     - Temporal pattern recognition (trends, periodicity)
+    - Motif/discord discovery (streaming matrix profile over 1 s means)
+    - Online change-point detection per channel (Page-Hinkley over 1 s means)
+    - Multi-rate channel alignment with staleness tracking
     - Time-of-day physiological alignment
+    - Personalised circadian model (cosinor fit over hourly rollups)
     - Rhythm coherence scoring
-    - Long-term trend analysis
+    - Long-term trend analysis (multi-resolution rollups)
     - Pattern prediction
     """
 
-    def __init__(self):
-        self.temporal_buffer = []
+    CHANNELS = ('heart_rate', 'spo2', 'temperature', 'activity')
+
+    # Used for a channel that has not reported yet
+    NOMINAL_VALUES = {'heart_rate': 70.0, 'spo2': 98.0, 'temperature': 36.8, 'activity': 0.0}
+
+    # Circadian phase for each local hour 0-23
+    PHASE_BY_HOUR = np.array(
+        [CircadianPhase.NIGHT] * 6 + [CircadianPhase.MORNING] * 6
+        + [CircadianPhase.AFTERNOON] * 6 + [CircadianPhase.EVENING] * 4
+        + [CircadianPhase.NIGHT] * 2,
+        dtype=object
+    )
+
+    def __init__(
+        self, utc_offset_minutes: Optional[int] = None,
+        channel_rates: Optional[Dict[str, float]] = None
+    ):
+        # Per-channel sample rates; slow channels are held between readings
+        self.aligner = MultiRateAligner(self.CHANNELS, channel_rates)
+
         self.buffer_size = 600  # 60 seconds at 10Hz
+        self.temporal_buffer = ColumnarRingBuffer(self.buffer_size, self.CHANNELS)
         self.pattern_window = 100
 
+        # Wearer's local timezone (server timezone until the client reports one)
+        self.utc_offset_minutes = (
+            utc_offset_minutes if utc_offset_minutes is not None
+            else server_utc_offset_minutes()
+        )
+
+        # Heart rate trend windows with O(1) slope/variance updates
+        self.short_term_window = RunningTrendWindow(30)
+        self.pattern_trend_window = RunningTrendWindow(self.pattern_window)
+        self.long_term_window = RunningTrendWindow(self.buffer_size)
+        self.consistency_window = RunningTrendWindow(50)
+        self.trend_windows = (
+            self.short_term_window, self.pattern_trend_window,
+            self.long_term_window, self.consistency_window
+        )
+
+        # Cascading 1s/1min/1h/1day rollups for long-horizon analytics
+        self.rollups = MultiResolutionRollup(self.CHANNELS)
+        self.long_term_minutes = 60  # Minute buckets behind the long-term trend
+        self.long_term_min_buckets = 5
+        self.long_term_slope_threshold = 0.1  # bpm per minute
+        self.rollup_trend_cache = None
+
+        # Autocorrelation periodicity, recomputed every few seconds
+        self.periodicity_interval = 50  # samples (~5 seconds at 10Hz)
+        self.periodicity_threshold = 0.3  # minimum normalised ACF peak
+        self.periodicity_cache = None
+        self.samples_since_periodicity = 0
+
+        # Streaming matrix profile of 1 s heart rate means (1 minute shapes, 1 hour history)
+        self.motif_window = 60
+        self.live_matrix_profile = IncrementalMatrixProfile(self.motif_window, max_length=3600)
+        self.discord_sigma = 3.0  # Profile std devs above the mean that make a discord
+        self.discord_min_distance = 0.25  # Ignore "discords" that still closely match history
+        self.matrix_profile_cache = None
+
+        # Regime changes per channel, evaluated once per closed second
+        self.change_monitor = ChangePointMonitor(self.CHANNELS)
+        self.recent_change_points = deque(maxlen=100)
+
         # Circadian reference values (expected HR by time of day)
+        # Population fallback until the personal model has enough hours
         self.circadian_reference = {
             'morning': 70,    # 6 AM - 12 PM
             'afternoon': 75,  # 12 PM - 6 PM
             'evening': 72,    # 6 PM - 10 PM
             'night': 62       # 10 PM - 6 AM
         }
+        self.reference_acrophase_hour = 15.0  # Typical HR/temperature peak
+
+        # Personal cosinor model, updated once per closed hourly rollup
+        self.circadian_channels = ('heart_rate', 'temperature')
+        self.circadian_model = CosinorModel(self.circadian_channels)
+        self.circadian_parameters_cache = None
+
+    def set_utc_offset(self, utc_offset_minutes: int):
+        """Set the wearer's local UTC offset used for circadian analysis"""
+        self.utc_offset_minutes = utc_offset_minutes
+
+    def local_hours(self, timestamps_ms: Sequence[int]) -> np.ndarray:
+        """Wearer-local fractional hour of day for a block of epoch-ms timestamps"""
+        return local_hour_of_day(np.asarray(timestamps_ms, dtype=np.int64), self.utc_offset_minutes)
+
+    def identify_circadian_phases(self, hours: np.ndarray) -> List[CircadianPhase]:
+        """
+        Circadian phase for a block of local hours
+
+        Once the personal model is fitted, the clock is shifted by the
+        wearer's acrophase offset so late/early chronotypes map correctly.
+        """
+        shifted = np.asarray(hours) - self._personal_phase_shift_hours()
+        return list(self.PHASE_BY_HOUR[np.floor(shifted).astype(np.int64) % 24])
+
+    def synchronize_signals(self, raw_data: BiosignalSample) -> Tuple[BiosignalData, Dict]:
+        """
+        Align one live device sample onto the common time base
+
+        Channels missing from the sample (None) are held at their last
+        reading. Runs before Clarity™ so every layer sees a complete sample.
+
+        Returns:
+            (aligned sample with timestamp_ms set, alignment info: 'fresh'
+            channels and per-channel reading 'age_ms')
+        """
+        timestamp_ms = raw_data.timestamp_ms if raw_data.timestamp_ms is not None else now_ms()
+        fresh = self.aligner.observe(
+            timestamp_ms, {channel: getattr(raw_data, channel) for channel in self.CHANNELS}
+        )
+        values, ages = self.aligner.align(np.array([timestamp_ms], dtype=np.int64))
+        return self._aligned_sample(raw_data, timestamp_ms, values[0], ages[0], fresh)
+
+    def synchronize_block(self, samples: List[BiosignalSample]) -> List[Tuple[BiosignalData, Dict]]:
+        """
+        Align a block of buffered samples (sorted, with device timestamps)
 
-    def process(self, data: BiosignalData) -> Dict:
+        All channels are resampled onto the block's timestamps in one
+        vectorized pass; slow channels are linearly interpolated between
+        their readings because later readings are already known.
+        """
+        timestamps_ms = np.array([sample.timestamp_ms for sample in samples], dtype=np.int64)
+
+        observed = {}
+        fresh_masks = {}
+        for channel in self.CHANNELS:
+            readings = np.array(
+                [getattr(sample, channel) for sample in samples], dtype=np.float64
+            )
+            present = ~np.isnan(readings)
+            newest = self.aligner.observations[channel].timestamps(1)
+            if len(newest):
+                present &= timestamps_ms >= newest[0]
+            fresh_masks[channel] = present
+            observed[channel] = (timestamps_ms[present], readings[present])
+
+        values, ages = self.aligner.align(timestamps_ms, observed, interpolate=True)
+        self.aligner.record_block(observed)
+
+        return [
+            self._aligned_sample(
+                sample, int(timestamps_ms[i]), values[i], ages[i],
+                [channel for channel in self.CHANNELS if fresh_masks[channel][i]]
+            )
+            for i, sample in enumerate(samples)
+        ]
+
+    def _aligned_sample(
+        self, raw_data: BiosignalSample, timestamp_ms: int,
+        values: np.ndarray, ages: np.ndarray, fresh: List[str]
+    ) -> Tuple[BiosignalData, Dict]:
+        """Build the aligned sample and its alignment info"""
+        aligned_dict = raw_data.dict()
+        aligned_dict['timestamp_ms'] = timestamp_ms
+        for channel, value in zip(self.CHANNELS, values):
+            if channel not in fresh:
+                aligned_dict[channel] = (
+                    round(float(value), 2) if not np.isnan(value) else self.NOMINAL_VALUES[channel]
+                )
+
+        alignment = {
+            'fresh': fresh,
+            'age_ms': dict(zip(self.CHANNELS, ages.tolist()))
+        }
+        return BiosignalData(**aligned_dict), alignment
+
+    def process(
+        self, data: BiosignalData, local_hour: Optional[float] = None,
+        alignment: Optional[Dict] = None
+    ) -> Dict:
         """
         Process biosignal data through Timesystems™ layer
 
         Args:
-            data: iFRS-enhanced biosignal data
+            data: iFRS-enhanced biosignal data (device timestamp_ms if known)
+            local_hour: Precomputed wearer-local hour of day (block processing)
+            alignment: Alignment info from synchronize_signals/synchronize_block
 
         Returns:
             Timesystems layer processing results
         """
-        # Add to temporal buffer with timestamp
-        timestamp = datetime.now()
-        self.temporal_buffer.append({
-            'timestamp': timestamp,
-            'data': data.dict()
-        })
+        # Device sample time; receive time for devices without a clock
+        timestamp_ms = data.timestamp_ms if data.timestamp_ms is not None else now_ms()
+        if local_hour is None:
+            local_hour = float(local_hour_of_day(timestamp_ms, self.utc_offset_minutes))
 
-        if len(self.temporal_buffer) > self.buffer_size:
-            self.temporal_buffer.pop(0)
+        # Add to temporal buffer with timestamp
+        values = (data.heart_rate, data.spo2, data.temperature, data.activity)
+        self.temporal_buffer.append(timestamp_ms, values)
+
+        # Update rollups; the long-term trend only changes when a minute closes
+        closed_levels = self.rollups.add(timestamp_ms, values)
+        change_points = []
+        if '1s' in closed_levels:
+            self._update_matrix_profile()
+            change_points = self._detect_change_points()
+        if '1m' in closed_levels:
+            self.rollup_trend_cache = self._calculate_rollup_trend()
+        if '1h' in closed_levels:
+            self._update_circadian_model()
+        for window in self.trend_windows:
+            window.push(data.heart_rate)
 
         # Identify circadian phase
-        circadian_phase = self._identify_circadian_phase(timestamp)
+        circadian_phase = self._identify_circadian_phase(local_hour)
 
         # Analyze time-of-day patterns
-        time_of_day_analysis = self._analyze_time_of_day(data, timestamp)
+        time_of_day_analysis = self._analyze_time_of_day(data, local_hour, circadian_phase)
 
         # Recognize patterns
         pattern_type = self._recognize_pattern()
@@ -75,7 +259,7 @@ class TimesystemsLayer:
 
         # Assess circadian alignment
         circadian_alignment = self._assess_circadian_alignment(
-            data.heart_rate, circadian_phase
+            data.heart_rate, data.temperature, circadian_phase, local_hour
         )
 
         # Calculate rhythm score
@@ -83,16 +267,16 @@ class TimesystemsLayer:
             temporal_consistency, circadian_alignment, pattern_recognition
         )
 
-        # Apply temporal synchronization
-        synchronized_data = self._synchronize_signals(data)
+        # Staleness of the multi-rate channels (data was aligned at pipeline entry)
+        channel_staleness, stale_channels = self._assess_staleness(alignment)
 
         # Generate processing notes
         notes = self._generate_processing_notes(
-            pattern_type, circadian_phase, rhythm_score
+            pattern_type, circadian_phase, rhythm_score, change_points
         )
 
         return {
-            'synchronized_data': synchronized_data,
+            'synchronized_data': data,
             'pattern_type': pattern_type,
             'temporal_consistency': temporal_consistency,
             'circadian_phase': circadian_phase,
@@ -100,47 +284,40 @@ class TimesystemsLayer:
             'pattern_recognition': pattern_recognition,
             'circadian_alignment': circadian_alignment,
             'rhythm_score': rhythm_score,
+            'change_points': change_points,
+            'channel_staleness_seconds': channel_staleness,
+            'stale_channels': stale_channels,
             'processing_notes': notes
         }
 
-    def _identify_circadian_phase(self, timestamp: datetime) -> CircadianPhase:
+    def _identify_circadian_phase(self, local_hour: float) -> CircadianPhase:
         """
-        Identify current circadian phase based on time of day
+        Identify current circadian phase based on wearer-local time of day
         """
-        hour = timestamp.hour
-
-        if 6 <= hour < 12:
-            return CircadianPhase.MORNING
-        elif 12 <= hour < 18:
-            return CircadianPhase.AFTERNOON
-        elif 18 <= hour < 22:
-            return CircadianPhase.EVENING
-        else:
-            return CircadianPhase.NIGHT
+        return self.identify_circadian_phases(np.array([local_hour]))[0]
 
     def _analyze_time_of_day(
-        self, data: BiosignalData, timestamp: datetime
+        self, data: BiosignalData, local_hour: float, phase: CircadianPhase
     ) -> Dict:
         """
         Analyze physiological metrics in context of time of day
         """
-        hour = timestamp.hour
-        phase = self._identify_circadian_phase(timestamp)
-
         # Expected ranges based on circadian rhythm
         analysis = {
-            'current_hour': hour,
+            'current_hour': int(local_hour),
+            'utc_offset_minutes': self.utc_offset_minutes,
             'phase': phase.value,
             'expected_heart_rate_range': self._get_expected_hr_range(phase),
             'heart_rate_deviation': self._calculate_hr_deviation(
-                data.heart_rate, phase
+                data.heart_rate, phase, local_hour
             ),
             'activity_appropriate': self._is_activity_appropriate(
                 data.activity, phase
             ),
             'temperature_rhythm': self._assess_temperature_rhythm(
-                data.temperature, phase
-            )
+                data.temperature, phase, local_hour
+            ),
+            'personal_circadian_model': self.circadian_parameters_cache
         }
 
         return analysis
@@ -155,12 +332,53 @@ class TimesystemsLayer:
         }
         return ranges.get(phase, (60, 80))
 
-    def _calculate_hr_deviation(self, hr: float, phase: CircadianPhase) -> float:
+    def _calculate_hr_deviation(
+        self, hr: float, phase: CircadianPhase, local_hour: float
+    ) -> float:
         """Calculate heart rate deviation from circadian expectation"""
-        expected_hr = self.circadian_reference[phase.value]
+        expected_hr = self._expected_heart_rate(phase, local_hour)
         deviation = hr - expected_hr
         return round(deviation, 1)
 
+    def _expected_heart_rate(self, phase: CircadianPhase, local_hour: float) -> float:
+        """Personalised expected HR, falling back to the population reference"""
+        expected = self.circadian_model.expected(local_hour, 'heart_rate')
+        if expected is None:
+            return self.circadian_reference[phase.value]
+        return round(expected, 1)
+
+    def _personal_phase_shift_hours(self) -> float:
+        """Wearer's HR acrophase offset from the reference, wrapped to ±12 h"""
+        if self.circadian_parameters_cache is None:
+            return 0.0
+        acrophase = self.circadian_parameters_cache['heart_rate']['acrophase_hour']
+        return (acrophase - self.reference_acrophase_hour + 12) % 24 - 12
+
+    def _update_circadian_model(self):
+        """
+        Fold the hourly bucket that just closed into the cosinor model
+
+        Each closed hour contributes one observation at the bucket centre,
+        so the model costs O(1) per hour and nothing per sample.
+        """
+        closed = self.rollups.last_closed('1h')
+        if closed is None:
+            return
+
+        start_ms, means = closed
+        hour = float(self.local_hours([start_ms + self.rollups.levels['1h'].bucket_ms // 2])[0])
+        values = [means[self.rollups.channel_index[c]] for c in self.circadian_channels]
+
+        self.circadian_model.update(hour, values)
+        if self.circadian_model.is_fitted:
+            self.circadian_parameters_cache = {
+                channel: {
+                    key: round(value, 2)
+                    for key, value in self.circadian_model.parameters(channel).items()
+                }
+                for channel in self.circadian_channels
+            }
+
     def _is_activity_appropriate(self, activity: float, phase: CircadianPhase) -> bool:
         """Check if activity level is appropriate for time of day"""
         if phase == CircadianPhase.NIGHT and activity > 50:
@@ -169,8 +387,19 @@ class TimesystemsLayer:
             return True  # Low activity during day could be sedentary work
         return True
 
-    def _assess_temperature_rhythm(self, temp: float, phase: CircadianPhase) -> str:
+    def _assess_temperature_rhythm(
+        self, temp: float, phase: CircadianPhase, local_hour: float
+    ) -> str:
         """Assess body temperature rhythm alignment"""
+        expected_temp = self.circadian_model.expected(local_hour, 'temperature')
+        if expected_temp is not None:
+            deviation = temp - expected_temp
+            if deviation > 0.4:
+                return "Above personal rhythm"
+            elif deviation < -0.4:
+                return "Below personal rhythm"
+            return "Aligned with personal rhythm"
+
         # Body temperature typically peaks in late afternoon, lowest in early morning
         if phase == CircadianPhase.AFTERNOON and temp >= 37.0:
             return "Normal circadian peak"
@@ -184,24 +413,33 @@ class TimesystemsLayer:
     def _recognize_pattern(self) -> PatternType:
         """
         Recognize overall pattern type from temporal data
+
+        Deliberately hybrid, because the matrix profile compares z-normalised
+        shapes and cannot see level or trend:
+        - Matrix profile decides shape: a discord is IRREGULAR, large swings
+          whose shape recurs are OSCILLATING
+        - Streaming least-squares slope decides direction (STABLE,
+          INCREASING, DECREASING)
+        - Until the profile holds enough 1 s means, large swings fall back
+          to the amplitude heuristic (IRREGULAR)
         """
         if len(self.temporal_buffer) < 20:
             return PatternType.STABLE
 
-        # Extract heart rate trend
-        recent_data = self.temporal_buffer[-min(self.pattern_window, len(self.temporal_buffer)):]
-        hr_values = [sample['data']['heart_rate'] for sample in recent_data]
+        # An unprecedented heart rate shape is irregular regardless of trend
+        matrix_profile = self.matrix_profile_cache
+        if matrix_profile is not None and matrix_profile['discord_detected']:
+            return PatternType.IRREGULAR
 
-        # Calculate trend using linear regression
-        if len(hr_values) < 2:
+        # Heart rate trend (streaming least-squares over the pattern window)
+        window = self.pattern_trend_window
+        if len(window) < 2:
             return PatternType.STABLE
 
-        x = np.arange(len(hr_values))
-        coefficients = np.polyfit(x, hr_values, 1)
-        slope = coefficients[0]
+        slope = window.slope
 
         # Calculate variability
-        hr_std = np.std(hr_values)
+        hr_std = window.std
 
         # Classify pattern
         if abs(slope) < 0.05 and hr_std < 5:
@@ -210,7 +448,9 @@ class TimesystemsLayer:
             return PatternType.INCREASING
         elif slope < -0.15:
             return PatternType.DECREASING
-        elif hr_std > 10:
+        elif hr_std > 10 and matrix_profile is None:
+            # Amplitude heuristic until the matrix profile has enough history;
+            # afterwards large swings that recur (no discord) are oscillations
             return PatternType.IRREGULAR
         else:
             return PatternType.OSCILLATING
@@ -229,39 +469,95 @@ class TimesystemsLayer:
             )
 
         # Short-term trend (last 30 samples)
-        short_window = min(30, len(self.temporal_buffer))
-        short_term_hr = [
-            s['data']['heart_rate']
-            for s in self.temporal_buffer[-short_window:]
-        ]
-        short_term_trend = self._calculate_trend_description(short_term_hr)
+        short_term_trend = self._calculate_trend_description(self.short_term_window)
 
-        # Long-term trend (all buffered samples)
-        long_term_hr = [s['data']['heart_rate'] for s in self.temporal_buffer]
-        long_term_trend = self._calculate_trend_description(long_term_hr)
+        # Long-term trend (minute rollups once available, else all buffered samples)
+        long_term_trend = (
+            self.rollup_trend_cache
+            or self._calculate_trend_description(self.long_term_window)
+        )
 
-        # Detect periodicity using autocorrelation
-        periodicity, period = self._detect_periodicity(long_term_hr)
+        # Detect periodicity using autocorrelation (cached between recomputes)
+        periodicity, period, periodicity_confidence = self._detect_periodicity()
 
         # Calculate pattern confidence
-        confidence = self._calculate_pattern_confidence(long_term_hr)
+        confidence = self._calculate_pattern_confidence(self.long_term_window)
+
+        matrix_profile = self.matrix_profile_cache or {}
 
         return PatternRecognition(
             short_term_trend=short_term_trend,
             long_term_trend=long_term_trend,
             periodicity_detected=periodicity,
             period_length_seconds=period,
-            pattern_confidence=confidence
+            periodicity_confidence=periodicity_confidence,
+            pattern_confidence=confidence,
+            motif_distance=matrix_profile.get('motif_distance'),
+            discord_detected=matrix_profile.get('discord_detected', False),
+            discord_score=matrix_profile.get('latest_distance')
         )
 
-    def _calculate_trend_description(self, values: list) -> str:
-        """Calculate descriptive trend from values"""
-        if len(values) < 2:
+    def _detect_change_points(self) -> List[ChangePointEvent]:
+        """
+        Run the per-channel change detectors on the 1 s means that just closed
+
+        Returns:
+            ChangePointEvent list (usually empty); events are also kept in
+            `recent_change_points` for later queries
+        """
+        closed = self.rollups.last_closed('1s')
+        if closed is None:
+            return []
+
+        events = [
+            ChangePointEvent(
+                channel=change['channel'],
+                direction=change['direction'],
+                onset=to_datetime(change['onset_ms']),
+                detected_at=to_datetime(change['detected_ms']),
+                previous_mean=round(change['previous_mean'], 2),
+                current_mean=round(change['current_mean'], 2)
+            )
+            for change in self.change_monitor.update(*closed)
+        ]
+        self.recent_change_points.extend(events)
+        return events
+
+    def _update_matrix_profile(self):
+        """
+        Append the 1 s heart rate mean that just closed to the matrix profile
+
+        The STAMPI update is O(history) once per second; the motif/discord
+        summary is cached for the per-sample path.
+        """
+        closed = self.rollups.last_closed('1s')
+        if closed is None:
+            return
+
+        self.live_matrix_profile.append(closed[1][self.rollups.channel_index['heart_rate']])
+        summary = self.live_matrix_profile.summary()
+        if summary is None:
+            return
+
+        latest = summary['latest_distance']
+        summary['discord_detected'] = bool(
+            latest is not None
+            and latest > max(
+                summary['profile_mean'] + self.discord_sigma * summary['profile_std'],
+                self.discord_min_distance
+            )
+        )
+        self.matrix_profile_cache = {
+            key: round(value, 3) if isinstance(value, float) else value
+            for key, value in summary.items()
+        }
+
+    def _calculate_trend_description(self, window: RunningTrendWindow) -> str:
+        """Calculate descriptive trend from a running trend window"""
+        if len(window) < 2:
             return "Stable"
 
-        x = np.arange(len(values))
-        coefficients = np.polyfit(x, values, 1)
-        slope = coefficients[0]
+        slope = window.slope
 
         if slope > 0.2:
             return "Rising"
@@ -270,28 +566,113 @@ class TimesystemsLayer:
         else:
             return "Stable"
 
-    def _detect_periodicity(self, values: list) -> tuple[bool, Optional[float]]:
+    def _calculate_rollup_trend(self) -> Optional[str]:
+        """
+        Describe the long-term heart rate trend from 1-minute rollups
+
+        Fits at most `long_term_minutes` pre-aggregated points instead of raw
+        samples; returns None until enough minutes have been observed.
         """
-        Detect periodicity in signal using autocorrelation
+        series = self.rollups.series('1m', 'heart_rate', include_open=False)
+        starts = series['start_ms'][-self.long_term_minutes:]
+        if len(starts) < self.long_term_min_buckets:
+            return None
+
+        minutes = (starts - starts[0]) / 60000.0
+        slope = np.polyfit(minutes, series['mean'][-self.long_term_minutes:], 1)[0]
+
+        if slope > self.long_term_slope_threshold:
+            return "Rising"
+        elif slope < -self.long_term_slope_threshold:
+            return "Declining"
+        else:
+            return "Stable"
+
+    def _detect_periodicity(self) -> tuple[bool, Optional[float], float]:
+        """
+        Detect periodicity in heart rate, recomputed at a low cadence
+
+        The full autocorrelation only runs every `periodicity_interval`
+        samples; in between the cached result is returned.
 
         Returns:
-            (periodicity_detected, period_in_seconds)
+            (periodicity_detected, period_in_seconds, confidence)
+        """
+        self.samples_since_periodicity += 1
+        if (self.periodicity_cache is not None
+                and self.samples_since_periodicity < self.periodicity_interval):
+            return self.periodicity_cache
+
+        self.samples_since_periodicity = 0
+        self.periodicity_cache = self._autocorrelation_periodicity(
+            self.temporal_buffer.column('heart_rate'),
+            self.temporal_buffer.timestamps()
+        )
+        return self.periodicity_cache
+
+    def _autocorrelation_periodicity(
+        self, values: np.ndarray, timestamps_ms: np.ndarray
+    ) -> tuple[bool, Optional[float], float]:
+        """
+        Detect periodicity using FFT-based autocorrelation (O(n log n))
+
+        - ACF = IFFT(|FFT(x)|²) on the mean-removed, zero-padded signal
+        - Skip the zero-lag lobe (up to the first negative ACF value)
+        - Pick the highest local maximum up to half the window length
+        - Refine the lag with parabolic interpolation
+
+        The normalised ACF value at the chosen peak is the confidence.
         """
-        if len(values) < 50:
-            return False, None
+        n = len(values)
+        if n < 50:
+            return False, None, 0.0
+
+        signal = values.astype(np.float64) - np.mean(values)
+        if not np.any(signal):
+            return False, None, 0.0
+
+        n_fft = 1 << (2 * n - 1).bit_length()
+        spectrum = np.fft.rfft(signal, n_fft)
+        acf = np.fft.irfft(spectrum * np.conj(spectrum), n_fft)[:n]
+        acf /= acf[0]
 
-        # Simulate periodicity detection
-        # Real implementation would use autocorrelation
-        periodicity_detected = random.random() > 0.6
+        max_lag = n // 2
+        negative = np.flatnonzero(acf[:max_lag] < 0)
+        if len(negative) == 0:
+            return False, None, 0.0
 
-        if periodicity_detected:
-            # Typical respiratory rhythm: 15 breaths/min = 4 second period
-            period = random.uniform(3.0, 6.0)
-            return True, round(period, 1)
+        search = acf[negative[0]:max_lag]
+        if len(search) < 3:
+            return False, None, 0.0
 
-        return False, None
+        is_peak = (search[1:-1] > search[:-2]) & (search[1:-1] >= search[2:])
+        peaks = np.flatnonzero(is_peak) + 1
+        if len(peaks) == 0:
+            return False, None, 0.0
 
-    def _calculate_pattern_confidence(self, values: list) -> float:
+        best = peaks[np.argmax(search[peaks])]
+        confidence = float(np.clip(search[best], 0.0, 1.0))
+        lag = negative[0] + best
+
+        # Parabolic interpolation around the peak for sub-sample precision
+        left, centre, right = acf[lag - 1], acf[lag], acf[lag + 1]
+        curvature = left - 2 * centre + right
+        offset = 0.5 * (left - right) / curvature if curvature != 0 else 0.0
+
+        # Sample interval from actual timestamps (fall back to 10Hz)
+        intervals = np.diff(timestamps_ms)
+        sample_interval = float(np.median(intervals)) / 1000.0 if len(intervals) else 0.1
+        if sample_interval <= 0:
+            sample_interval = 0.1
+
+        period = (lag + offset) * sample_interval
+
+        if confidence < self.periodicity_threshold:
+            return False, None, round(confidence, 2)
+
+        return True, round(float(period), 1), round(confidence, 2)
+
+    def _calculate_pattern_confidence(self, window: RunningTrendWindow) -> float:
         """
         Calculate confidence in pattern recognition
 
@@ -300,14 +681,14 @@ class TimesystemsLayer:
         - Signal consistency
         - Pattern clarity
         """
-        if len(values) < 10:
+        if len(window) < 10:
             return 0.3
 
         # More data = higher confidence
-        data_confidence = min(1.0, len(values) / 100)
+        data_confidence = min(1.0, len(window) / 100)
 
         # Lower variance = higher confidence
-        normalized_std = np.std(values) / max(np.mean(values), 1)
+        normalized_std = window.std / max(window.mean, 1)
         consistency_confidence = max(0.3, 1.0 - normalized_std)
 
         overall_confidence = (data_confidence + consistency_confidence) / 2
@@ -323,11 +704,9 @@ class TimesystemsLayer:
         if len(self.temporal_buffer) < 10:
             return 0.75
 
-        hr_values = [s['data']['heart_rate'] for s in self.temporal_buffer[-50:]]
-
-        # Calculate coefficient of variation
-        mean_hr = np.mean(hr_values)
-        std_hr = np.std(hr_values)
+        # Calculate coefficient of variation (running stats over 50 samples)
+        mean_hr = self.consistency_window.mean
+        std_hr = self.consistency_window.std
 
         if mean_hr == 0:
             return 0.5
@@ -341,12 +720,17 @@ class TimesystemsLayer:
         return round(float(consistency), 2)
 
     def _assess_circadian_alignment(
-        self, heart_rate: float, phase: CircadianPhase
+        self, heart_rate: float, temperature: float,
+        phase: CircadianPhase, local_hour: float
     ) -> CircadianAlignment:
         """
         Assess how well current physiology aligns with circadian expectations
+
+        Uses the personal cosinor model when fitted (expected values at the
+        exact hour, phase shift from the fitted acrophase); otherwise the
+        population reference by phase.
         """
-        expected_hr = self.circadian_reference[phase.value]
+        expected_hr = self._expected_heart_rate(phase, local_hour)
 
         # Calculate alignment score
         deviation = abs(heart_rate - expected_hr)
@@ -355,6 +739,23 @@ class TimesystemsLayer:
         alignment_score = max(0.0, 1.0 - (deviation / max_acceptable_deviation))
         alignment_score = min(1.0, alignment_score)
 
+        parameters = self.circadian_parameters_cache
+        if parameters is not None:
+            # Fitted acrophase vs reference peak
+            phase_shift = self._personal_phase_shift_hours() * 60
+            return CircadianAlignment(
+                expected_heart_rate=expected_hr,
+                actual_heart_rate=heart_rate,
+                alignment_score=round(alignment_score, 2),
+                phase_shift_minutes=round(phase_shift, 1),
+                personalized=True,
+                expected_temperature=round(
+                    self.circadian_model.expected(local_hour, 'temperature'), 2
+                ),
+                heart_rate_amplitude=parameters['heart_rate']['amplitude'],
+                acrophase_hour=parameters['heart_rate']['acrophase_hour'] % 24
+            )
+
         # Calculate phase shift
         if heart_rate > expected_hr:
             phase_shift = (heart_rate - expected_hr) * 2  # Rough estimate in minutes
@@ -389,21 +790,29 @@ class TimesystemsLayer:
 
         return round(rhythm_score, 1)
 
-    def _synchronize_signals(self, data: BiosignalData) -> BiosignalData:
+    def _assess_staleness(self, alignment: Optional[Dict]) -> Tuple[Dict[str, float], List[str]]:
         """
-        Apply temporal synchronization to signals
+        Seconds since each channel's last real reading, and the stale ones
 
-        In real implementation:
-        - Align signals to same time base
-        - Compensate for sensor timing differences
-        - Apply phase correction
+        A channel is stale when it has missed several nominal sample periods
+        (e.g. temperature sensor silent for > 3 s at 1 Hz).
         """
-        # For simulation, return data as-is
-        # Real implementation would apply sophisticated timing corrections
-        return data
+        if alignment is None:
+            return {}, []
+
+        staleness = {}
+        stale = []
+        for channel, age_ms in alignment['age_ms'].items():
+            if np.isfinite(age_ms):
+                staleness[channel] = round(age_ms / 1000.0, 1)
+            if age_ms > self.aligner.stale_after_ms(channel):
+                stale.append(channel)
+
+        return staleness, stale
 
     def _generate_processing_notes(
-        self, pattern: PatternType, phase: CircadianPhase, rhythm_score: float
+        self, pattern: PatternType, phase: CircadianPhase, rhythm_score: float,
+        change_points: List[ChangePointEvent]
     ) -> str:
         """Generate human-readable processing notes"""
         notes = []
@@ -413,5 +822,7 @@ class TimesystemsLayer:
         notes.append(f"Rhythm Score: {rhythm_score:.1f}/100")
         notes.append("Temporal window: 60s")
         notes.append("Circadian alignment assessed")
+        for event in change_points:
+            notes.append(f"Change point: {event.channel} {event.direction.value}")
 
         return " | ".join(notes)
@@ -1,2 +1,5 @@
 """Utilities package"""
 from .logger import setup_logger, get_processing_logger
+from .ring_buffer import ColumnarRingBuffer
+from .running_stats import RunningTrendWindow
+from .timebase import local_hour_of_day, now_ms, server_utc_offset_minutes
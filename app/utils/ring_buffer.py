@@ -0,0 +1,77 @@
+"""
+Columnar ring buffer for fixed-rate biosignal history
+"""
+
+import numpy as np
+from typing import Optional, Sequence
+
+
+class ColumnarRingBuffer:
+    """
+    Fixed-capacity ring buffer storing samples column-wise
+
+    Layout:
+    - int64 epoch-millisecond timestamps
+    - one float32 column per channel
+
+    Every sample is written twice (at `head` and `head + capacity`), so the
+    most recent `n` samples always occupy one contiguous slice. Reads are
+    therefore zero-copy views, never concatenations or list rebuilds.
+    """
+
+    def __init__(self, capacity: int, channels: Sequence[str], dtype=np.float32):
+        self.capacity = capacity
+        self.channels = tuple(channels)
+        self.channel_index = {name: i for i, name in enumerate(self.channels)}
+
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._columns = np.zeros((len(self.channels), 2 * capacity), dtype=dtype)
+        self._head = 0  # Next write position in [0, capacity)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp_ms: int, values: Sequence[float]):
+        """
+        Append one sample
+
+        Args:
+            timestamp_ms: Sample time as epoch milliseconds
+            values: Channel values in `channels` order
+        """
+        mirror = self._head + self.capacity
+
+        self._timestamps[self._head] = timestamp_ms
+        self._timestamps[mirror] = timestamp_ms
+        self._columns[:, self._head] = values
+        self._columns[:, mirror] = values
+
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def timestamps(self, n: Optional[int] = None) -> np.ndarray:
+        """Read-only view of the last `n` timestamps (all if None), oldest first"""
+        return self._window(self._timestamps, n)
+
+    def column(self, channel: str, n: Optional[int] = None) -> np.ndarray:
+        """Read-only view of the last `n` values of a channel, oldest first"""
+        return self._window(self._columns[self.channel_index[channel]], n)
+
+    def latest(self, channel: str) -> Optional[float]:
+        """Most recent value of a channel"""
+        if self._size == 0:
+            return None
+        return float(self._columns[self.channel_index[channel], self._head + self.capacity - 1])
+
+    def clear(self):
+        """Drop all samples"""
+        self._head = 0
+        self._size = 0
+
+    def _window(self, storage: np.ndarray, n: Optional[int]) -> np.ndarray:
+        n = self._size if n is None else max(0, min(n, self._size))
+        end = self._head + self.capacity
+        view = storage[end - n:end]
+        view.flags.writeable = False
+        return view
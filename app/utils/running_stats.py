@@ -0,0 +1,101 @@
+"""
+Windowed running statistics with O(1) updates
+"""
+
+import numpy as np
+
+
+class RunningTrendWindow:
+    """
+    Sliding-window least-squares trend and variance
+
+    Maintains Σy, Σy² and Σxy over the last `size` samples, with x being the
+    sample position inside the window (0 = oldest). Σx and Σx² depend only
+    on the window length, so slope, mean and variance update in O(1) per
+    sample. Sums are recomputed from the stored window once per `size`
+    samples to keep floating-point drift bounded.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = np.zeros(size, dtype=np.float64)
+        self.head = 0  # Position of the oldest sample once the window is full
+        self.count = 0
+        self.pushes_since_resync = 0
+
+        self.sum_y = 0.0
+        self.sum_y2 = 0.0
+        self.sum_xy = 0.0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def push(self, y: float):
+        """Add a sample, evicting the oldest one when the window is full"""
+        y = float(y)
+
+        if self.count < self.size:
+            self.values[self.count] = y
+            self.sum_xy += self.count * y
+            self.sum_y += y
+            self.sum_y2 += y * y
+            self.count += 1
+        else:
+            oldest = self.values[self.head]
+            self.values[self.head] = y
+            self.head = (self.head + 1) % self.size
+
+            # Every remaining sample shifts one position left: Σxy -= Σy_remaining
+            self.sum_xy += (self.size - 1) * y - (self.sum_y - oldest)
+            self.sum_y += y - oldest
+            self.sum_y2 += y * y - oldest * oldest
+
+        self.pushes_since_resync += 1
+        if self.pushes_since_resync >= self.size:
+            self._resync()
+
+    @property
+    def mean(self) -> float:
+        return self.sum_y / self.count if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        """Population variance (matches np.var)"""
+        if self.count == 0:
+            return 0.0
+        mean = self.sum_y / self.count
+        return max(0.0, self.sum_y2 / self.count - mean * mean)
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation (matches np.std)"""
+        return float(np.sqrt(self.variance))
+
+    @property
+    def slope(self) -> float:
+        """Least-squares slope per sample (matches np.polyfit(x, y, 1)[0])"""
+        n = self.count
+        if n < 2:
+            return 0.0
+
+        sum_x = n * (n - 1) / 2.0
+        sum_x2 = (n - 1) * n * (2 * n - 1) / 6.0
+        denominator = n * sum_x2 - sum_x * sum_x
+
+        return (n * self.sum_xy - sum_x * self.sum_y) / denominator
+
+    def window(self) -> np.ndarray:
+        """Copy of the current window, oldest first"""
+        if self.count < self.size:
+            return self.values[:self.count].copy()
+        return np.roll(self.values, -self.head)
+
+    def _resync(self):
+        """Recompute the running sums exactly from the stored window"""
+        y = self.window()
+        x = np.arange(len(y), dtype=np.float64)
+
+        self.sum_y = float(np.sum(y))
+        self.sum_y2 = float(np.dot(y, y))
+        self.sum_xy = float(np.dot(x, y))
+        self.pushes_since_resync = 0
@@ -0,0 +1,47 @@
+"""
+Epoch-millisecond time helpers vectorized over int64 blocks
+"""
+
+import time
+import numpy as np
+from datetime import datetime, timezone
+from typing import Union
+
+MS_PER_MINUTE = 60 * 1000
+MS_PER_HOUR = 60 * MS_PER_MINUTE
+MS_PER_DAY = 24 * MS_PER_HOUR
+
+ArrayLike = Union[int, np.ndarray]
+
+
+def now_ms() -> int:
+    """Current UTC epoch time in milliseconds"""
+    return time.time_ns() // 1_000_000
+
+
+def server_utc_offset_minutes() -> int:
+    """UTC offset of the server's local timezone right now"""
+    return int(datetime.now().astimezone().utcoffset().total_seconds() // 60)
+
+
+def local_hour_of_day(timestamps_ms: ArrayLike, utc_offset_minutes: int) -> np.ndarray:
+    """
+    Fractional local hour of day [0, 24) for UTC epoch-ms timestamps
+
+    Pure integer arithmetic on int64, so a whole block of samples is
+    converted with one vector operation and no datetime objects.
+    """
+    local_ms = np.asarray(timestamps_ms, dtype=np.int64) + utc_offset_minutes * MS_PER_MINUTE
+    return (local_ms % MS_PER_DAY) / MS_PER_HOUR
+
+
+def to_datetime(timestamp_ms: int) -> datetime:
+    """UTC-aware datetime for an epoch-ms timestamp"""
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+
+
+def to_ms(value: datetime) -> int:
+    """UTC epoch milliseconds for a datetime (naive values are taken as UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
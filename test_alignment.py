@@ -0,0 +1,42 @@
+"""
+Test Timesystems™ alignment of partial (multi-rate) samples into complete ones
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from app.models.schemas import BiosignalData, BiosignalSample
+from app.services.timesystems import TimesystemsLayer
+
+
+def test_live_sample_without_slow_channels_is_completed():
+    timesystems = TimesystemsLayer()
+    timesystems.synchronize_signals(
+        BiosignalSample(heart_rate=70.0, spo2=97.0, temperature=36.6, activity=5.0, timestamp_ms=1_000)
+    )
+
+    aligned, alignment = timesystems.synchronize_signals(
+        BiosignalSample(heart_rate=72.0, activity=6.0, timestamp_ms=1_100)
+    )
+
+    assert isinstance(aligned, BiosignalData)
+    assert (aligned.spo2, aligned.temperature) == (97.0, 36.6)
+    assert set(alignment['fresh']) == {'heart_rate', 'activity'}
+
+
+def test_batch_sample_without_slow_channels_is_completed():
+    samples = [
+        BiosignalSample(heart_rate=70.0, spo2=96.0, temperature=36.5, activity=5.0, timestamp_ms=0),
+        BiosignalSample(heart_rate=71.0, activity=5.0, timestamp_ms=500),
+        BiosignalSample(heart_rate=72.0, spo2=98.0, temperature=36.7, activity=5.0, timestamp_ms=1_000)
+    ]
+
+    aligned = [sample for sample, _ in TimesystemsLayer().synchronize_block(samples)]
+
+    assert aligned[1].spo2 == 97.0
+    assert aligned[1].temperature == 36.6
+
+
+def test_complete_sample_requires_every_channel():
+    with pytest.raises(ValidationError):
+        BiosignalData(heart_rate=70.0, activity=5.0)
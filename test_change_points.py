@@ -0,0 +1,78 @@
+"""
+Test online change-point detection (Page-Hinkley) and change_point events
+"""
+
+import numpy as np
+import pytest
+
+from app.main import bus_events, to_lia_event
+from app.models.schemas import ChangeDirection, ChangePointEvent, LIAEventType
+from app.services.change_points import ChangePointMonitor, PageHinkleyDetector
+from app.utils.timebase import to_datetime
+
+
+def _run(detector: PageHinkleyDetector, values):
+    changes = []
+    for second, value in enumerate(values):
+        change = detector.update(float(value), second * 1000)
+        if change is not None:
+            changes.append(change)
+    return changes
+
+
+def test_step_up_is_detected_with_its_onset():
+    noise = np.random.default_rng(0).normal(0, 1, 240)
+    heart_rate = 65 + noise + np.where(np.arange(240) >= 120, 15, 0)
+
+    changes = _run(PageHinkleyDetector(delta=1.0, threshold=40.0), heart_rate)
+
+    assert len(changes) == 1
+    change = changes[0]
+    assert change['direction'] == 'increase'
+    assert change['onset_ms'] == pytest.approx(120_000, abs=3_000)
+    assert 120_000 < change['detected_ms'] <= 130_000
+    assert change['previous_mean'] == pytest.approx(65, abs=0.5)
+    # Averaged over the few samples between onset and detection
+    assert change['current_mean'] == pytest.approx(80, abs=4)
+
+
+def test_step_down_is_detected():
+    spo2 = 98 + np.random.default_rng(1).normal(0, 0.3, 200) - np.where(np.arange(200) >= 100, 4, 0)
+
+    changes = _run(PageHinkleyDetector(delta=0.5, threshold=8.0), spo2)
+
+    assert [change['direction'] for change in changes] == ['decrease']
+
+
+def test_noise_alone_raises_no_alarm():
+    heart_rate = 70 + np.random.default_rng(2).normal(0, 2, 3600)
+
+    assert _run(PageHinkleyDetector(delta=1.0, threshold=40.0), heart_rate) == []
+
+
+def test_monitor_reports_the_channel():
+    monitor = ChangePointMonitor(('heart_rate', 'spo2'))
+    changes = []
+    for second in range(200):
+        changes += monitor.update(second * 1000, (70.0 + (20 if second >= 100 else 0), 98.0))
+
+    assert [(change['channel'], change['direction']) for change in changes] == [('heart_rate', 'increase')]
+
+
+def test_change_points_are_published_as_typed_events():
+    change_point = ChangePointEvent(
+        channel='heart_rate', direction=ChangeDirection.INCREASE,
+        onset=to_datetime(120_000), detected_at=to_datetime(126_000),
+        previous_mean=65.0, current_mean=80.0
+    )
+    lia_event = {'type': 'risk_raised', 'timestamp_ms': 126_000, 'risk_factor': 'Elevated heart rate', 'confidence': 0.9}
+    results = {'timesystems': {'change_points': [change_point]}, 'lia': {'events': [lia_event]}}
+
+    events = bus_events(results)
+
+    assert [event['type'] for event in events] == ['change_point', 'risk_raised']
+    event = to_lia_event({**events[0], 'event_id': 1, 'device_id': 'device'})
+    assert event.type == LIAEventType.CHANGE_POINT
+    assert (event.channel, event.direction) == ('heart_rate', ChangeDirection.INCREASE)
+    assert (event.onset, event.timestamp) == (change_point.onset, change_point.detected_at)
+    assert (event.previous_mean, event.current_mean, event.confidence) == (65.0, 80.0, None)
@@ -0,0 +1,67 @@
+"""
+Test the LIA chat response cache (question normalization, vitals quantization, TTL)
+"""
+
+import pytest
+
+from app.main import generate_mockup_stream_data
+from app.services import chat_cache
+from app.services.chat_cache import ChatResponseCache, TTLCache, normalize_question
+
+
+def _with_vitals(**values):
+    """Mockup frame (heart rate 75, SpO2 98, 36.8 °C) with some raw signals replaced"""
+    frame = generate_mockup_stream_data()
+    return frame.model_copy(update={"raw_signals": frame.raw_signals.model_copy(update=values)})
+
+
+def test_question_normalization():
+    assert normalize_question("Hey LIA, what's my HR right now?") == "what s my heart rate"
+    assert normalize_question("what's my pulse") == normalize_question("What's my HR?")
+
+
+def test_key_quantizes_only_the_vitals_the_question_is_about():
+    cache = ChatResponseCache()
+
+    def key(**values):
+        return cache.key("What is my heart rate?", _with_vitals(**values), True, False)
+
+    # Same 5 BPM bucket, unrelated vitals moved
+    assert key(heart_rate=76.0, temperature=37.4) == key(heart_rate=79.9)
+    # Next bucket
+    assert key(heart_rate=80.0) != key(heart_rate=79.9)
+
+
+def test_follow_up_is_not_cached_once_there_is_history():
+    cache = ChatResponseCache()
+    frame = generate_mockup_stream_data()
+
+    assert cache.key("Why is that?", frame, True, has_history=True) is None
+    assert cache.key("Why is that?", frame, True, has_history=False) is not None
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(chat_cache.time, "monotonic", lambda: now[0])
+    cache = TTLCache(max_entries=10, ttl_seconds=60.0)
+    cache.set("key", "answer")
+
+    now[0] += 59.0
+    assert cache.get("key") == "answer"
+    now[0] += 1.0
+    assert cache.get("key") is None
+    assert len(cache) == 0
+    assert cache.stats()["hit_rate"] == pytest.approx(0.5)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_entries=2, ttl_seconds=60.0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.evictions == 1
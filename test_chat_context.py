@@ -0,0 +1,61 @@
+"""
+Test token-budgeted LIA chat prompts (history summary, context sections)
+"""
+
+from app.services.chat_context import ChatContextManager, relevant_sections
+
+MODEL = "gpt-4o-mini"
+
+
+def _history(turns: int):
+    history = []
+    for turn in range(turns):
+        history.append({"role": "user", "content": f"Question {turn} about my heart rate today?"})
+        history.append({"role": "assistant", "content": f"Answer {turn}. " + "Details follow. " * 20})
+    return history
+
+
+def test_long_history_is_folded_into_a_summary_within_budget():
+    manager = ChatContextManager(MODEL, max_prompt_tokens=600, summary_tokens=100)
+
+    messages = manager.build("You are LIA.", "And now?", history=_history(30))
+
+    assert manager.counter.count_messages(messages) <= 600
+    summary = messages[1]["content"]
+    assert summary.startswith("Summary of the earlier conversation:")
+    # The newest folded turns survive summary trimming, the oldest are dropped
+    assert "Question 0 " not in summary
+    kept = [message for message in messages if message["role"] in ("user", "assistant")]
+    assert kept[0]["role"] == "user"
+    oldest_kept = int(kept[0]["content"].split()[1])
+    assert f"Question {oldest_kept - 1} " in summary
+    assert messages[-1] == {"role": "user", "content": "And now?"}
+
+
+def test_summary_keeps_its_newest_lines_under_the_cap():
+    manager = ChatContextManager(MODEL, summary_tokens=60)
+
+    summary = manager.fold("", _history(10))
+
+    assert manager.counter.count(summary) <= 60
+    lines = summary.splitlines()
+    assert lines[-1].startswith("- User asked: Question 9 about my heart rate today? | LIA: Answer 9.")
+    assert len(lines) < 10
+
+
+def test_optional_context_sections_are_dropped_last_first():
+    manager = ChatContextManager(MODEL, max_prompt_tokens=200, summary_tokens=50)
+    sections = {"raw": "Raw signals. " * 10, "lia": "LIA insights. " * 10, "clarity": "Quality. " * 200}
+
+    messages = manager.build("You are LIA.", "How am I?", context_header="CURRENT DATA:", context_sections=sections)
+
+    context = messages[-2]["content"]
+    assert context.startswith("CURRENT DATA:")
+    assert "LIA insights." in context and "Quality." not in context
+    assert manager.counter.count_messages(messages) <= 200
+
+
+def test_sections_follow_the_question_topics():
+    assert relevant_sections("How is my HRV?") == ["raw", "lia", "ifrs"]
+    assert relevant_sections("Is the sensor accurate?") == ["raw", "lia", "clarity"]
+    assert relevant_sections("How am I doing?") == ["raw", "lia", "ifrs", "timesystems", "clarity"]
@@ -0,0 +1,51 @@
+"""
+Test the LIA chat intent fast path (direct metric lookups answered locally)
+"""
+
+import asyncio
+
+import pytest
+
+from app.main import generate_mockup_stream_data
+from app.services.chat_intents import IntentRouter
+from app.services.lia_chat import LIAChatEngine
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """Chat engine without an LLM provider (no OpenAI API key)"""
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("LIA_CHAT_PROVIDER", raising=False)
+    monkeypatch.setenv("LIA_CHAT_PERSIST", "0")
+    return LIAChatEngine()
+
+
+def test_router_matches_direct_lookups_only():
+    router = IntentRouter()
+
+    assert router.match("What's my heart rate?") == ["heart_rate"]
+    assert router.match("my pulse and SpO2 now") == ["heart_rate", "spo2"]
+    assert router.match("HRV") == ["hrv"]
+    # Explanations and definitions need the model
+    assert router.match("Why is my heart rate high?") == []
+    assert router.match("What is HRV?") == []
+
+
+def test_lookup_is_answered_without_a_provider(engine):
+    assert engine.provider is None
+
+    result = asyncio.run(engine.chat("What's my heart rate?", generate_mockup_stream_data()))
+
+    assert result["success"]
+    assert result["model"] == IntentRouter.MODEL
+    assert result["intents"] == ["heart_rate"]
+    assert result["tokens_used"] == 0
+    assert "75" in result["response"]
+
+
+def test_question_needing_the_model_is_unavailable_without_a_provider(engine):
+    result = asyncio.run(engine.chat("Why is my heart rate high?", generate_mockup_stream_data()))
+
+    assert not result["success"]
+    assert result["status_code"] == 503
+    assert result["retry_after"] is None
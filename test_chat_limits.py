@@ -0,0 +1,121 @@
+"""
+Test LIA chat admission control (rate limiter, circuit breaker, request coalescer)
+"""
+
+import asyncio
+
+import pytest
+
+from app.services import chat_limits
+from app.services.chat_limits import (
+    CircuitBreaker, ProviderUnavailable, RateLimited, RateLimiter, RequestCoalescer
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Manually advanced replacement for time.monotonic in chat_limits"""
+    now = [1000.0]
+    monkeypatch.setattr(chat_limits.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_token_bucket_is_per_client(clock):
+    limiter = RateLimiter(rate_per_minute=60.0, burst=2)
+
+    limiter.acquire("alice")
+    limiter.acquire("alice")
+    with pytest.raises(RateLimited) as exc_info:
+        limiter.acquire("alice")
+    assert exc_info.value.retry_after == pytest.approx(1.0)
+
+    # Another client has its own bucket
+    limiter.acquire("bob")
+
+    # One token per second refills
+    clock[0] += 1.0
+    limiter.acquire("alice")
+    with pytest.raises(RateLimited):
+        limiter.acquire("alice")
+
+
+def test_breaker_opens_then_half_opens_then_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30.0)
+
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(ProviderUnavailable) as exc_info:
+        breaker.allow()
+    assert exc_info.value.retry_after == pytest.approx(30.0)
+
+    clock[0] += 30.0
+    assert breaker.state == "half_open"
+    breaker.allow()  # The single trial request
+    with pytest.raises(ProviderUnavailable):
+        breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.allow()
+
+
+def test_failed_trial_reopens_the_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0)
+    breaker.record_failure()
+    clock[0] += 10.0
+
+    breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+
+
+def test_coalescer_fans_one_call_out_to_identical_requests():
+    async def scenario():
+        coalescer = RequestCoalescer()
+        calls = 0
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "answer"
+
+        results = await asyncio.gather(*(coalescer.run("key", call) for _ in range(5)))
+        return results, calls, coalescer
+
+    results, calls, coalescer = asyncio.run(scenario())
+
+    assert results == ["answer"] * 5
+    assert calls == 1
+    assert coalescer.coalesced == 4
+    assert not coalescer.inflight
+
+
+def test_coalescer_reruns_for_waiters_when_the_leader_is_cancelled():
+    async def scenario():
+        coalescer = RequestCoalescer()
+        calls = 0
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return calls
+
+        leader = asyncio.create_task(coalescer.run("key", call))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(coalescer.run("key", call)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        results = await asyncio.gather(*waiters)
+        return leader, results, calls
+
+    leader, results, calls = asyncio.run(scenario())
+
+    assert leader.cancelled()
+    assert results == [2, 2]  # One re-run, shared by both waiters
+    assert calls == 2
@@ -0,0 +1,75 @@
+"""
+Test LIA chat tools over a device's Timesystems™ rollups
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.services.chat_tools import ChatToolbox, _parse_time, _resolution_for
+from app.services.pipeline import PipelineRunner
+from app.utils.timebase import now_ms, to_datetime
+
+MINUTE_MS = 60 * 1000
+
+
+def _runner_with_history(hours: float):
+    """Inline pipeline whose device has one sample per second over the last `hours`"""
+    runner = PipelineRunner(mode='inline')
+    runner.register("device")
+    rollups = runner.get_pipeline("device").timesystems.rollups
+    now = now_ms()
+    for timestamp_ms in range(now - int(hours * 60 * MINUTE_MS), now, 1000):
+        rollups.add(timestamp_ms, (70.0, 98.0, 36.8, 10.0))
+    return runner, now
+
+
+def _call(toolbox: ChatToolbox, name: str, **arguments):
+    return json.loads(asyncio.run(toolbox.call(name, json.dumps(arguments))))
+
+
+def test_resolution_follows_the_age_of_the_range():
+    now = now_ms()
+
+    assert _resolution_for(now - 5 * MINUTE_MS, now) == "1s"
+    assert _resolution_for(now - 3 * 60 * MINUTE_MS, now) == "1m"
+    assert _resolution_for(now - 3 * 24 * 60 * MINUTE_MS, now) == "1h"
+    assert _resolution_for(now - 90 * 24 * 60 * MINUTE_MS, now) == "1d"
+
+
+def test_short_range_in_the_past_is_read_from_a_retained_level():
+    runner, now = _runner_with_history(hours=3)
+    toolbox = ChatToolbox(runner, "device")
+    start = to_datetime(now - 170 * MINUTE_MS).replace(second=0, microsecond=0)
+    end = start.timestamp() * 1000 + 5 * MINUTE_MS
+
+    result = _call(
+        toolbox, "get_rollups",
+        start=start.isoformat(), end=to_datetime(int(end)).isoformat(), channel="heart_rate"
+    )
+
+    assert result["resolution"] == "1m"
+    assert result["summary"]["heart_rate"]["count"] == 300
+    assert len(result["series"]) == 5
+
+
+def test_times_without_an_offset_are_in_the_wearers_timezone():
+    wearer = timezone(timedelta(hours=2))
+
+    assert _parse_time("2024-05-01T08:00:00", wearer) == datetime(2024, 5, 1, 6, tzinfo=timezone.utc)
+    assert _parse_time("2024-05-01T08:00:00Z", wearer) == datetime(2024, 5, 1, 8, tzinfo=timezone.utc)
+    assert _parse_time("2024-05-01T08:00:00-05:00", wearer) == datetime(2024, 5, 1, 13, tzinfo=timezone.utc)
+
+
+def test_bad_tool_calls_return_an_error_object():
+    runner, now = _runner_with_history(hours=0.1)
+    toolbox = ChatToolbox(runner, "device")
+    start = to_datetime(now - 5 * MINUTE_MS).isoformat()
+
+    assert "Unknown tool" in json.loads(asyncio.run(toolbox.call("drop_tables", "{}")))["error"]
+    assert "error" in json.loads(asyncio.run(toolbox.call("get_rollups", "{not json")))
+    assert "error" in _call(toolbox, "get_rollups")  # Missing start
+    assert "Unknown channel" in _call(toolbox, "get_rollups", start=start, channel="glucose")["error"]
+    assert "after start" in _call(toolbox, "get_rollups", start=start, end=start)["error"]
+    assert "No current biosignal data" in _call(toolbox, "get_current_vitals")["error"]
+    assert toolbox.calls[0] == "drop_tables"
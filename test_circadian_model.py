@@ -0,0 +1,52 @@
+"""
+Test the per-user cosinor circadian model
+"""
+
+import numpy as np
+import pytest
+
+from app.services.circadian_model import CosinorModel
+
+
+def _rhythm(hour: float, mesor: float, amplitude: float, acrophase_hour: float) -> float:
+    return mesor + amplitude * np.cos(2 * np.pi * (hour - acrophase_hour) / 24)
+
+
+def test_fit_recovers_a_known_rhythm():
+    model = CosinorModel(('heart_rate', 'temperature'))
+    noise = np.random.default_rng(0).normal(0, 0.5, 24 * 7)
+
+    for i, hour in enumerate(np.tile(np.arange(24) + 0.5, 7)):
+        model.update(hour, (
+            _rhythm(hour, 65.0, 8.0, 15.5) + noise[i],
+            _rhythm(hour, 36.8, 0.4, 17.0)
+        ))
+
+    heart_rate = model.parameters('heart_rate')
+    assert heart_rate['mesor'] == pytest.approx(65.0, abs=0.2)
+    assert heart_rate['amplitude'] == pytest.approx(8.0, abs=0.3)
+    assert heart_rate['acrophase_hour'] == pytest.approx(15.5, abs=0.2)
+
+    temperature = model.parameters('temperature')
+    assert temperature['acrophase_hour'] == pytest.approx(17.0, abs=1e-3)
+    assert model.expected(17.0, 'temperature') == pytest.approx(37.2, abs=1e-3)
+
+
+def test_acrophase_wraps_past_midnight():
+    model = CosinorModel(('heart_rate',))
+    for hour in np.arange(24) + 0.5:
+        model.update(hour, (_rhythm(hour, 60.0, 5.0, 23.5),))
+
+    assert model.parameters('heart_rate')['acrophase_hour'] == pytest.approx(23.5, abs=1e-3)
+
+
+def test_fit_waits_for_enough_hours_of_day():
+    model = CosinorModel(('heart_rate',), min_hours=8)
+    for hour in range(7):
+        model.update(hour + 0.5, (70.0,))
+
+    assert not model.is_fitted
+    assert model.expected(12.0, 'heart_rate') is None
+
+    model.update(7.5, (70.0,))
+    assert model.is_fitted
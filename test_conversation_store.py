@@ -0,0 +1,102 @@
+"""
+Test the bounded LIA chat ConversationStore and its write-behind persistence
+"""
+
+import asyncio
+
+import pytest
+
+from app.services import conversation_store
+from app.services.conversation_store import ConversationStore
+
+
+def _messages(count: int):
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """Dict standing in for the chat_conversations table"""
+    rows = {}
+
+    def write(batch):
+        if rows.get("fail"):
+            raise ConnectionError("database unreachable")
+        for session_id, snapshot in batch.items():
+            if snapshot is None:
+                rows.pop(session_id, None)
+            else:
+                rows[session_id] = (list(snapshot[0]), snapshot[1])
+
+    monkeypatch.setattr(ConversationStore, "_read", staticmethod(rows.get))
+    monkeypatch.setattr(ConversationStore, "_write", staticmethod(write))
+    return rows
+
+
+def test_sessions_and_messages_are_bounded(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(conversation_store.time, "monotonic", lambda: now[0])
+    store = ConversationStore(max_sessions=2, max_messages=4, max_message_chars=5, idle_ttl=60.0)
+
+    store.put("a", _messages(10))
+    assert [message["content"] for message in store.history("a")] == ["messa"] * 4
+
+    store.put("b", _messages(2))
+    store.history("a")  # Touch: b becomes least recently used
+    store.put("c", _messages(2))
+    assert set(store.entries) == {"a", "c"}
+
+    now[0] += 61.0
+    assert store.history("a") == []
+    assert store.evictions == 2
+
+
+def test_changes_are_written_behind_on_flush(database):
+    store = ConversationStore(persist=True)
+
+    store.put("a", _messages(2), summary="earlier")
+    assert database == {}
+
+    assert asyncio.run(store.flush()) == 1
+    assert database["a"] == (_messages(2), "earlier")
+    assert asyncio.run(store.flush()) == 0  # Nothing dirty
+
+
+def test_evicted_session_is_flushed_and_reloaded(database):
+    store = ConversationStore(max_sessions=1, persist=True)
+    store.put("a", _messages(2))
+    store.put("b", _messages(4))
+
+    assert "a" not in store.entries
+    asyncio.run(store.flush())
+
+    assert asyncio.run(store.load("a")) == _messages(2)
+    assert database["b"] == (_messages(4), "")
+
+
+def test_clear_deletes_the_persisted_history(database):
+    store = ConversationStore(persist=True)
+    store.put("a", _messages(2))
+    asyncio.run(store.flush())
+
+    store.clear("a")
+    asyncio.run(store.flush())
+
+    assert "a" not in database
+    assert asyncio.run(store.load("a")) == []
+
+
+def test_failed_flush_is_retried(database):
+    store = ConversationStore(persist=True)
+    store.put("a", _messages(2))
+    database["fail"] = True
+
+    assert asyncio.run(store.flush()) == 0
+    assert store.stats()["pending_writes"] == 1
+
+    del database["fail"]
+    assert asyncio.run(store.flush()) == 1
+    assert database["a"] == (_messages(2), "")
@@ -0,0 +1,120 @@
+"""
+Test the LIA event bus (cursors, resume, waiting) and event hysteresis
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.event_bus import EventBus
+from app.services.lia_events import LIAEventDetector
+
+
+def _event(kind: str = 'risk_raised', **fields):
+    return {'type': kind, 'timestamp_ms': 0, 'confidence': 0.9, **fields}
+
+
+def test_ids_increase_across_restarts():
+    async def scenario():
+        before = EventBus()
+        published = await before.publish('device', [_event(), _event()])
+        time.sleep(0.002)
+        return published, EventBus()
+
+    published, restarted = asyncio.run(scenario())
+
+    assert published[1]['event_id'] == published[0]['event_id'] + 1
+    assert restarted.last_event_id > published[-1]['event_id']
+    # A cursor from the previous run is still valid and sees everything new
+    restarted.check_cursor(published[-1]['event_id'])
+
+
+def test_cursor_ahead_of_the_latest_event_is_rejected():
+    bus = EventBus()
+
+    with pytest.raises(ValueError):
+        bus.check_cursor(bus.last_event_id + 1)
+
+
+def test_since_resumes_after_a_cursor_with_filters():
+    async def scenario():
+        bus = EventBus()
+        cursor = bus.last_event_id
+        await bus.publish('a', [_event('condition_changed', condition='Rest'), _event()])
+        await bus.publish('b', [_event()])
+        return bus, cursor
+
+    bus, cursor = asyncio.run(scenario())
+
+    assert [event['device_id'] for event in bus.since(cursor)] == ['a', 'a', 'b']
+    assert [event['type'] for event in bus.since(cursor, device_id='a', types=['risk_raised'])] == ['risk_raised']
+    assert [event['device_id'] for event in bus.since(cursor + 2)] == ['b']
+    assert bus.since(bus.last_event_id) == []
+
+
+def test_retention_drops_the_oldest_events():
+    async def scenario():
+        bus = EventBus(retention=3)
+        cursor = bus.last_event_id
+        await bus.publish('device', [_event(risk_factor=str(i)) for i in range(5)])
+        return bus.since(cursor)
+
+    assert [event['risk_factor'] for event in asyncio.run(scenario())] == ['2', '3', '4']
+
+
+def test_wait_wakes_on_a_matching_publish_and_times_out_empty():
+    async def scenario():
+        bus = EventBus()
+        cursor = bus.last_event_id
+        waiter = asyncio.create_task(bus.wait(cursor, device_id='a', timeout=5.0))
+        await asyncio.sleep(0.01)
+        await bus.publish('b', [_event()])  # Filtered out: keeps waiting
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        await bus.publish('a', [_event()])
+        woken = await asyncio.wait_for(waiter, 1.0)
+
+        with bus.subscription():
+            assert bus.subscribers == 1
+            timed_out = await bus.wait(bus.last_event_id, timeout=0.05)
+        return woken, timed_out, bus.subscribers
+
+    woken, timed_out, subscribers = asyncio.run(scenario())
+
+    assert [event['device_id'] for event in woken] == ['a']
+    assert timed_out == []
+    assert subscribers == 0
+
+
+def test_condition_flicker_does_not_raise_events():
+    detector = LIAEventDetector(confirm_window=10, confirm_fraction=0.8)
+    history = ['Rest'] * 10
+
+    assert detector.update(history, [], 0.9)[0]['type'] == 'condition_changed'
+    events = []
+    for i in range(40):
+        history.append('Stress' if i % 2 else 'Rest')
+        events += detector.update(history[-10:], [], 0.9)
+    assert events == []
+
+    for _ in range(8):
+        history.append('Stress')
+        events += detector.update(history[-10:], [], 0.9, timestamp_ms=1_000)
+    assert [(event['condition'], event['previous_condition']) for event in events] == [('Stress', 'Rest')]
+    assert events[0]['timestamp_ms'] == 1_000
+
+
+def test_risk_hysteresis_is_asymmetric():
+    detector = LIAEventDetector(confirm_window=5, risk_enter=3, risk_exit=5)
+    history = ['Rest'] * 5
+
+    def run(samples, risks):
+        return [event['type'] for _ in range(samples) for event in detector.update(history, risks, 0.9)]
+
+    detector.update(history, [], 0.9)  # Initial condition_changed
+    assert run(2, ['Low SpO2']) == []
+    assert run(1, ['Low SpO2']) == ['risk_raised']
+    assert run(4, []) == []
+    assert run(1, ['Low SpO2']) == []  # Present again: the exit count restarts
+    assert run(5, []) == ['risk_cleared']
@@ -0,0 +1,68 @@
+"""
+Test nonlinear HRV features (Poincaré SD1/SD2, sample entropy, DFA α1) on known series
+"""
+
+import numpy as np
+import pytest
+
+from app.services.hrv_nonlinear import (
+    compute_nonlinear_features, dfa_alpha1, poincare_descriptors, sample_entropy
+)
+
+
+def _brute_force_sample_entropy(rr, m=2, r_factor=0.2):
+    tolerance = r_factor * np.std(rr)
+    templates = len(rr) - m
+
+    def matches(length):
+        vectors = [rr[i:i + length] for i in range(templates)]
+        return sum(
+            np.max(np.abs(vectors[i] - vectors[j])) <= tolerance
+            for i in range(templates) for j in range(i + 1, templates)
+        )
+
+    return -np.log(matches(m + 1) / matches(m))
+
+
+def test_poincare_matches_the_rotated_plot():
+    rr = np.random.default_rng(0).normal(800, 40, 2000)
+
+    sd1, sd2 = poincare_descriptors(rr)
+
+    x, y = rr[:-1], rr[1:]
+    assert sd1 == pytest.approx(np.std((y - x) / np.sqrt(2)), rel=1e-6)
+    assert sd2 == pytest.approx(np.std((y + x) / np.sqrt(2)), rel=0.01)
+
+
+def test_poincare_of_an_alternating_series():
+    sd1, sd2 = poincare_descriptors(np.append(np.tile([800.0, 850.0], 50), 800.0))
+
+    assert sd1 == pytest.approx(50 / np.sqrt(2))
+    assert sd2 == pytest.approx(0.0, abs=1e-6)
+
+
+def test_sample_entropy_matches_brute_force():
+    rr = np.random.default_rng(1).normal(800, 50, 300)
+
+    assert sample_entropy(rr) == pytest.approx(_brute_force_sample_entropy(rr))
+
+
+def test_sample_entropy_of_a_periodic_series_is_zero():
+    assert sample_entropy(np.tile([800.0, 850.0, 820.0], 100)) == pytest.approx(0.0)
+
+
+def test_dfa_alpha1_of_white_and_brown_noise():
+    rng = np.random.default_rng(2)
+
+    white = rng.normal(800, 50, 4096)
+    brown = 800 + np.cumsum(rng.normal(0, 5, 4096))
+
+    # α ≈ 0.5 for uncorrelated and 1.5 for integrated noise (short scales bias white noise up)
+    assert dfa_alpha1(white) == pytest.approx(0.5, abs=0.15)
+    assert dfa_alpha1(brown) == pytest.approx(1.5, abs=0.1)
+
+
+def test_short_series_has_undefined_features():
+    assert compute_nonlinear_features(np.array([800.0, 810.0])) == {
+        'sd1': None, 'sd2': None, 'sample_entropy': None, 'dfa_alpha1': None
+    }
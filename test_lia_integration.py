@@ -0,0 +1,46 @@
+"""
+Test LIA confidence when the rule table and the classifier agree or disagree
+"""
+
+from app.models.schemas import BiosignalData
+from app.services.pipeline import DevicePipeline
+
+
+def _signal_results():
+    """Layer outputs for one resting sample"""
+    pipeline = DevicePipeline("test_device")
+    sample = BiosignalData(heart_rate=68.0, spo2=98.0, temperature=36.7, activity=2.0)
+    aligned, alignment = pipeline.timesystems.synchronize_signals(sample)
+    return pipeline, pipeline._run_signal_layers(aligned, alignment)
+
+
+def _classification(condition, probabilities):
+    return {
+        'condition': condition,
+        'risk_factors': [],
+        'positive_indicators': [],
+        'probabilities': probabilities
+    }
+
+
+def _analyze(condition, probabilities):
+    pipeline, results = _signal_results()
+    return pipeline._run_lia(results, _classification(condition, probabilities))
+
+
+def test_confidence_when_rules_and_classifier_agree():
+    result = _analyze('Normal Resting', {'Normal Resting': 0.8, 'Deep Rest': 0.2})
+
+    assert result['condition'] == 'Normal Resting'
+    assert 0.70 <= result['confidence'] <= 0.99
+
+
+def test_confidence_when_rules_and_classifier_disagree():
+    agreeing = _analyze('Normal Resting', {'Normal Resting': 0.8, 'Intense Exercise': 0.2})
+    disagreeing = _analyze('Intense Exercise', {'Normal Resting': 0.999, 'Intense Exercise': 0.001})
+
+    # The rules' condition is reported, with confidence lowered but not collapsed
+    assert disagreeing['condition'] == 'Intense Exercise'
+    assert disagreeing['probabilities']['Intense Exercise'] == 0.001
+    assert disagreeing['confidence'] < agreeing['confidence']
+    assert disagreeing['confidence'] >= 0.35
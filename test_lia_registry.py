@@ -0,0 +1,88 @@
+"""
+Test the versioned, hot-reloadable LIA model registry
+"""
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app.services.lia_registry import LIAModelRegistry
+
+MODELS_PATH = Path(__file__).parent / "app" / "models" / "lia"
+
+
+@pytest.fixture
+def registry(tmp_path):
+    """Registry over a copy of the shipped models with a second version, v2"""
+    root = tmp_path / "models"
+    shutil.copytree(MODELS_PATH, root)
+    shutil.copytree(root / "v1", root / "v2")
+    _set_rules_version(root / "v2", 2)
+    return LIAModelRegistry(root=root, poll_seconds=0, state_dir=tmp_path / "state")
+
+
+def _set_rules_version(version_path: Path, rules_version):
+    rules_path = version_path / "rules.json"
+    rules = json.loads(rules_path.read_text(encoding="utf-8"))
+    rules["version"] = rules_version
+    rules_path.write_text(json.dumps(rules), encoding="utf-8")
+
+
+def test_activate_and_pin(registry):
+    assert registry.versions() == ["v1", "v2"]
+    assert registry.bundle_for("device").version == "v1"
+
+    registry.activate("v2")
+    registry.pin("canary", "v1")
+
+    assert registry.bundle_for("device").rules.version == 2
+    assert registry.bundle_for("canary").version == "v1"
+    assert json.loads(registry.manifest_path.read_text()) == {"active": "v2", "pins": {"canary": "v1"}}
+    # The shipped default manifest is never rewritten
+    assert json.loads((registry.root / "registry.json").read_text())["active"] == "v1"
+
+    registry.unpin("canary")
+    assert registry.bundle_for("canary").version == "v2"
+
+
+def test_changed_version_files_are_hot_reloaded(registry):
+    before = registry.bundle_for("device")
+
+    _set_rules_version(registry.root / "v1", 7)
+
+    assert registry.check()
+    after = registry.bundle_for("device")
+    assert after is not before
+    assert after.rules.version == 7
+
+
+def test_manifest_edits_by_another_process_are_picked_up(registry):
+    other = LIAModelRegistry(root=registry.root, poll_seconds=0, state_dir=registry.state_dir)
+
+    other.activate("v2")
+
+    assert registry.bundle_for("device").version == "v2"
+
+
+def test_bad_version_leaves_the_current_one_serving(registry):
+    serving = registry.bundle_for("device")
+    (registry.root / "v1" / "rules.json").write_text("{ not json", encoding="utf-8")
+
+    assert not registry.check()
+    assert registry.bundle_for("device") is serving
+    assert not registry.check()  # The failed state is not retried until files change
+
+    (registry.root / "v2" / "recommendations.json").unlink()
+    with pytest.raises(FileNotFoundError):
+        registry.activate("v2")
+    assert registry.active_version == "v1"
+    assert json.loads(registry.manifest_path.read_text())["active"] == "v1"
+
+
+@pytest.mark.parametrize("version", ["v3", "../v1", ""])
+def test_unknown_versions_are_rejected(registry, version):
+    with pytest.raises(KeyError):
+        registry.pin("device", version)
+    assert registry.pins == {}
@@ -0,0 +1,100 @@
+"""
+Test compiling and evaluating declarative LIA rule tables
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.services.lia_rules import LIARuleEngine
+
+RULES_PATH = Path(__file__).parent / "app" / "models" / "lia" / "v1" / "rules.json"
+
+OPERATORS = {
+    '<': np.less, '<=': np.less_equal, '>': np.greater,
+    '>=': np.greater_equal, '==': np.equal, '!=': np.not_equal
+}
+
+
+def _spec(condition_rules, **tables):
+    empty = {"match": "all", "rules": [{"label": "never", "when": [["x", "<", -1e9]]}]}
+    return {
+        "features": {"numeric": ["x", "y"], "categorical": {"mode": ["rest", "run"]}},
+        "condition": {"match": "first", "default": "Default", "rules": condition_rules},
+        "risk_factors": tables.get("risk_factors", empty),
+        "positive_indicators": tables.get("positive_indicators", empty)
+    }
+
+
+def test_first_matching_rule_wins_in_table_order():
+    engine = LIARuleEngine(_spec([
+        {"label": "High", "when": [["x", ">", 10]]},
+        {"label": "High and running", "when": [["x", ">", 10], ["mode", "==", "run"]]},
+        {"label": "Band", "when": [["y", ">=", 1], ["y", "<=", 2]]}
+    ]))
+    rows = [
+        {"x": 11, "y": 0, "mode": "run"},
+        {"x": 5, "y": 2, "mode": "rest"},
+        {"x": 5, "y": 3, "mode": "unknown"}
+    ]
+
+    results = engine.evaluate(engine.encode(rows))
+
+    assert [result['condition'] for result in results] == ["High", "Band", "Default"]
+
+
+def test_all_mode_and_categorical_operators():
+    engine = LIARuleEngine(_spec(
+        [{"label": "Any", "when": [["x", "!=", -1]]}],
+        risk_factors={"match": "all", "rules": [
+            {"label": "Not resting", "when": [["mode", "!=", "rest"]]},
+            {"label": "Low y", "when": [["y", "<", 1]]}
+        ]}
+    ))
+
+    results = engine.evaluate(engine.encode([
+        {"x": 0, "y": 0, "mode": "run"}, {"x": 0, "y": 5, "mode": "rest"}
+    ]))
+
+    assert [result['risk_factors'] for result in results] == [["Not resting", "Low y"], []]
+
+
+@pytest.mark.parametrize("rule, message", [
+    ({"label": "Bad", "when": [["z", "<", 1]]}, "unknown feature"),
+    ({"label": "Bad", "when": [["x", "=~", 1]]}, "unknown operator"),
+    ({"label": "Bad", "when": [["mode", "<", "run"]]}, "only supports"),
+    ({"label": "Bad", "when": []}, "no clauses"),
+])
+def test_invalid_tables_fail_to_compile(rule, message):
+    with pytest.raises(ValueError, match=message):
+        LIARuleEngine(_spec([rule]))
+
+
+def test_shipped_tables_match_clause_by_clause_evaluation():
+    spec = json.loads(RULES_PATH.read_text(encoding="utf-8"))
+    engine = LIARuleEngine(spec)
+    rng = np.random.default_rng(0)
+    rows = [
+        {
+            "heart_rate": rng.uniform(40, 170), "activity": rng.uniform(0, 150),
+            "spo2": rng.uniform(88, 100), "temperature": rng.uniform(35.5, 38.5),
+            "hrv_score": rng.uniform(20, 95), "signal_quality": rng.uniform(0.3, 1.0),
+            "alignment_score": rng.uniform(0.3, 1.0), "artifact_count": int(rng.integers(0, 5)),
+            "pattern": str(rng.choice(["stable", "increasing", "irregular"])),
+            "rhythm": str(rng.choice(["normal_sinus", "athletic"]))
+        }
+        for _ in range(500)
+    ]
+
+    def matching(table, row):
+        return [
+            rule["label"] for rule in spec[table]["rules"]
+            if all(OPERATORS[operator](row[feature], value) for feature, operator, value in rule["when"])
+        ]
+
+    for row, result in zip(rows, engine.evaluate(engine.encode(rows))):
+        assert result['condition'] == (matching('condition', row) or [spec['condition']['default']])[0]
+        assert result['risk_factors'] == matching('risk_factors', row)
+        assert result['positive_indicators'] == matching('positive_indicators', row)
@@ -0,0 +1,81 @@
+"""
+Test matrix profile motif/discord discovery (STOMP, STAMPI) against brute force
+"""
+
+import numpy as np
+import pytest
+
+from app.services.matrix_profile import IncrementalMatrixProfile, stomp, top_discords, top_motifs
+
+
+def _brute_force_profile(series: np.ndarray, m: int, exclusion: int) -> np.ndarray:
+    """Nearest z-normalised neighbour distance of every subsequence, O(n² m)"""
+    windows = np.lib.stride_tricks.sliding_window_view(series, m)
+    normalised = (windows - windows.mean(axis=1, keepdims=True)) / windows.std(axis=1, keepdims=True)
+    profile = np.full(len(windows), np.inf)
+    for i in range(len(windows)):
+        for j in range(len(windows)):
+            if abs(i - j) > exclusion:
+                profile[i] = min(profile[i], np.linalg.norm(normalised[i] - normalised[j]))
+    return profile
+
+
+def _series(n: int = 300) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return np.sin(np.arange(n) / 4) + rng.normal(0, 0.3, n)
+
+
+def test_stomp_matches_brute_force():
+    series, m = _series(), 16
+
+    profile, index = stomp(series, m)
+
+    expected = _brute_force_profile(series, m, exclusion=4)
+    np.testing.assert_allclose(profile, expected, atol=1e-6)
+    assert np.all(np.abs(index - np.arange(len(index))) > 4)
+
+
+def test_stampi_matches_the_batch_profile():
+    series, m = _series(), 16
+    incremental = IncrementalMatrixProfile(m, max_length=len(series))
+
+    for value in series:
+        incremental.append(value)
+
+    profile, _ = stomp(series, m)
+    assert len(incremental) == len(profile)
+    np.testing.assert_allclose(incremental.profile, profile, atol=1e-6)
+
+
+def test_stampi_keeps_a_bounded_history():
+    series, m = _series(600), 16
+    incremental = IncrementalMatrixProfile(m, max_length=100)
+
+    for value in series:
+        incremental.append(value)
+
+    assert len(incremental.series) == 100
+    np.testing.assert_array_equal(incremental.series, series[-100:])
+    assert len(incremental) == 100 - m + 1
+    assert incremental.index.min() >= -1 and incremental.index.max() < len(incremental)
+    # Trimmed profiles keep their best-known distance, never worse than the retained window's
+    retained, _ = stomp(series[-100:], m)
+    assert np.all(incremental.profile <= retained + 1e-6)
+
+
+def test_planted_motif_and_discord_are_found():
+    rng = np.random.default_rng(1)
+    series, m = rng.normal(0, 1, 400), 20
+    pattern = np.sin(np.linspace(0, 3 * np.pi, m)) * 3
+    series[50:50 + m] += pattern
+    series[300:300 + m] += pattern
+
+    profile, index = stomp(series, m)
+
+    i, j, _ = top_motifs(profile, index, m, k=1)[0]
+    assert sorted((i, j)) == pytest.approx([50, 300], abs=2)
+
+    periodic = np.sin(np.arange(400) * 2 * np.pi / 25) + np.random.default_rng(2).normal(0, 0.05, 400)
+    periodic[200:210] = np.linspace(1, -1, 10) ** 3  # One broken cycle
+    discord, _ = top_discords(stomp(periodic, m)[0], m, k=1)[0]
+    assert 200 - m <= discord <= 210
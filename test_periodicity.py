@@ -0,0 +1,46 @@
+"""
+Test Timesystems™ FFT autocorrelation periodicity
+"""
+
+import numpy as np
+import pytest
+
+from app.services.timesystems import TimesystemsLayer
+
+SAMPLE_MS = 100  # 10 Hz
+
+
+def _timestamps(n: int) -> np.ndarray:
+    return np.arange(n, dtype=np.int64) * SAMPLE_MS
+
+
+def test_period_of_a_sine_is_recovered():
+    t = np.arange(600) * SAMPLE_MS / 1000
+    heart_rate = 70 + 5 * np.sin(2 * np.pi * t / 4.7) + np.random.default_rng(0).normal(0, 0.5, 600)
+
+    detected, period, confidence = TimesystemsLayer()._autocorrelation_periodicity(
+        heart_rate, _timestamps(600)
+    )
+
+    assert detected
+    assert period == pytest.approx(4.7, abs=0.1)
+    assert confidence > 0.8
+
+
+def test_period_uses_the_sample_timestamps():
+    t = np.arange(300) * 0.5
+    heart_rate = 70 + 5 * np.sin(2 * np.pi * t / 12.0)
+
+    _, period, _ = TimesystemsLayer()._autocorrelation_periodicity(
+        heart_rate, np.arange(300, dtype=np.int64) * 500
+    )
+
+    assert period == pytest.approx(12.0, abs=0.2)
+
+
+def test_noise_and_flat_signals_are_not_periodic():
+    layer = TimesystemsLayer()
+    noise = 70 + np.random.default_rng(1).normal(0, 3, 600)
+
+    assert not layer._autocorrelation_periodicity(noise, _timestamps(600))[0]
+    assert layer._autocorrelation_periodicity(np.full(600, 70.0), _timestamps(600)) == (False, None, 0.0)
@@ -0,0 +1,44 @@
+"""
+Test PipelineRunner per-device ordering when a caller is cancelled
+"""
+
+import asyncio
+import threading
+import time
+
+from app.services.pipeline import PipelineRunner
+
+
+def test_cancelled_caller_keeps_the_device_lock_until_its_work_finishes():
+    runner = PipelineRunner(mode='thread', max_workers=2)
+    pipeline = runner.get_pipeline("device")
+    active, overlaps = [], []
+    guard = threading.Lock()
+
+    def slow_query(tag):
+        with guard:
+            if active:
+                overlaps.append((active[0], tag))
+            active.append(tag)
+        time.sleep(0.2)
+        with guard:
+            active.remove(tag)
+        return tag
+
+    pipeline.slow_query = slow_query
+
+    async def scenario():
+        first = asyncio.create_task(runner.query("device", 'slow_query', "first", create=True))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        second = await runner.query("device", 'slow_query', "second")
+        return first.cancelled(), second
+
+    try:
+        cancelled, second = asyncio.run(scenario())
+    finally:
+        runner.shutdown()
+
+    assert cancelled
+    assert second == "second"
+    assert overlaps == []
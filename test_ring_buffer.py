@@ -0,0 +1,52 @@
+"""
+Test the columnar ring buffer behind Timesystems™ history
+"""
+
+import numpy as np
+import pytest
+
+from app.utils.ring_buffer import ColumnarRingBuffer
+
+
+def _filled(capacity: int, samples: int) -> ColumnarRingBuffer:
+    buffer = ColumnarRingBuffer(capacity, ('heart_rate', 'spo2'))
+    for i in range(samples):
+        buffer.append(1_000 * i, (60.0 + i, 90.0 + i % 10))
+    return buffer
+
+
+def test_reads_after_wraparound_are_the_newest_samples_oldest_first():
+    buffer = _filled(capacity=5, samples=13)
+
+    assert len(buffer) == 5
+    assert buffer.timestamps().tolist() == [8_000, 9_000, 10_000, 11_000, 12_000]
+    assert buffer.column('heart_rate').tolist() == [68.0, 69.0, 70.0, 71.0, 72.0]
+    assert buffer.column('spo2', 3).tolist() == [90.0, 91.0, 92.0]
+    assert buffer.latest('heart_rate') == 72.0
+
+
+def test_partial_buffer_and_oversized_reads():
+    buffer = _filled(capacity=5, samples=3)
+
+    assert buffer.column('heart_rate', 10).tolist() == [60.0, 61.0, 62.0]
+    assert buffer.column('heart_rate', 0).tolist() == []
+
+
+def test_reads_are_read_only_views():
+    buffer = _filled(capacity=4, samples=6)
+    view = buffer.column('heart_rate')
+
+    assert np.shares_memory(view, buffer._columns)
+    with pytest.raises(ValueError):
+        view[0] = 0.0
+
+
+def test_clear_empties_the_buffer():
+    buffer = _filled(capacity=4, samples=6)
+
+    buffer.clear()
+
+    assert len(buffer) == 0
+    assert buffer.latest('heart_rate') is None
+    buffer.append(99_000, (80.0, 97.0))
+    assert buffer.column('heart_rate').tolist() == [80.0]
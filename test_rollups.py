@@ -0,0 +1,63 @@
+"""
+Test Timesystems™ rollups with out-of-order (late) samples
+"""
+
+import numpy as np
+import pytest
+
+from app.services.rollups import MultiResolutionRollup
+
+CHANNELS = ('heart_rate', 'spo2')
+
+
+def _rollup(samples):
+    rollup = MultiResolutionRollup(CHANNELS)
+    for timestamp_ms, values in samples:
+        rollup.add(timestamp_ms, values)
+    return rollup
+
+
+def test_late_sample_merges_into_its_closed_bucket():
+    samples = [(t * 1000, (60.0 + t, 97.0)) for t in range(90)]
+    late = (1500, (120.0, 90.0))
+
+    in_order = _rollup(sorted(samples + [late]))
+    out_of_order = _rollup(samples + [late])
+
+    seconds = out_of_order.series('1s', 'heart_rate')
+    i = int(np.flatnonzero(seconds['start_ms'] == 1000)[0])
+    assert seconds['count'][i] == 2
+    assert seconds['mean'][i] == 90.5
+    assert seconds['max'][i] == 120.0
+
+    # Same statistics as if the sample had arrived in order, at every level
+    for resolution in ('1s', '1m'):
+        expected = in_order.series(resolution, 'heart_rate')
+        actual = out_of_order.series(resolution, 'heart_rate')
+        for key in ('start_ms', 'count', 'mean', 'std', 'min', 'max'):
+            np.testing.assert_allclose(actual[key], expected[key])
+    for channel, stats in in_order.summary('1m').items():
+        assert out_of_order.summary('1m')[channel] == pytest.approx(stats)
+
+    late_samples = out_of_order.late_samples()
+    assert late_samples['1s'] == {'merged': 1, 'dropped': 0}
+    assert late_samples['1m']['dropped'] == 0
+
+
+def test_late_sample_for_an_unretained_bucket_is_counted():
+    rollup = _rollup([(t * 1000, (60.0, 97.0)) for t in range(700)])  # 1 s ring keeps 600 buckets
+
+    rollup.add(5000, (200.0, 90.0))
+
+    assert rollup.late_samples()['1s'] == {'merged': 0, 'dropped': 1}
+    assert 200.0 not in rollup.series('1s', 'heart_rate')['max']
+    # Still counted in the coarser bucket that covers it
+    assert rollup.series('1m', 'heart_rate')['max'][0] == 200.0
+    assert rollup.late_samples()['1m'] == {'merged': 1, 'dropped': 0}
+
+
+def test_in_order_samples_are_not_late():
+    rollup = _rollup([(t * 500, (60.0, 97.0)) for t in range(10)])
+
+    assert all(counts == {'merged': 0, 'dropped': 0} for counts in rollup.late_samples().values())
+    assert rollup.series('1s', 'heart_rate')['count'].tolist() == [2, 2, 2, 2, 2]
@@ -0,0 +1,43 @@
+"""
+Test the streaming least-squares trend window against numpy
+"""
+
+import numpy as np
+import pytest
+
+from app.utils.running_stats import RunningTrendWindow
+
+
+def test_trend_matches_polyfit_across_wraparound_and_resyncs():
+    values = 70 + 0.05 * np.arange(500) + np.random.default_rng(0).normal(0, 3, 500)
+    window = RunningTrendWindow(size=60)
+
+    for i, value in enumerate(values):
+        window.push(value)
+        expected = values[max(0, i - 59):i + 1]
+        np.testing.assert_array_equal(window.window(), expected)
+        if len(expected) >= 2:
+            x = np.arange(len(expected))
+            assert window.slope == pytest.approx(np.polyfit(x, expected, 1)[0], abs=1e-9)
+        assert window.mean == pytest.approx(np.mean(expected))
+        assert window.std == pytest.approx(np.std(expected))
+
+
+def test_resync_bounds_drift_over_a_long_stream():
+    window = RunningTrendWindow(size=30)
+    values = 120 + 40 * np.sin(np.arange(100_000) / 3) + np.random.default_rng(1).normal(0, 5, 100_000)
+
+    for value in values:
+        window.push(value)
+
+    assert window.pushes_since_resync < window.size
+    expected = values[-30:]
+    assert window.slope == pytest.approx(np.polyfit(np.arange(30), expected, 1)[0], abs=1e-9)
+    assert window.variance == pytest.approx(np.var(expected), rel=1e-9)
+
+
+def test_short_window_has_no_trend():
+    window = RunningTrendWindow(size=10)
+    assert window.slope == 0.0
+    window.push(72.0)
+    assert (window.slope, window.mean, window.std) == (0.0, 72.0, 0.0)
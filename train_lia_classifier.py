@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Train the LIA condition classifier offline
+
+Generates synthetic wearable feature rows from physiological activity
+states, labels the clean rows with the LIA condition rule table, adds
+sensor noise to what the model sees, and fits a binned multinomial
+logistic regression followed by temperature scaling on a held-out split.
+The probabilities therefore estimate how likely each condition is given
+noisy measurements, not just which rule fired.
+
+The result is written as a new LIA model registry version (rules and
+recommendations copied from the base version), ready to pin to canary
+devices or activate without a restart.
+
+Usage:
+    python train_lia_classifier.py [--samples 200000] [--seed 7] [--base v1] [--version v2]
+"""
+
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+import numpy as np
+from scipy import optimize, sparse
+
+from app.services.lia_registry import VERSION_PATTERN, LIAModelBundle, LIAModelRegistry
+from app.services.lia_rules import LIARuleEngine
+
+NUMERIC_EDGES = {
+    'heart_rate': np.arange(35, 200, 5),
+    'activity': np.arange(5, 160, 5),
+    'spo2': np.arange(88, 100, 1),
+    'hrv_score': np.arange(10, 100, 5)
+}
+CATEGORICAL = {
+    'rhythm': ["normal_sinus", "elevated", "low", "irregular", "athletic"],
+    'pattern': ["stable", "increasing", "decreasing", "oscillating", "irregular"]
+}
+
+# state: (weight, heart rate (mean, std), activity (low, high), hrv (mean, std))
+ACTIVITY_STATES = {
+    'sleep': (0.14, (54, 5), (0, 8), (74, 10)),
+    'rest': (0.28, (70, 9), (0, 25), (65, 12)),
+    'recovery': (0.06, (58, 6), (0, 15), (84, 7)),
+    'stress': (0.10, (92, 8), (0, 25), (42, 9)),
+    'light': (0.16, (98, 8), (20, 70), (58, 10)),
+    'moderate': (0.14, (122, 10), (45, 110), (50, 10)),
+    'intense': (0.12, (152, 12), (85, 160), (40, 10))
+}
+
+# Measurement noise on what the classifier sees
+NOISE = {'heart_rate': 3.0, 'activity': 6.0, 'spo2': 0.8, 'hrv_score': 6.0}
+CATEGORY_FLIP_RATE = 0.05
+
+
+def classify_rhythm(heart_rate: np.ndarray, hrv: np.ndarray, lf_hf: np.ndarray) -> np.ndarray:
+    """Vectorized copy of iFRSLayer._classify_rhythm"""
+    return np.select(
+        [
+            (heart_rate >= 60) & (heart_rate <= 100) & (hrv >= 60),
+            (heart_rate < 60) & (hrv >= 70),
+            heart_rate > 100,
+            heart_rate < 60,
+            (hrv < 40) | (lf_hf > 3.0)
+        ],
+        ['normal_sinus', 'athletic', 'elevated', 'low', 'irregular'],
+        default='normal_sinus'
+    )
+
+
+def synthesize(n: int, rng: np.random.Generator):
+    """Clean feature columns sampled from the activity-state mixture"""
+    names = list(ACTIVITY_STATES)
+    weights = np.array([ACTIVITY_STATES[s][0] for s in names])
+    state = rng.choice(len(names), size=n, p=weights / weights.sum())
+
+    heart_rate, activity, hrv = np.empty(n), np.empty(n), np.empty(n)
+    for s, name in enumerate(names):
+        _, (hr_mean, hr_std), (act_low, act_high), (hrv_mean, hrv_std) = ACTIVITY_STATES[name]
+        mask = state == s
+        count = int(mask.sum())
+        heart_rate[mask] = rng.normal(hr_mean, hr_std, count)
+        activity[mask] = rng.uniform(act_low, act_high, count)
+        hrv[mask] = rng.normal(hrv_mean, hrv_std, count)
+
+    heart_rate = np.clip(heart_rate, 35, 200)
+    activity = np.clip(activity, 0, 200)
+    hrv = np.clip(hrv, 0, 100)
+    spo2 = np.clip(rng.normal(97.3, 1.4, n), 85, 100)
+    temperature = np.clip(rng.normal(36.8, 0.4, n), 35, 40)
+
+    rhythm = classify_rhythm(heart_rate, hrv, rng.lognormal(0.3, 0.5, n))
+
+    # Steady states mostly read as stable; active states trend or oscillate
+    calm = activity < 20
+    pattern = np.where(
+        calm & (rng.random(n) < 0.7),
+        'stable',
+        rng.choice(CATEGORICAL['pattern'], size=n, p=[0.3, 0.2, 0.2, 0.2, 0.1])
+    )
+
+    return {
+        'heart_rate': heart_rate, 'activity': activity, 'spo2': spo2,
+        'temperature': temperature, 'hrv_score': hrv,
+        'rhythm': rhythm, 'pattern': pattern
+    }
+
+
+def label(clean: dict, rules: LIARuleEngine) -> np.ndarray:
+    """Condition from the rule table on noise-free features"""
+    n = len(clean['heart_rate'])
+    rows = [
+        {
+            'heart_rate': clean['heart_rate'][i], 'activity': clean['activity'][i],
+            'spo2': clean['spo2'][i], 'temperature': clean['temperature'][i],
+            'hrv_score': clean['hrv_score'][i], 'signal_quality': 1.0,
+            'alignment_score': 1.0, 'artifact_count': 0,
+            'pattern': clean['pattern'][i], 'rhythm': clean['rhythm'][i]
+        }
+        for i in range(n)
+    ]
+    return np.array(rules.tables['condition'].first_match(rules.encode(rows)))
+
+
+def observe(clean: dict, rng: np.random.Generator) -> dict:
+    """What a device reports: clean values plus sensor noise"""
+    observed = dict(clean)
+    n = len(clean['heart_rate'])
+    for name, sigma in NOISE.items():
+        observed[name] = clean[name] + rng.normal(0, sigma, n)
+    observed['spo2'] = np.minimum(observed['spo2'], 100)
+    for name, vocabulary in CATEGORICAL.items():
+        flip = rng.random(n) < CATEGORY_FLIP_RATE
+        observed[name] = np.where(flip, rng.choice(vocabulary, size=n), clean[name])
+    return observed
+
+
+def design_indices(observed: dict, offsets: dict) -> np.ndarray:
+    """[samples, features] weight-row indices (same encoding as LIAClassifier)"""
+    columns = []
+    for name, edges in NUMERIC_EDGES.items():
+        columns.append(offsets[name] + np.searchsorted(edges, observed[name], side='right'))
+    for name, vocabulary in CATEGORICAL.items():
+        lookup = {value: i for i, value in enumerate(vocabulary)}
+        columns.append(offsets[name] + np.array([lookup[v] for v in observed[name]]))
+    return np.stack(columns, axis=1)
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=1, keepdims=True)
+    p = np.exp(logits)
+    return p / p.sum(axis=1, keepdims=True)
+
+
+def fit(X: sparse.csr_matrix, y: np.ndarray, classes: int, l2: float):
+    """L2-regularised multinomial logistic regression (L-BFGS)"""
+    n, d = X.shape
+    Y = np.eye(classes)[y]
+
+    def loss(theta):
+        W = theta[:d * classes].reshape(d, classes)
+        b = theta[d * classes:]
+        P = softmax(X @ W + b)
+        nll = -np.log(P[np.arange(n), y] + 1e-12).mean() + 0.5 * l2 * np.sum(W * W)
+        G = (P - Y) / n
+        grad_W = X.T @ G + l2 * W
+        return nll, np.concatenate([np.asarray(grad_W).ravel(), G.sum(axis=0)])
+
+    result = optimize.minimize(
+        loss, np.zeros(d * classes + classes), jac=True, method='L-BFGS-B',
+        options={'maxiter': 500}
+    )
+    return result.x[:d * classes].reshape(d, classes), result.x[d * classes:]
+
+
+def fit_temperature(logits: np.ndarray, y: np.ndarray) -> float:
+    """Temperature minimising held-out NLL"""
+    def nll(log_t):
+        P = softmax(logits / np.exp(log_t))
+        return -np.log(P[np.arange(len(y)), y] + 1e-12).mean()
+    return float(np.exp(optimize.minimize_scalar(nll, bounds=(-3, 3), method='bounded').x))
+
+
+def expected_calibration_error(P: np.ndarray, y: np.ndarray, bins: int = 15) -> float:
+    """Top-label ECE"""
+    confidence = P.max(axis=1)
+    correct = P.argmax(axis=1) == y
+    which = np.minimum((confidence * bins).astype(int), bins - 1)
+    error = 0.0
+    for b in range(bins):
+        mask = which == b
+        if mask.any():
+            error += mask.mean() * abs(confidence[mask].mean() - correct[mask].mean())
+    return float(error)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the LIA condition classifier")
+    parser.add_argument("--samples", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--l2", type=float, default=1e-4)
+    parser.add_argument("--base", help="Version to copy rules/recommendations from (default: active)")
+    parser.add_argument("--version", help="New version name (default: UTC timestamp)")
+    args = parser.parse_args()
+
+    registry = LIAModelRegistry()
+    base = registry.root / (args.base or registry.active_version)
+    version = args.version or datetime.now(timezone.utc).strftime("v%Y%m%d%H%M%S")
+    output = registry.root / version
+    if not VERSION_PATTERN.fullmatch(version):
+        parser.error(f"Invalid version name {version!r} (letters, digits, '.', '_' and '-' only)")
+    if output.exists():
+        parser.error(f"Version {version} already exists; registry versions are immutable")
+
+    rng = np.random.default_rng(args.seed)
+    rules = LIARuleEngine.from_file(base / "rules.json")
+    conditions = rules.tables['condition']
+    classes = [conditions.default] + conditions.labels
+
+    print("1. Generating synthetic samples...")
+    clean = synthesize(args.samples, rng)
+    y = np.array([classes.index(c) for c in label(clean, rules)])
+    observed = observe(clean, rng)
+    for c, name in enumerate(classes):
+        print(f"   {name:<20} {np.mean(y == c):6.1%}")
+
+    offsets, d = {}, 0
+    for name, edges in NUMERIC_EDGES.items():
+        offsets[name], d = d, d + len(edges) + 1
+    for name, vocabulary in CATEGORICAL.items():
+        offsets[name], d = d, d + len(vocabulary) + 1
+
+    indices = design_indices(observed, offsets)
+    n = len(y)
+    X = sparse.csr_matrix(
+        (np.ones(indices.size), indices.ravel(), np.arange(0, indices.size + 1, indices.shape[1])),
+        shape=(n, d)
+    )
+
+    split = rng.permutation(n)
+    train, calib, test = np.split(split, [int(0.7 * n), int(0.85 * n)])
+
+    print("2. Fitting multinomial logistic regression...")
+    W, b = fit(X[train], y[train], len(classes), args.l2)
+
+    print("3. Temperature scaling on held-out split...")
+    temperature = fit_temperature(X[calib] @ W + b, y[calib])
+
+    test_logits = X[test] @ W + b
+    raw, calibrated = softmax(test_logits), softmax(test_logits / temperature)
+    metrics = {
+        'accuracy': float(np.mean(calibrated.argmax(axis=1) == y[test])),
+        'nll': float(-np.log(calibrated[np.arange(len(test)), y[test]] + 1e-12).mean()),
+        'ece_uncalibrated': expected_calibration_error(raw, y[test]),
+        'ece': expected_calibration_error(calibrated, y[test])
+    }
+    print(f"   temperature={temperature:.3f} accuracy={metrics['accuracy']:.3f} "
+          f"ece={metrics['ece_uncalibrated']:.4f} → {metrics['ece']:.4f}")
+
+    # Build in a staging directory and publish with one rename
+    staging = registry.root / f".{version}.staging"
+    shutil.rmtree(staging, ignore_errors=True)
+    (staging / "classifier").mkdir(parents=True)
+    shutil.copy(base / "rules.json", staging / "rules.json")
+    shutil.copy(base / "recommendations.json", staging / "recommendations.json")
+
+    np.save(staging / "classifier" / "weights.npy", W.astype(np.float32))
+    np.save(staging / "classifier" / "bias.npy", b.astype(np.float32))
+    meta = {
+        'version': datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S"),
+        'model': 'binned_multinomial_logistic_regression',
+        'classes': classes,
+        'numeric': {name: edges.tolist() for name, edges in NUMERIC_EDGES.items()},
+        'categorical': CATEGORICAL,
+        'temperature': temperature,
+        'training': {'samples': args.samples, 'seed': args.seed, 'l2': args.l2, **metrics}
+    }
+    with open(staging / "classifier" / "model.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    # Round-trip through the serving loader before publishing
+    LIAModelBundle(version, staging)
+    os.replace(staging, output)
+    print(f"✅ Model version {version} written to {output}")
+    print(f"   Canary: PUT /api/v1/lia/models/pins/{{device_id}} {{\"version\": \"{version}\"}}")
+    print(f"   Rollout: POST /api/v1/lia/models/activate {{\"version\": \"{version}\"}}")
+
+
+if __name__ == "__main__":
+    main()